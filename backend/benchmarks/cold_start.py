@@ -0,0 +1,178 @@
+"""
+Cold start of the serverless entry point: import time, startup and time to
+first byte.
+
+Each run is a fresh interpreter that loads api/index.py the way Vercel
+does, runs the app's lifespan startup, and sends one ASGI request. It
+reports the median import, startup and first-byte times, and the same
+request again once warm. It also prints an `-X importtime` breakdown by
+top-level package. The results are compared against the checked-in
+baseline.
+
+The database doesn't need to be reachable. Without SUPABASE_URL the runs
+point at a closed local port, so DB-backed routes fail fast, just as a
+cold start with a slow network would still pay for the imports.
+
+Usage:
+    cd backend
+    python -m benchmarks.cold_start                  # compare to baseline
+    python -m benchmarks.cold_start --save-baseline  # record a new one
+    python -m benchmarks.cold_start --path /api/players --no-warmup
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baselines", "cold_start.json")
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+ENTRY = os.path.join(ROOT, "api", "index.py")
+
+PROBE = """
+import asyncio, json, runpy, sys, time
+start = time.perf_counter()
+app = runpy.run_path(sys.argv[1])["app"]
+imported = time.perf_counter()
+
+async def request(path):
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": b"",
+        "root_path": "", "headers": [(b"host", b"localhost")],
+        "client": ("127.0.0.1", 1), "server": ("localhost", 80),
+    }
+    first = {}
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start" and not first:
+            first["at"] = time.perf_counter()
+            first["status"] = message["status"]
+
+    try:
+        await app(scope, receive, send)
+    except Exception:
+        pass  # the 500 has already been sent
+    return first
+
+async def main():
+    async with app.router.lifespan_context(app):
+        started = time.perf_counter()
+        cold = await request(sys.argv[2])
+        again = time.perf_counter()
+        warm = await request(sys.argv[2])
+        print(json.dumps({
+            "import_ms": (imported - start) * 1000,
+            "startup_ms": (started - imported) * 1000,
+            "first_byte_ms": (cold["at"] - start) * 1000,
+            "warm_request_ms": (warm["at"] - again) * 1000,
+            "status": cold["status"],
+        }))
+
+asyncio.run(main())
+"""
+
+
+def _env(warmup: bool) -> dict:
+    env = dict(os.environ)
+    env.setdefault("SUPABASE_URL", "http://127.0.0.1:9")
+    env.setdefault("SUPABASE_KEY", "eyJhbGciOiJIUzI1NiJ9.eyJyb2xlIjoiYW5vbiJ9.benchmark")
+    env.setdefault("OPENAI_API_KEY", "sk-benchmark")
+    env["WARMUP_ON_STARTUP"] = "true" if warmup else "false"
+    return env
+
+
+def measure(path: str, runs: int, warmup: bool) -> dict:
+    samples = []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", PROBE, ENTRY, path],
+            env=_env(warmup), capture_output=True, text=True, check=True, cwd=ROOT,
+        )
+        samples.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    result = {k: round(statistics.median(s[k] for s in samples), 1) for k in samples[0] if k != "status"}
+    result["status"] = samples[-1]["status"]
+    return result
+
+
+def import_breakdown(top: int = 12) -> list[tuple[str, float]]:
+    """Self import time in ms per top-level package, slowest first."""
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import runpy; runpy.run_path({ENTRY!r})"],
+        env=_env(True), capture_output=True, text=True, check=True, cwd=ROOT,
+    )
+    totals: dict[str, float] = {}
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, _cumulative, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        if not self_us.isdigit():  # the header line
+            continue
+        package = name.split(".")[0]
+        totals[package] = totals.get(package, 0.0) + int(self_us) / 1000
+    return [(name, round(ms, 1)) for name, ms in sorted(totals.items(), key=lambda kv: -kv[1])[:top]]
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="Benchmark serverless cold starts")
+    parser.add_argument("--path", default="/api/health")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--no-warmup", action="store_true", help="Run with WARMUP_ON_STARTUP=false")
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed regression fraction")
+    args = parser.parse_args(argv)
+
+    results = measure(args.path, args.runs, not args.no_warmup)
+    breakdown = import_breakdown()
+
+    print(f"{args.path}, median of {args.runs} cold starts (warm-up {'off' if args.no_warmup else 'on'}):")
+    for name in ("import_ms", "startup_ms", "first_byte_ms", "warm_request_ms"):
+        print(f"  {name:<16} {results[name]:>8.1f}")
+    print(f"  status           {results['status']:>8}")
+    print("import time by package (self, ms):")
+    for name, ms in breakdown:
+        print(f"  {name:<24} {ms:>8.1f}")
+
+    key = f"{args.path} warmup={'off' if args.no_warmup else 'on'}"
+    if args.save_baseline:
+        baseline = {}
+        if os.path.exists(BASELINE_PATH):
+            with open(BASELINE_PATH) as f:
+                baseline = json.load(f)
+        baseline.setdefault("runs", {})[key] = results
+        baseline["import_breakdown_ms"] = dict(breakdown)
+        os.makedirs(os.path.dirname(BASELINE_PATH), exist_ok=True)
+        with open(BASELINE_PATH, "w") as f:
+            json.dump(baseline, f, indent=2)
+            f.write("\n")
+        print(f"Saved baseline to {BASELINE_PATH}")
+        return
+
+    if not os.path.exists(BASELINE_PATH):
+        print("No baseline recorded; run with --save-baseline")
+        return
+    with open(BASELINE_PATH) as f:
+        base = json.load(f).get("runs", {}).get(key)
+    if base is None:
+        print(f"No baseline for {key}; run with --save-baseline")
+        return
+    regressions = [
+        f"{name}: {base[name]:.1f} ms -> {results[name]:.1f} ms"
+        for name in ("import_ms", "first_byte_ms")
+        if results[name] > base[name] * (1 + args.tolerance)
+    ]
+    if regressions:
+        print("Regressions against baseline:")
+        for line in regressions:
+            print(f"  {line}")
+        sys.exit(1)
+    print("No regressions against baseline")
+
+
+if __name__ == "__main__":
+    main()
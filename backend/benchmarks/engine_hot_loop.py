@@ -0,0 +1,230 @@
+"""
+Game engine hot-loop benchmarks, with no LLM or database in the way.
+
+Drives run_game_stream end to end with an instant stub backend over a
+synthetic player pool, then times the GameState and PlayerSnapshot
+operations the loop is made of. Results are compared against the checked-in baseline so
+engine regressions show up in review.
+
+Usage:
+    cd backend
+    python -m benchmarks.engine_hot_loop                  # compare to baseline
+    python -m benchmarks.engine_hot_loop --save-baseline  # record a new one
+
+Re-record the baseline in any change that intentionally speeds up the
+engine, so the regression gate measures against current throughput.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+import timeit
+import tracemalloc
+from services import player_pool
+from services.bot_brain import InitialBidAction, BidResponseAction
+from services.game_engine import run_game_stream
+from services.game_state import BOT_KEYS, GameState
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baselines", "engine_hot_loop.json")
+
+BOT1 = {"id": "bench-1", "name": "Bench One", "strategy_prompt": ""}
+BOT2 = {"id": "bench-2", "name": "Bench Two", "strategy_prompt": ""}
+
+
+def synthetic_players(count: int = 400) -> list[dict]:
+    players = []
+    for i in range(count):
+        fp = 8 + (i * 37 % 450) / 10  # spread across all four tiers
+        players.append(
+            {
+                "id": 1000 + i,
+                "first_name": f"First{i}",
+                "last_name": f"Last{i}",
+                "games_played": 60,
+                "ppg": round(fp * 0.6, 2),
+                "rpg": 5.0,
+                "apg": 4.0,
+                "spg": 1.0,
+                "bpg": 0.5,
+                "topg": 2.0,
+                "fantasy_points": round(fp, 2),
+            }
+        )
+    return players
+
+
+class InstantBackend:
+    """Nominates the best player for 1 credit; the responder counters twice, then passes."""
+
+    async def get_initial_bid(self, available_players, balance, **kwargs) -> InitialBidAction:
+        best = max(available_players, key=lambda p: p["fantasy_points"])
+        return InitialBidAction(player_id=best["id"], amount=1, reasoning="instant")
+
+    async def get_bid_response(self, current_bid, balance, **kwargs) -> BidResponseAction:
+        if current_bid < 3 and current_bid < balance:
+            return BidResponseAction(action="counter", amount=current_bid + 1, reasoning="instant")
+        return BidResponseAction(action="pass", reasoning="instant")
+
+
+async def _play(seed: int) -> int:
+    events = 0
+    async for _ in run_game_stream(BOT1, BOT2, seed=seed, backend=InstantBackend()):
+        events += 1
+    return events
+
+
+async def _measure_memory(seed: int) -> tuple[int, int]:
+    """
+    Peak traced bytes during one game, and the blocks allocated since the game
+    started that are still retained at game_complete. Blocks allocated and
+    freed mid-game only show up in the peak; this doesn't count allocations.
+    """
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    retained_blocks = 0
+    async for event in run_game_stream(BOT1, BOT2, seed=seed, backend=InstantBackend()):
+        if event["type"] == "game_complete":
+            after = tracemalloc.take_snapshot()
+            retained_blocks = sum(d.count_diff for d in after.compare_to(before, "filename") if d.count_diff > 0)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak, retained_blocks
+
+
+def bench_engine(games: int) -> dict:
+    async def run():
+        await _play(0)  # warm up
+        start = time.perf_counter()
+        events = 0
+        for seed in range(games):
+            events += await _play(seed)
+        elapsed = time.perf_counter() - start
+        peak, retained_blocks = await _measure_memory(0)
+        return {
+            "games_per_sec": round(games / elapsed, 1),
+            "events_per_sec": round(events / elapsed, 1),
+            "events_per_game": round(events / games, 1),
+            "peak_bytes_per_game": peak,
+            "retained_blocks_per_game": retained_blocks,
+        }
+
+    return asyncio.run(run())
+
+
+def _time_sleep_0(number: int) -> float:
+    async def run():
+        start = time.perf_counter()
+        for _ in range(number):
+            await asyncio.sleep(0)
+        return time.perf_counter() - start
+
+    return asyncio.run(run())
+
+
+def _time_awards(pool: list[dict], games: int) -> float:
+    """Seconds per GameState.award, drafting whole pools alternately to each bot."""
+    states = [GameState(pool, "bot1") for _ in range(games)]
+    ids = [p["id"] for p in pool]
+    start = time.perf_counter()
+    for state in states:
+        for i, player_id in enumerate(ids):
+            state.award(BOT_KEYS[i % 2], player_id, 1)
+    return (time.perf_counter() - start) / (games * len(ids))
+
+
+def bench_operations(number: int = 20000, repeat: int = 5) -> dict:
+    """
+    Best-of-`repeat` ns per call for the operations the engine repeats every
+    turn (GameState) and every game (PlayerSnapshot sampling).
+    """
+    snapshot = player_pool.get_snapshot()
+    rng = random.Random(0)
+    pool = snapshot.sample(random.Random(0))
+    target = pool[-1]
+    state = GameState(pool, "bot1")
+
+    def rebuild_available():
+        state._available_list = None  # what award() does after every pick
+        return state.available_players()
+
+    ops = {
+        "state_player": lambda: state.player(target["id"]),
+        "state_available_rebuild": rebuild_available,
+        "state_key": state.state_key,
+        "format_log_line": lambda: (
+            f"{BOT1['name']} bids 5 credits for "
+            f"{target['first_name']} {target['last_name']} (Fantasy: {target['fantasy_points']})"
+        ),
+        "snapshot_sample": lambda: snapshot.sample(rng),
+        "snapshot_sample_profile": lambda: snapshot.sample(rng, profile="categories"),
+    }
+    results = {
+        name: round(min(timeit.repeat(fn, number=number, repeat=repeat)) / number * 1e9, 1)
+        for name, fn in ops.items()
+    }
+    results["state_award"] = round(min(_time_awards(pool, number // len(pool)) for _ in range(repeat)) * 1e9, 1)
+    results["sleep_0"] = round(min(_time_sleep_0(number) for _ in range(repeat)) / number * 1e9, 1)
+    return results
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> list[str]:
+    """
+    Return a line per end-to-end engine metric that regressed by more than
+    `tolerance`. Per-operation timings are too noisy to gate on and are only
+    printed for context.
+    """
+    regressions = []
+    higher_is_better = {"games_per_sec", "events_per_sec"}
+    for name, base in baseline.get("engine", {}).items():
+        value = current["engine"].get(name)
+        if value is None or not base or name == "events_per_game":
+            continue
+        change = (value - base) / base
+        worse = -change if name in higher_is_better else change
+        if worse > tolerance:
+            regressions.append(f"engine.{name}: {base} -> {value} ({change:+.0%})")
+    return regressions
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="Benchmark the game engine hot loop")
+    parser.add_argument("--games", type=int, default=300)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed regression fraction")
+    args = parser.parse_args(argv)
+
+    player_pool.prime(synthetic_players())
+    results = {
+        "engine": bench_engine(args.games),
+        "operations_ns": bench_operations(),
+    }
+    print(json.dumps(results, indent=2))
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(BASELINE_PATH), exist_ok=True)
+        with open(BASELINE_PATH, "w") as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+        print(f"Saved baseline to {BASELINE_PATH}")
+        return
+
+    if not os.path.exists(BASELINE_PATH):
+        print("No baseline recorded; run with --save-baseline")
+        return
+    with open(BASELINE_PATH) as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print("Regressions against baseline:")
+        for line in regressions:
+            print(f"  {line}")
+        sys.exit(1)
+    print("No regressions against baseline")
+
+
+if __name__ == "__main__":
+    main()
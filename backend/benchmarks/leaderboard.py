@@ -0,0 +1,118 @@
+"""
+Leaderboard over one million games: the old fetch-2x-and-resort query vs the
+incrementally maintained top-K.
+
+The old query ordered by bot1_score with no index, so the database scanned
+and partially sorted the whole table; here that is modelled as a top-(2 *
+limit) selection on bot1_score followed by the Python re-sort. The new path
+maintains the top K while games are saved and answers reads from it.
+Results are checked against an exact sort of every game.
+
+Usage:
+    cd backend
+    python -m benchmarks.leaderboard [games]
+
+To benchmark the database side, seed a table in the Supabase SQL editor with
+SEED_SQL (printed by --print-seed-sql) and compare EXPLAIN ANALYZE of the two
+queries.
+"""
+
+import argparse
+import heapq
+import random
+import time
+from config import settings
+from services import leaderboard_cache
+
+SEED_SQL = """
+-- One million complete games between the first two bots in the table
+INSERT INTO games (user_id, bot1_id, bot2_id, bot1_score, bot2_score, best_score, best_bot_id, status)
+SELECT b.user_id, b.bot1_id, b.bot2_id, s1, s2, GREATEST(s1, s2),
+       CASE WHEN s1 >= s2 THEN b.bot1_id ELSE b.bot2_id END, 'complete'
+FROM (
+    SELECT (SELECT user_id FROM bots ORDER BY created_at LIMIT 1) AS user_id,
+           (SELECT id FROM bots ORDER BY created_at LIMIT 1) AS bot1_id,
+           (SELECT id FROM bots ORDER BY created_at OFFSET 1 LIMIT 1) AS bot2_id
+) b,
+LATERAL (
+    SELECT round((150 + 20 * (random() + random() + random() - 1.5) * 2)::numeric, 1)::float AS s1,
+           round((150 + 20 * (random() + random() + random() - 1.5) * 2)::numeric, 1)::float AS s2
+    FROM generate_series(1, 1000000)
+) seeded;
+"""
+
+
+def synthetic_games(count: int, seed: int = 0) -> list[dict]:
+    rng = random.Random(seed)
+    games = []
+    for i in range(count):
+        s1 = round(rng.gauss(150, 20), 1)
+        s2 = round(rng.gauss(150, 20), 1)
+        best_score, best_bot_id = leaderboard_cache.best_of("bot-1", "bot-2", {"bot1_score": s1, "bot2_score": s2})
+        games.append(
+            {
+                "id": f"game-{i:07d}",
+                "user_id": "user-1",
+                "bot1_id": "bot-1",
+                "bot1_score": s1,
+                "bot2_score": s2,
+                "best_score": best_score,
+                "best_bot_id": best_bot_id,
+                "scoring_profile": settings.scoring_profile,
+                "created_at": "2025-01-01T00:00:00+00:00",
+                "users": {"username": "bench"},
+                "best_bot": {"name": "Bench Bot"},
+            }
+        )
+    return games
+
+
+def old_leaderboard(games: list[dict], limit: int) -> list[tuple[float, str]]:
+    fetched = heapq.nlargest(limit * 2, games, key=lambda g: g["bot1_score"])
+    scored = [(max(g["bot1_score"], g["bot2_score"]), g["id"]) for g in fetched]
+    scored.sort(key=lambda e: e[0], reverse=True)
+    return scored[:limit]
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="Benchmark leaderboard reads")
+    parser.add_argument("games", nargs="?", type=int, default=1_000_000)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--reads", type=int, default=1000)
+    parser.add_argument("--print-seed-sql", action="store_true")
+    args = parser.parse_args(argv)
+
+    if args.print_seed_sql:
+        print(SEED_SQL)
+        return
+
+    games = synthetic_games(args.games)
+    exact = sorted(((g["best_score"], g["id"]) for g in games), reverse=True)[: args.limit]
+    exact_scores = [score for score, _ in exact]
+
+    start = time.perf_counter()
+    old = old_leaderboard(games, args.limit)
+    old_ms = (time.perf_counter() - start) * 1000
+    old_wrong = sum(1 for a, b in zip(exact_scores, (s for s, _ in old)) if a != b)
+
+    leaderboard_cache.load([])
+    start = time.perf_counter()
+    for g in games:
+        leaderboard_cache.record(g)
+    record_us = (time.perf_counter() - start) / len(games) * 1e6
+
+    leaderboard_cache.top(args.limit)  # build the ranked view once
+    start = time.perf_counter()
+    for _ in range(args.reads):
+        new = leaderboard_cache.top(args.limit)
+    read_us = (time.perf_counter() - start) / args.reads * 1e6
+    new_wrong = sum(1 for a, b in zip(exact_scores, (e["score"] for e in new)) if a != b)
+
+    print(f"games:                     {len(games)}")
+    print(f"old read (scan + resort):  {old_ms:.1f} ms, {old_wrong}/{args.limit} ranks wrong")
+    print(f"top-K record per game:     {record_us:.2f} us")
+    print(f"top-K read:                {read_us:.2f} us, {new_wrong}/{args.limit} ranks wrong")
+
+
+if __name__ == "__main__":
+    main()
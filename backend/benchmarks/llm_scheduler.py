@@ -0,0 +1,110 @@
+"""
+LLM calls from many concurrent games against a rate-limited provider.
+
+The provider is simulated: it answers after a fixed latency, and it returns
+429 once its requests-per-minute bucket is empty. Games call it back to back
+for a fixed time, three ways:
+- direct: no scheduler; a 429 is a failed decision, which the engine treats
+  as a bot error
+- retry only: the scheduler with no configured limits, so it only retries
+  429s with backoff
+- scheduled: the scheduler with the provider's RPM configured
+It reports successful calls per second, 429s seen, failed decisions, the
+spread of completed calls across games, and queue wait.
+
+Usage:
+    cd backend
+    python -m benchmarks.llm_scheduler [--games 12] [--rpm 600] [--seconds 5]
+"""
+
+import argparse
+import asyncio
+import time
+import httpx
+import openai
+from services import llm_scheduler
+from services.llm_scheduler import LLMScheduler, TokenBucket
+
+
+class _Usage:
+    total_tokens = 500
+
+
+class _Completion:
+    usage = _Usage()
+
+
+class FakeProvider:
+    def __init__(self, rpm: int, latency: float):
+        self.bucket = TokenBucket(rpm)
+        self.latency = latency
+        self.rejected = 0
+
+    async def complete(self) -> _Completion:
+        await asyncio.sleep(self.latency / 2)
+        now = time.monotonic()
+        if self.bucket.wait_time(1, now) > 0:
+            self.rejected += 1
+            response = httpx.Response(429, request=httpx.Request("POST", "https://api.invalid/v1/chat"))
+            raise openai.RateLimitError("Rate limit reached", response=response, body=None)
+        self.bucket.take(1)
+        await asyncio.sleep(self.latency / 2)
+        return _Completion()
+
+
+async def _game(provider: FakeProvider, scheduler: LLMScheduler | None, deadline: float, counts: list[int], i: int,
+                failures: list[int]):
+    llm_scheduler.start_game()
+    while time.monotonic() < deadline:
+        try:
+            if scheduler is None:
+                await provider.complete()
+            else:
+                await scheduler.call(provider.complete, 500)
+            counts[i] += 1
+        except openai.RateLimitError:
+            failures[0] += 1
+
+
+async def _run(mode: str, games: int, rpm: int, seconds: float, latency: float) -> dict:
+    provider = FakeProvider(rpm, latency)
+    scheduler = None
+    if mode == "retry only":
+        scheduler = LLMScheduler(backoff_base=0.1, backoff_max=2.0)
+    elif mode == "scheduled":
+        scheduler = LLMScheduler(rpm=rpm, backoff_base=0.1, backoff_max=2.0)
+    counts = [0] * games
+    failures = [0]
+    start = time.monotonic()
+    await asyncio.gather(*(_game(provider, scheduler, start + seconds, counts, i, failures) for i in range(games)))
+    elapsed = time.monotonic() - start
+    stats = scheduler.stats() if scheduler else {}
+    return {
+        "ok_per_s": sum(counts) / elapsed,
+        "rejected": provider.rejected,
+        "failed": failures[0],
+        "spread": (min(counts), max(counts)),
+        "wait_avg_ms": stats.get("wait_avg_ms", 0.0),
+    }
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="Benchmark LLM admission control")
+    parser.add_argument("--games", type=int, default=12)
+    parser.add_argument("--rpm", type=int, default=600)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    args = parser.parse_args(argv)
+
+    print(f"games: {args.games}, provider limit: {args.rpm} rpm ({args.rpm / 60:.0f}/s), "
+          f"latency {args.latency_ms:.0f} ms, {args.seconds:.0f} s")
+    print(f"{'':<11} {'ok/s':>6} {'429s':>6} {'failed':>7} {'per game':>10} {'wait avg':>9}")
+    for mode in ("direct", "retry only", "scheduled"):
+        r = asyncio.run(_run(mode, args.games, args.rpm, args.seconds, args.latency_ms / 1000))
+        spread = f"{r['spread'][0]}-{r['spread'][1]}"
+        print(f"{mode:<11} {r['ok_per_s']:>6.1f} {r['rejected']:>6} {r['failed']:>7} {spread:>10} "
+              f"{r['wait_avg_ms']:>7.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Per-call overhead of a fresh AsyncOpenAI client vs the shared pooled one.
+
+Starts a local fake OpenAI-compatible server, then times get_initial_bid
+with a new client per call (the old behaviour) and with the shared client.
+
+Usage:
+    cd backend
+    python -m benchmarks.openai_client [calls]
+"""
+
+import asyncio
+import json
+import socket
+import statistics
+import sys
+import threading
+import time
+import uvicorn
+from fastapi import FastAPI
+from config import settings
+from services import bot_brain
+
+fake_openai = FastAPI()
+
+
+@fake_openai.post("/v1/chat/completions")
+def chat_completions(body: dict):
+    content = json.dumps({"player_id": 1, "amount": 5, "reasoning": "benchmark"})
+    return {
+        "id": "chatcmpl-bench",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "fake"),
+        "choices": [
+            {
+                "index": 0,
+                "finish_reason": "stop",
+                "message": {"role": "assistant", "content": content},
+            }
+        ],
+        "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _start_server(port: int) -> uvicorn.Server:
+    server = uvicorn.Server(uvicorn.Config(fake_openai, host="127.0.0.1", port=port, log_level="error"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return server
+
+
+PLAYERS = [
+    {
+        "id": i,
+        "first_name": "Player",
+        "last_name": str(i),
+        "games_played": 60,
+        "ppg": 20.0, "rpg": 5.0, "apg": 5.0, "spg": 1.0, "bpg": 0.5, "topg": 2.0,
+        "fantasy_points": 35.0,
+    }
+    for i in range(1, 25)
+]
+
+
+async def _time_calls(calls: int, fresh_client: bool) -> list[float]:
+    timings = []
+    for _ in range(calls):
+        if fresh_client:
+            await bot_brain.close_client()
+        start = time.perf_counter()
+        await bot_brain.get_initial_bid(
+            strategy="benchmark",
+            available_players=PLAYERS,
+            balance=100,
+            opponent_balance=100,
+            my_team=[],
+            opponent_team=[],
+        )
+        timings.append((time.perf_counter() - start) * 1000)
+    await bot_brain.close_client()
+    return timings
+
+
+def _report(label: str, timings: list[float]):
+    timings = sorted(timings)
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(f"{label:<14} mean={statistics.mean(timings):7.3f}ms  p50={statistics.median(timings):7.3f}ms  p95={p95:7.3f}ms")
+
+
+async def main(calls: int):
+    fresh = await _time_calls(calls, fresh_client=True)
+    shared = await _time_calls(calls, fresh_client=False)
+    _report("fresh client", fresh)
+    _report("shared client", shared)
+    saved = statistics.mean(fresh) - statistics.mean(shared)
+    print(f"saved per call: {saved:.3f}ms over {calls} calls")
+
+
+if __name__ == "__main__":
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    port = _free_port()
+    server = _start_server(port)
+    settings.openai_base_url = f"http://127.0.0.1:{port}/v1"
+    try:
+        asyncio.run(main(calls))
+    finally:
+        server.should_exit = True
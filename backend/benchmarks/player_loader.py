@@ -0,0 +1,120 @@
+"""
+CSV loading: the old row-wise player_loader (df.apply + iterrows) vs the
+vectorized one, on a synthetic stats file.
+
+Writes a CSV with the same columns as active_players_stats.csv, loads it
+with both implementations, checks that the rows are identical and prints the
+timings.
+
+Usage:
+    cd backend
+    python -m benchmarks.player_loader [rows]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+from services.player_loader import load_players
+from services.scoring import calculate_fantasy_points
+
+
+def write_synthetic_csv(path: str, rows: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    games = rng.integers(0, 83, rows)
+    per_game = lambda low, high: np.round(games * rng.uniform(low, high, rows), 0)  # noqa: E731
+    pd.DataFrame(
+        {
+            "personId": np.arange(1, rows + 1),
+            "firstName": [f"First{i}" for i in range(rows)],
+            "lastName": [f"Last{i}" for i in range(rows)],
+            "gamesPlayed": games,
+            "numMinutes": np.round(games * rng.uniform(5, 38, rows), 2),
+            "points": per_game(1, 32),
+            "assists": per_game(0, 10),
+            "blocks": per_game(0, 3),
+            "steals": per_game(0, 2.5),
+            "reboundsTotal": per_game(0.5, 13),
+            "turnovers": per_game(0, 4),
+        }
+    ).to_csv(path, index=False)
+
+
+def legacy_load_players(csv_path: str):
+    """The previous implementation, kept here for comparison."""
+    df = pd.read_csv(csv_path)
+
+    df = df[df["gamesPlayed"] >= 10].copy()
+    gp = df["gamesPlayed"]
+    df["ppg"] = (df["points"] / gp).round(2)
+    df["rpg"] = (df["reboundsTotal"] / gp).round(2)
+    df["apg"] = (df["assists"] / gp).round(2)
+    df["spg"] = (df["steals"] / gp).round(2)
+    df["bpg"] = (df["blocks"] / gp).round(2)
+    df["topg"] = (df["turnovers"] / gp).round(2)
+
+    df["fantasy_points"] = df.apply(
+        lambda r: round(
+            calculate_fantasy_points(r["ppg"], r["rpg"], r["apg"], r["spg"], r["bpg"], r["topg"]),
+            2,
+        ),
+        axis=1,
+    )
+
+    rows = []
+    for _, r in df.iterrows():
+        rows.append(
+            {
+                "id": int(r["personId"]),
+                "first_name": r["firstName"],
+                "last_name": r["lastName"],
+                "games_played": int(r["gamesPlayed"]),
+                "minutes": float(r["numMinutes"]),
+                "points": float(r["points"]),
+                "assists": float(r["assists"]),
+                "blocks": float(r["blocks"]),
+                "steals": float(r["steals"]),
+                "rebounds_total": float(r["reboundsTotal"]),
+                "turnovers": float(r["turnovers"]),
+                "ppg": float(r["ppg"]),
+                "rpg": float(r["rpg"]),
+                "apg": float(r["apg"]),
+                "spg": float(r["spg"]),
+                "bpg": float(r["bpg"]),
+                "topg": float(r["topg"]),
+                "fantasy_points": float(r["fantasy_points"]),
+            }
+        )
+
+    return rows
+
+
+def _time(fn, path: str) -> tuple[float, list[dict]]:
+    start = time.perf_counter()
+    rows = fn(path)
+    return time.perf_counter() - start, rows
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="Benchmark player_loader.load_players")
+    parser.add_argument("rows", nargs="?", type=int, default=1_000_000)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "stats.csv")
+        write_synthetic_csv(path, args.rows)
+
+        new_s, new_rows = _time(load_players, path)
+        old_s, old_rows = _time(legacy_load_players, path)
+
+    print(f"csv rows:        {args.rows}")
+    print(f"players loaded:  {len(new_rows)}")
+    print(f"row-wise:        {old_s:.2f} s")
+    print(f"vectorized:      {new_s:.2f} s ({old_s / new_s:.0f}x faster)")
+    print(f"identical rows:  {new_rows == old_rows}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+How much of each bot prompt the provider's prompt cache can serve.
+
+Plays games with the heuristic bots but builds every prompt the OpenAI bots
+would send, then applies OpenAI's caching rule to each call: prompts of 1024+
+tokens reuse the longest prefix shared with an earlier prompt of the same
+game, counted from 1024 in 128-token steps. Tokens are counted with tiktoken
+when it is installed, otherwise with a rough BPE-like split (words, digit
+groups of three, punctuation).
+
+--live instead plays real OpenAI games (needs OPENAI_API_KEY) and reports the
+cached_tokens the API returned.
+
+Usage:
+    cd backend
+    python -m benchmarks.prompt_cache [--games 3] [--live]
+"""
+
+import argparse
+import asyncio
+import os
+import re
+
+os.environ.setdefault("SUPABASE_URL", "http://127.0.0.1:9")
+os.environ.setdefault("SUPABASE_KEY", "benchmark")
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+
+from config import settings  # noqa: E402
+from services import metrics, player_pool  # noqa: E402
+from services.bot_backends import HeuristicBackend, OpenAIBackend  # noqa: E402
+from services.bot_brain import close_client  # noqa: E402
+from services.game_engine import run_game  # noqa: E402
+from services.player_loader import load_players  # noqa: E402
+from services.prompt_builder import PromptBuilder  # noqa: E402
+
+CSV_PATH = os.path.join(os.path.dirname(__file__), "..", "..", "active_players_stats.csv")
+MIN_CACHED_TOKENS = 1024
+CACHE_STEP = 128
+
+BOT1 = {"id": "bot-1", "name": "Stars", "strategy_prompt": "Spend big on the top two elite players, then fill with 1-credit picks."}
+BOT2 = {"id": "bot-2", "name": "Value", "strategy_prompt": "Never pay more than 25 credits; target underpriced good and mid players."}
+
+
+def _token_counter():
+    try:
+        import tiktoken
+    except ImportError:
+        pattern = re.compile(r" ?[A-Za-z]+|\d{1,3}|\n|[^\s\w]")
+        return (lambda text: len(pattern.findall(text))), "approximate"
+    encoding = tiktoken.get_encoding("o200k_base")
+    return (lambda text: len(encoding.encode(text))), "tiktoken o200k_base"
+
+
+class PromptRecorder(HeuristicBackend):
+    """Heuristic decisions, recording the prompts the OpenAI bots would send."""
+
+    def __init__(self):
+        super().__init__()
+        self.prompts = PromptBuilder(settings.prompt_token_budget)
+        self.sent: list[str] = []
+
+    async def get_initial_bid(self, **kwargs):
+        self.sent.append(self.prompts.initial_bid(**kwargs))
+        return await super().get_initial_bid(**kwargs)
+
+    async def get_bid_response(self, **kwargs):
+        self.sent.append(self.prompts.bid_response(**kwargs))
+        return await super().get_bid_response(**kwargs)
+
+
+def cached_tokens(prompt_tokens: int, shared_tokens: int) -> int:
+    if prompt_tokens < MIN_CACHED_TOKENS or shared_tokens < MIN_CACHED_TOKENS:
+        return 0
+    return min(prompt_tokens, MIN_CACHED_TOKENS + (shared_tokens - MIN_CACHED_TOKENS) // CACHE_STEP * CACHE_STEP)
+
+
+def simulate(games: int):
+    count, tokenizer = _token_counter()
+    calls = prompt_total = cached_total = hits = 0
+    for seed in range(games):
+        backend = PromptRecorder()
+        asyncio.run(run_game(BOT1, BOT2, seed=seed, backend=backend))
+        for i, prompt in enumerate(backend.sent):
+            shared = max((len(os.path.commonprefix([prompt, earlier])) for earlier in backend.sent[:i]), default=0)
+            tokens = count(prompt)
+            cached = cached_tokens(tokens, count(prompt[:shared]))
+            calls += 1
+            prompt_total += tokens
+            cached_total += cached
+            hits += cached > 0
+    print(f"tokens counted with: {tokenizer}")
+    print(f"{'calls':>6} {'prompt tok/call':>16} {'cached tok/call':>16} {'calls cached':>13} {'tokens cached':>14}")
+    print(
+        f"{calls:>6} {prompt_total / calls:>16.0f} {cached_total / calls:>16.0f} "
+        f"{hits / calls:>13.1%} {cached_total / prompt_total:>14.1%}"
+    )
+
+
+async def live(games: int):
+    try:
+        for seed in range(games):
+            await run_game(BOT1, BOT2, seed=seed, backend=OpenAIBackend())
+    finally:
+        await close_client()
+    print(f"{'call':<18} {'calls':>6} {'prompt tokens':>14} {'cached tokens':>14} {'cached':>7}")
+    for call in ("get_initial_bid", "get_bid_response"):
+        n, prompt = metrics.llm_tokens.total(call, "prompt")
+        _, cached = metrics.llm_tokens.total(call, "cached")
+        share = cached / prompt if prompt else 0.0
+        print(f"{call:<18} {n:>6} {prompt:>14.0f} {cached:>14.0f} {share:>7.1%}")
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="Measure bot prompt prefix caching")
+    parser.add_argument("--games", type=int, default=3)
+    parser.add_argument("--live", action="store_true", help="Call OpenAI and report the cached_tokens it returns")
+    args = parser.parse_args(argv)
+
+    player_pool.prime(load_players(CSV_PATH))
+    if args.live:
+        asyncio.run(live(args.games))
+    else:
+        simulate(args.games)
+
+
+if __name__ == "__main__":
+    main()
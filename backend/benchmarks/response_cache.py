@@ -0,0 +1,94 @@
+"""
+Read endpoints with and without the response cache.
+
+Calls /api/players (search index in memory) and /api/bots/user/{id} (a stub
+database with --db-ms of latency) through the ASGI app, three ways: cache off
+(TTL 0), cache hits, and conditional GETs answered 304. Reports the mean
+latency and the body bytes sent per request.
+
+Usage:
+    cd backend
+    python -m benchmarks.response_cache [--requests 500] [--db-ms 20]
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+os.environ.setdefault("SUPABASE_URL", "http://127.0.0.1:9")
+os.environ.setdefault("SUPABASE_KEY", "benchmark")
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+
+from fastapi.testclient import TestClient  # noqa: E402
+from main import app  # noqa: E402
+from config import settings  # noqa: E402
+from database import get_db  # noqa: E402
+from services import player_pool, repository, response_cache  # noqa: E402
+from services.player_loader import load_players  # noqa: E402
+
+CSV_PATH = os.path.join(os.path.dirname(__file__), "..", "..", "active_players_stats.csv")
+
+BOTS = [
+    {
+        "id": f"bot-{i}",
+        "user_id": "user-1",
+        "name": f"Bot {i}",
+        "strategy_prompt": "Spend early on elite players, then fill with value picks. " * 4,
+        "created_at": "2025-01-01T00:00:00Z",
+        "updated_at": "2025-01-01T00:00:00Z",
+    }
+    for i in range(12)
+]
+
+
+def _measure(client: TestClient, url: str, requests: int, conditional: bool) -> tuple[float, float]:
+    headers = {}
+    if conditional:
+        headers["If-None-Match"] = client.get(url).headers["etag"]
+    else:
+        client.get(url)  # fill the cache
+    sent = 0
+    start = time.perf_counter()
+    for _ in range(requests):
+        r = client.get(url, headers=headers)
+        sent += len(r.content)
+    return (time.perf_counter() - start) / requests * 1000, sent / requests
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="Benchmark the read-endpoint response cache")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--db-ms", type=float, default=20.0, help="Stub database latency per query")
+    args = parser.parse_args(argv)
+
+    player_pool.prime(load_players(CSV_PATH))
+
+    async def get_user_bots(db, user_id):
+        await asyncio.sleep(args.db_ms / 1000)
+        return BOTS
+
+    repository.get_user_bots = get_user_bots
+    app.dependency_overrides[get_db] = lambda: None
+    client = TestClient(app)
+
+    routes = [
+        ("players", "/api/players?limit=200", "players_response_ttl"),
+        ("bots", "/api/bots/user/user-1", "bots_response_ttl"),
+    ]
+    print(f"{'route':<10} {'mode':<14} {'ms/request':>11} {'bytes/request':>14}")
+    for route, url, ttl_setting in routes:
+        ttl = getattr(settings, ttl_setting)
+        setattr(settings, ttl_setting, 0)
+        rows = [("cache off", _measure(client, url, args.requests, False))]
+        setattr(settings, ttl_setting, ttl)
+        response_cache.clear()
+        rows.append(("hit", _measure(client, url, args.requests, False)))
+        rows.append(("304", _measure(client, url, args.requests, True)))
+        for mode, (ms, size) in rows:
+            print(f"{route:<10} {mode:<14} {ms:>11.3f} {size:>14.0f}")
+    print(response_cache.stats())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Wire cost of a streamed game: one SSE frame per event vs batched frames.
+
+Plays the same seeded games (instant stub bots, synthetic players) through
+both encoders of services.sse and reports frames, bytes and CPU time per
+game. --client-ms makes the reader pause after every frame, like a slow
+connection. The batched stream then packs more events into each frame
+instead of buffering without limit.
+
+Usage:
+    cd backend
+    python -m benchmarks.sse_stream [--games 50] [--client-ms 0]
+"""
+
+import argparse
+import asyncio
+import time
+from benchmarks.engine_hot_loop import BOT1, BOT2, InstantBackend, synthetic_players
+from services import player_pool, sse
+from services.game_engine import run_game_stream
+
+
+async def _game_events(seed: int):
+    async for event in run_game_stream(BOT1, BOT2, seed=seed, backend=InstantBackend()):
+        yield event
+
+
+async def _stream(encoder, seed: int, client_delay: float) -> tuple[int, int]:
+    frames = size = 0
+    async for frame in encoder(_game_events(seed)):
+        frames += 1
+        size += len(frame.encode() if isinstance(frame, str) else frame)
+        if client_delay:
+            await asyncio.sleep(client_delay)
+    return frames, size
+
+
+async def _measure(encoder, games: int, client_delay: float) -> tuple[float, float, float]:
+    frames = size = 0
+    cpu = time.process_time()
+    for seed in range(games):
+        f, s = await _stream(encoder, seed, client_delay)
+        frames += f
+        size += s
+    cpu = time.process_time() - cpu
+    return frames / games, size / games, cpu / games * 1000
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="Compare per-event and batched SSE streams")
+    parser.add_argument("--games", type=int, default=50)
+    parser.add_argument("--client-ms", type=float, default=0.0, help="Reader pause after each frame")
+    args = parser.parse_args(argv)
+
+    player_pool.prime(synthetic_players())
+    client_delay = args.client_ms / 1000
+
+    rows = [
+        ("per event", asyncio.run(_measure(sse.frames, args.games, client_delay))),
+        ("batched", asyncio.run(_measure(sse.batched_frames, args.games, client_delay))),
+    ]
+    print(f"games: {args.games}, client pause per frame: {args.client_ms:.1f} ms, "
+          f"encoder: {'orjson' if sse.orjson else 'json'}")
+    print(f"{'':<10} {'frames/game':>12} {'bytes/game':>12} {'cpu ms/game':>12}")
+    for name, (frames, size, cpu) in rows:
+        print(f"{name:<10} {frames:>12.1f} {size:>12.0f} {cpu:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Do concurrent game streams keep flowing while a slow database write runs?
+
+Starts several games (heuristic bots with a small simulated LLM latency) and,
+while they stream, saves a game through a fake Supabase client whose every
+query blocks for --write-ms. This is done twice: once calling
+game_store.save_game directly on the event loop (the old behaviour), and once
+through services.repository, which offloads it to the bounded DB thread
+pool. It reports the longest gap between consecutive events seen by any
+stream. It exits non-zero if the repository path still stalls the streams;
+tests/test_stream_concurrency.py asserts the same on every test run.
+
+Usage:
+    cd backend
+    python -m benchmarks.stream_concurrency
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from benchmarks.engine_hot_loop import BOT1, BOT2, synthetic_players
+from services import game_store, player_pool, repository
+from services.bot_backends import HeuristicBackend
+from services.game_engine import run_game_stream
+
+
+class _Result:
+    def __init__(self, data: list[dict]):
+        self.data = data
+
+
+class _SlowQuery:
+    def __init__(self, delay: float, rows: list[dict]):
+        self.delay = delay
+        self.rows = rows
+
+    def execute(self) -> _Result:
+        time.sleep(self.delay)  # a blocking network round trip, like the sync client
+        return _Result(self.rows)
+
+
+class _SlowTable:
+    def __init__(self, delay: float):
+        self.delay = delay
+
+    def insert(self, row):
+        rows = row if isinstance(row, list) else [{**row, "id": "game-1", "created_at": "now"}]
+        return _SlowQuery(self.delay, rows)
+
+
+class SlowDB:
+    """Just enough of the Supabase client for game_store.save_game."""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+
+    def table(self, name: str) -> _SlowTable:
+        return _SlowTable(self.delay)
+
+
+class LatentBackend(HeuristicBackend):
+    """Heuristic bids after a short await, standing in for an LLM call."""
+
+    def __init__(self, latency: float):
+        super().__init__()
+        self.latency = latency
+
+    async def get_initial_bid(self, **kwargs):
+        await asyncio.sleep(self.latency)
+        return await super().get_initial_bid(**kwargs)
+
+    async def get_bid_response(self, **kwargs):
+        await asyncio.sleep(self.latency)
+        return await super().get_bid_response(**kwargs)
+
+
+async def _stream(seed: int, latency: float, gaps: list[float]):
+    last = time.perf_counter()
+    async for _ in run_game_stream(BOT1, BOT2, seed=seed, backend=LatentBackend(latency)):
+        now = time.perf_counter()
+        gaps.append(now - last)
+        last = now
+
+
+async def max_event_gap(offload: bool, streams: int, latency: float, write_delay: float) -> float:
+    """Longest gap between events of any stream while one save_game runs (also used by tests)."""
+    gaps: list[float] = []
+    result = {"bot1_score": 1.0, "bot2_score": 0.0, "game_log": [], "bot1_team": [], "bot2_team": []}
+    db = SlowDB(write_delay)
+
+    async def slow_write():
+        await asyncio.sleep(0.05)  # let the streams get going
+        if offload:
+            await repository.save_game(db, "user", "bot-1", "bot-2", result)
+        else:
+            game_store.save_game(db, "user", "bot-1", "bot-2", result)
+
+    await asyncio.gather(slow_write(), *(_stream(seed, latency, gaps) for seed in range(streams)))
+    return max(gaps)
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="Measure SSE stalls during a slow DB write")
+    parser.add_argument("--streams", type=int, default=8)
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="Simulated LLM latency per decision")
+    parser.add_argument("--write-ms", type=float, default=300.0, help="Blocking time per DB query")
+    args = parser.parse_args(argv)
+
+    player_pool.prime(synthetic_players())
+    latency = args.latency_ms / 1000
+    write_delay = args.write_ms / 1000
+
+    blocking = asyncio.run(max_event_gap(False, args.streams, latency, write_delay))
+    offloaded = asyncio.run(max_event_gap(True, args.streams, latency, write_delay))
+
+    print(f"streams: {args.streams}, the save_game insert blocks for {args.write_ms:.0f} ms")
+    print(f"longest event gap, write on the event loop: {blocking * 1000:.0f} ms")
+    print(f"longest event gap, write via repository:    {offloaded * 1000:.0f} ms")
+
+    # Streams should only ever wait on their own simulated LLM latency
+    if offloaded > write_delay / 2:
+        print("Streams stalled during the offloaded write")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,79 @@ class Settings(BaseSettings):
     supabase_key: str
     openai_api_key: str
 
+    # Seconds before the in-process player snapshot is reloaded from Supabase
+    player_cache_ttl: int = 3600
+
+    # Shared PostgREST connection pool (per worker)
+    db_pool_size: int = 20
+    db_keepalive_expiry: float = 30.0
+    db_timeout: float = 30.0
+    db_connect_timeout: float = 5.0
+
+    # Shared OpenAI client; base URL can point at any OpenAI-compatible server
+    openai_base_url: str | None = None
+    openai_max_connections: int = 100
+    openai_keepalive_expiry: float = 60.0
+    openai_timeout: float = 60.0
+    openai_model: str = "gpt-4o-mini"
+    openai_temperature: float = 0.7
+    # Provider rate limits (None = unlimited) and retry policy; see services.llm_scheduler
+    openai_rpm: int | None = None
+    openai_tpm: int | None = None
+    openai_max_retries: int = 5
+    openai_backoff_base: float = 0.5
+    openai_backoff_max: float = 30.0
+    # Approximate input-token cap per bid prompt; trims the player table to fit
+    prompt_token_budget: int | None = None
+    # Default scoring profile for games (see services.scoring.PROFILES)
+    scoring_profile: str = "standard"
+    # Prefetch the next nomination while a bid response is pending
+    speculative_bids: bool = False
+
+    # Bot decision cache: None = only when openai_temperature is 0
+    llm_cache: bool | None = None
+    llm_cache_size: int = 10000
+    llm_cache_path: str | None = None
+
+    # Build the DB client and warm the leaderboard at startup. Turn off on
+    # serverless, where every cold start would pay for it before the first byte
+    warmup_on_startup: bool = True
+
+    # Bot rows cached by id for starting games; edits through other workers
+    # show up after bot_cache_ttl seconds
+    bot_cache_ttl: int = 300
+    bot_cache_size: int = 5000
+
+    # Seconds before a worker re-reads the top-K leaderboard from the database
+    leaderboard_ttl: int = 60
+
+    # Per-worker cache for the read endpoints (see services.response_cache):
+    # seconds a response is reused before it's rebuilt, 0 = ETags only
+    response_cache_size: int = 1000
+    players_response_ttl: int = 300
+    leaderboard_response_ttl: int = 30
+    bots_response_ttl: int = 30
+
+    # Events a batched game stream buffers before the game waits on a slow client
+    sse_queue_size: int = 64
+
+    # Fraction of games traced (0 = off), and where traces go: "chrome"
+    # (Perfetto) or "otlp" JSON files in trace_dir. PUT /api/tracing overrides
+    # both in every worker through trace_control_path (re-read at most every
+    # trace_control_interval seconds); the file outlives restarts.
+    trace_sample_rate: float = 0.0
+    trace_format: str = "chrome"
+    trace_dir: str = "traces"
+    trace_control_path: str = "trace_control.json"
+    trace_control_interval: float = 5.0
+
+    # Sent as X-Admin-Token to the admin endpoints (PUT /api/tracing); unset disables them
+    admin_token: str = ""
+
+    # Resumable games: "none", "supabase", "sqlite" (file path) or "file" (directory)
+    checkpoint_store: str = "none"
+    checkpoint_path: str = "checkpoints.db"
+
     model_config = {"env_file": ".env"}
 
 
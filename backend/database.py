@@ -1,6 +1,86 @@
-from supabase import create_client, Client
+import os
+import threading
+import time
+from typing import TYPE_CHECKING, Any
 from config import settings
 
+if TYPE_CHECKING:
+    from supabase import Client
+else:
+    # For annotations only: supabase (and its auth/realtime/storage clients)
+    # is imported when the first query builds the client, not at startup
+    Client = Any
+
+_client: Client | None = None
+_lock = threading.Lock()
+
+
+def _build_client() -> Client:
+    import httpx
+    from postgrest.utils import SyncClient
+    from supabase import create_client
+    from supabase.lib.client_options import ClientOptions
+
+    options = ClientOptions(
+        postgrest_client_timeout=httpx.Timeout(settings.db_timeout, connect=settings.db_connect_timeout),
+    )
+    client = create_client(settings.supabase_url, settings.supabase_key, options=options)
+
+    # Swap PostgREST's default session for one with an explicit keep-alive pool
+    postgrest = client.postgrest
+    default_session = postgrest.session
+    postgrest.session = SyncClient(
+        base_url=default_session.base_url,
+        headers=default_session.headers,
+        timeout=default_session.timeout,
+        follow_redirects=True,
+        http2=True,
+        limits=httpx.Limits(
+            max_connections=settings.db_pool_size,
+            max_keepalive_connections=settings.db_pool_size,
+            keepalive_expiry=settings.db_keepalive_expiry,
+        ),
+    )
+    default_session.close()
+    return client
+
 
 def get_supabase() -> Client:
-    return create_client(settings.supabase_url, settings.supabase_key)
+    """Return the worker's shared Supabase client, creating it on first use."""
+    global _client
+    if _client is None:
+        with _lock:
+            if _client is None:
+                _client = _build_client()
+    return _client
+
+
+def get_db() -> Client:
+    """FastAPI dependency for the shared Supabase client."""
+    return get_supabase()
+
+
+def init_supabase() -> Client:
+    return get_supabase()
+
+
+def close_supabase():
+    global _client
+    with _lock:
+        if _client is not None:
+            _client.postgrest.session.close()
+            _client = None
+
+
+def check_health() -> dict:
+    """Round-trip a trivial query over this worker's pooled connection."""
+    start = time.perf_counter()
+    try:
+        get_supabase().table("players").select("id").limit(1).execute()
+    except Exception as e:
+        return {"status": "error", "pid": os.getpid(), "error": str(e)}
+    return {
+        "status": "ok",
+        "pid": os.getpid(),
+        "latency_ms": round((time.perf_counter() - start) * 1000, 1),
+    }
@@ -1,8 +1,34 @@
-from fastapi import FastAPI
+import logging
+import secrets
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Header, HTTPException, Response
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
+from config import settings
+from database import init_supabase, close_supabase, check_health
+from models import TracingConfig
+from services import bot_cache, leaderboard_cache, llm_cache, llm_scheduler, metrics, response_cache, tracing
+from services.bot_brain import close_client as close_openai_client
 from routers import users, bots, games, leaderboard, players
 
-app = FastAPI(title="Fantasy Basketball Bidding API")
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.warmup_on_startup:
+        init_supabase()
+        try:
+            leaderboard_cache.warm()
+        except Exception as e:
+            # The first leaderboard request retries the warm-up
+            logger.warning("Leaderboard warm-up failed: %s", e)
+    yield
+    await close_openai_client()
+    close_supabase()
+
+
+app = FastAPI(title="Fantasy Basketball Bidding API", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -22,3 +48,61 @@ app.include_router(players.router, prefix="/api")
 @app.get("/api/health")
 def health():
     return {"status": "ok"}
+
+
+@app.get("/api/health/db")
+def health_db(response: Response):
+    result = check_health()
+    if result["status"] != "ok":
+        response.status_code = 503
+    return result
+
+
+@app.get("/api/health/llm")
+async def health_llm():
+    """LLM admission queue depth, waits and rate-limit retries for this worker."""
+    return llm_scheduler.stats()
+
+
+@app.get("/api/health/cache")
+def health_cache():
+    """Response cache hit rate per route, bot cache and LLM decision cache hits, for this worker."""
+    return {**response_cache.stats(), "bot_cache": bot_cache.stats(), "llm_cache": llm_cache.stats()}
+
+
+@app.get("/api/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """This worker's metrics in the Prometheus text format."""
+    llm = llm_scheduler.stats()
+    body = metrics.render(
+        [
+            ("llm_queue_depth", "gauge", "OpenAI calls waiting for the rate limiter", llm["queue_depth"]),
+            ("llm_in_flight", "gauge", "OpenAI calls currently in progress", llm["in_flight"]),
+            ("llm_rate_limited_total", "counter", "OpenAI calls rejected with a rate-limit error", llm["rate_limited"]),
+        ]
+    )
+    return PlainTextResponse(body, media_type="text/plain; version=0.0.4")
+
+
+@app.get("/api/tracing")
+def get_tracing():
+    """Sampling rate and trace format (TRACE_SAMPLE_RATE / TRACE_FORMAT unless overridden by PUT)."""
+    return tracing.config()
+
+
+@app.put("/api/tracing")
+def set_tracing(body: TracingConfig, x_admin_token: str | None = Header(default=None)):
+    """
+    Trace a fraction of new games in every worker, e.g. {"sample_rate": 0.05, "format": "otlp"}.
+    Needs X-Admin-Token to match ADMIN_TOKEN; disabled while ADMIN_TOKEN is unset.
+    """
+    if not settings.admin_token:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if x_admin_token is None or not secrets.compare_digest(
+        x_admin_token.encode(), settings.admin_token.encode()
+    ):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+    try:
+        return tracing.set_shared(body.sample_rate, body.format)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
@@ -0,0 +1,14 @@
+-- Leaderboard columns for databases created before best_score existed.
+-- Safe to re-run: only rows that haven't been backfilled are updated.
+
+ALTER TABLE games ADD COLUMN IF NOT EXISTS best_score FLOAT;
+ALTER TABLE games ADD COLUMN IF NOT EXISTS best_bot_id UUID REFERENCES bots(id) ON DELETE SET NULL;
+
+UPDATE games
+SET best_score = GREATEST(bot1_score, bot2_score),
+    best_bot_id = CASE WHEN bot1_score >= bot2_score THEN bot1_id ELSE bot2_id END
+WHERE best_score IS NULL
+  AND bot1_score IS NOT NULL
+  AND bot2_score IS NOT NULL;
+
+CREATE INDEX IF NOT EXISTS idx_games_best_score ON games(best_score DESC) WHERE status = 'complete';
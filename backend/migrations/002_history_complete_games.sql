@@ -0,0 +1,5 @@
+-- Game history only lists complete games; streamed games that never finish
+-- stay 'in_progress' or become 'abandoned'. Make the history index partial.
+
+DROP INDEX IF EXISTS idx_games_user_created;
+CREATE INDEX idx_games_user_created ON games(user_id, created_at DESC, id DESC) WHERE status = 'complete';
@@ -0,0 +1,9 @@
+-- Record the scoring profile each game was scored under. The leaderboard
+-- ranks one profile at a time, so its index leads with the profile.
+-- Existing rows are marked 'standard': games saved before this column
+-- existed didn't record their profile, and 'standard' was the default.
+
+ALTER TABLE games ADD COLUMN IF NOT EXISTS scoring_profile TEXT NOT NULL DEFAULT 'standard';
+
+DROP INDEX IF EXISTS idx_games_best_score;
+CREATE INDEX idx_games_best_score ON games(scoring_profile, best_score DESC) WHERE status = 'complete';
@@ -0,0 +1,10 @@
+-- A resumed game that had already saved its picks inserted them again.
+-- Drop those duplicates, then make (game_id, player_id) unique so the save
+-- upserts; the new index also serves the by-game lookups.
+
+DELETE FROM game_players a
+USING game_players b
+WHERE a.game_id = b.game_id AND a.player_id = b.player_id AND a.id > b.id;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_game_players_game_player ON game_players(game_id, player_id);
+DROP INDEX IF EXISTS idx_game_players_game_id;
@@ -42,6 +42,7 @@ class GameRequest(BaseModel):
     user_id: str
     bot1_id: str
     bot2_id: str
+    scoring_profile: Optional[str] = None
 
 
 class GamePlayerResult(BaseModel):
@@ -64,12 +65,20 @@ class GameResponse(BaseModel):
     bot2_score: float
     winner_bot_id: Optional[str]
     status: str
-    game_log: list[str]
+    scoring_profile: str = "standard"  # scores are only comparable within a profile
+    game_log: list[str] = []  # empty in history; pages come from GET /games/{id}/log
     bot1_team: list[GamePlayerResult]
     bot2_team: list[GamePlayerResult]
     created_at: str
 
 
+class GameLogPage(BaseModel):
+    game_id: str
+    offset: int
+    lines: list[str]
+    next_offset: Optional[int]
+
+
 # --- Players ---
 
 class PlayerResponse(BaseModel):
@@ -96,6 +105,13 @@ class LeaderboardEntry(BaseModel):
     created_at: str
 
 
+# --- Tracing ---
+
+class TracingConfig(BaseModel):
+    sample_rate: Optional[float] = None
+    format: Optional[str] = None
+
+
 # --- Bot Brain ---
 
 class BotBidAction(BaseModel):
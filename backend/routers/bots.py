@@ -1,57 +1,46 @@
-from fastapi import APIRouter, HTTPException
-from database import get_supabase
+from fastapi import APIRouter, HTTPException, Depends, Request
+from pydantic import TypeAdapter
+from config import settings
+from database import Client, get_db
 from models import BotCreate, BotUpdate, BotResponse
+from services import repository, response_cache
 
 router = APIRouter(tags=["bots"])
 
+_bots = TypeAdapter(list[BotResponse])
+
 
 @router.post("/bots", response_model=BotResponse)
-def create_bot(body: BotCreate):
-    db = get_supabase()
-    result = (
-        db.table("bots")
-        .insert(
-            {
-                "user_id": body.user_id,
-                "name": body.name,
-                "strategy_prompt": body.strategy_prompt,
-            }
-        )
-        .execute()
-    )
-    if not result.data:
+async def create_bot(body: BotCreate, db: Client = Depends(get_db)):
+    bot = await repository.create_bot(db, body.user_id, body.name, body.strategy_prompt)
+    if bot is None:
         raise HTTPException(status_code=500, detail="Failed to create bot")
-    return result.data[0]
+    return bot
 
 
 @router.get("/bots/user/{user_id}", response_model=list[BotResponse])
-def get_user_bots(user_id: str):
-    db = get_supabase()
-    result = (
-        db.table("bots")
-        .select("*")
-        .eq("user_id", user_id)
-        .order("created_at", desc=False)
-        .execute()
+async def get_user_bots(user_id: str, request: Request, db: Client = Depends(get_db)):
+    async def build(headers: dict[str, str]):
+        return await repository.get_user_bots(db, user_id)
+
+    return await response_cache.respond(
+        request, "bots", settings.bots_response_ttl, (f"bots:{user_id}",), _bots, build
     )
-    return result.data
 
 
 @router.put("/bots/{bot_id}", response_model=BotResponse)
-def update_bot(bot_id: str, body: BotUpdate):
-    db = get_supabase()
+async def update_bot(bot_id: str, body: BotUpdate, db: Client = Depends(get_db)):
     updates = {k: v for k, v in body.model_dump().items() if v is not None}
     if not updates:
         raise HTTPException(status_code=400, detail="No fields to update")
     updates["updated_at"] = "now()"
-    result = db.table("bots").update(updates).eq("id", bot_id).execute()
-    if not result.data:
+    bot = await repository.update_bot(db, bot_id, updates)
+    if bot is None:
         raise HTTPException(status_code=404, detail="Bot not found")
-    return result.data[0]
+    return bot
 
 
 @router.delete("/bots/{bot_id}")
-def delete_bot(bot_id: str):
-    db = get_supabase()
-    db.table("bots").delete().eq("id", bot_id).execute()
+async def delete_bot(bot_id: str, db: Client = Depends(get_db)):
+    await repository.delete_bot(db, bot_id)
     return {"ok": True}
@@ -1,79 +1,57 @@
-import json
-from fastapi import APIRouter, HTTPException
+import logging
+import uuid
+from datetime import datetime
+import anyio
+from fastapi import APIRouter, HTTPException, Depends, Query
 from fastapi.responses import StreamingResponse
-from database import get_supabase
-from models import GameRequest, GameResponse, GamePlayerResult
+from database import Client, get_db
+from models import GameRequest, GameResponse, GamePlayerResult, GameLogPage
+from services import repository, sse, tracing
+from services.checkpoints import CheckpointInUse, GameCheckpointer, get_store, valid_game_key
+from services.game_log import GameLogWriter
 from services.game_engine import run_game, run_game_stream
+from services.scoring import PROFILES
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(tags=["games"])
 
+# A game drafts at most 24 players; keeps one page of picks under PostgREST's
+# default 1000-row response cap
+MAX_GAMES_PAGE = 40
 
-@router.post("/games", response_model=GameResponse)
-async def create_game(body: GameRequest):
-    db = get_supabase()
 
-    # Load both bots
-    bot1_res = db.table("bots").select("*").eq("id", body.bot1_id).execute()
-    bot2_res = db.table("bots").select("*").eq("id", body.bot2_id).execute()
+def _check_scoring_profile(name: str | None):
+    if name is not None and name not in PROFILES:
+        raise HTTPException(status_code=400, detail=f"Unknown scoring profile {name!r}")
+
 
-    if not bot1_res.data or not bot2_res.data:
+async def _load_bots(db: Client, body: GameRequest) -> tuple[dict, dict]:
+    bots = await repository.get_bots(db, [body.bot1_id, body.bot2_id])
+    if body.bot1_id not in bots or body.bot2_id not in bots:
         raise HTTPException(status_code=404, detail="One or both bots not found")
+    return bots[body.bot1_id], bots[body.bot2_id]
+
+
+@router.post("/games", response_model=GameResponse)
+async def create_game(body: GameRequest, db: Client = Depends(get_db)):
+    _check_scoring_profile(body.scoring_profile)
 
-    bot1 = bot1_res.data[0]
-    bot2 = bot2_res.data[0]
-
-    # Run the game
-    result = await run_game(bot1, bot2)
-
-    # Determine winner
-    winner_bot_id = None
-    if result["bot1_score"] > result["bot2_score"]:
-        winner_bot_id = body.bot1_id
-    elif result["bot2_score"] > result["bot1_score"]:
-        winner_bot_id = body.bot2_id
-
-    # Save game record
-    game_row = {
-        "user_id": body.user_id,
-        "bot1_id": body.bot1_id,
-        "bot2_id": body.bot2_id,
-        "bot1_score": result["bot1_score"],
-        "bot2_score": result["bot2_score"],
-        "winner_bot_id": winner_bot_id,
-        "status": "complete",
-        "game_log": result["game_log"],
-    }
-    game_res = db.table("games").insert(game_row).execute()
-    if not game_res.data:
+    # Load both bots
+    bot1, bot2 = await _load_bots(db, body)
+
+    trace = tracing.start("game", bot1=bot1["name"], bot2=bot2["name"])
+    try:
+        # Run the game
+        result = await run_game(bot1, bot2, scoring_profile=body.scoring_profile)
+
+        # Save game record and drafted players
+        with tracing.span("save_game"):
+            game = await repository.save_game(db, body.user_id, body.bot1_id, body.bot2_id, result)
+    finally:
+        tracing.finish(trace)
+    if game is None:
         raise HTTPException(status_code=500, detail="Failed to save game")
-    game = game_res.data[0]
-
-    # Save drafted players
-    draft_rows = []
-    for order, pick in enumerate(result["bot1_team"]):
-        draft_rows.append(
-            {
-                "game_id": game["id"],
-                "bot_id": body.bot1_id,
-                "player_id": pick["player_id"],
-                "bid_amount": pick["bid_amount"],
-                "fantasy_points": pick["fantasy_points"],
-                "draft_order": order + 1,
-            }
-        )
-    for order, pick in enumerate(result["bot2_team"]):
-        draft_rows.append(
-            {
-                "game_id": game["id"],
-                "bot_id": body.bot2_id,
-                "player_id": pick["player_id"],
-                "bid_amount": pick["bid_amount"],
-                "fantasy_points": pick["fantasy_points"],
-                "draft_order": order + 1,
-            }
-        )
-    if draft_rows:
-        db.table("game_players").insert(draft_rows).execute()
 
     # Build response with player details
     def build_team_response(team_picks):
@@ -100,8 +78,9 @@ async def create_game(body: GameRequest):
         bot2_name=bot2["name"],
         bot1_score=result["bot1_score"],
         bot2_score=result["bot2_score"],
-        winner_bot_id=winner_bot_id,
+        winner_bot_id=game["winner_bot_id"],
         status="complete",
+        scoring_profile=game["scoring_profile"],
         game_log=result["game_log"],
         bot1_team=build_team_response(result["bot1_team"]),
         bot2_team=build_team_response(result["bot2_team"]),
@@ -109,78 +88,136 @@ async def create_game(body: GameRequest):
     )
 
 
+# Opt-in lean wire format, see services.sse.batched_frames
+BATCH_QUERY = Query(False, description="Coalesce events into batch frames and end with a game log digest")
+
+
 @router.post("/games/stream")
-async def stream_game(body: GameRequest):
-    db = get_supabase()
+async def stream_game(body: GameRequest, batch: bool = BATCH_QUERY, db: Client = Depends(get_db)):
+    _check_scoring_profile(body.scoring_profile)
+
+    bot1, bot2 = await _load_bots(db, body)
+
+    # The row exists from the start so the log can be stored while the game runs
+    game = await repository.start_game(db, body.user_id, body.bot1_id, body.bot2_id)
+    if game is None:
+        raise HTTPException(status_code=500, detail="Failed to create game")
+    log = GameLogWriter(game["id"])
+
+    checkpoint = None
+    store = get_store()
+    if store is not None:
+        meta = {
+            "user_id": body.user_id,
+            "bot1": bot1,
+            "bot2": bot2,
+            "scoring_profile": body.scoring_profile,
+            "game_id": game["id"],
+        }
+        checkpoint = await GameCheckpointer.start(store, uuid.uuid4().hex, meta)
+
+    return _sse_response(
+        _game_events(db, body.user_id, bot1, bot2, checkpoint, body.scoring_profile, log), batch
+    )
 
-    bot1_res = db.table("bots").select("*").eq("id", body.bot1_id).execute()
-    bot2_res = db.table("bots").select("*").eq("id", body.bot2_id).execute()
 
-    if not bot1_res.data or not bot2_res.data:
-        raise HTTPException(status_code=404, detail="One or both bots not found")
+@router.post("/games/resume/{game_key}")
+async def resume_game(game_key: str, batch: bool = BATCH_QUERY, db: Client = Depends(get_db)):
+    """Continue an interrupted streamed game from its last checkpoint."""
+    store = get_store()
+    if store is None:
+        raise HTTPException(status_code=404, detail="Checkpointing is disabled")
+    if not valid_game_key(game_key):
+        raise HTTPException(status_code=400, detail="Invalid game key")
+    try:
+        checkpoint = await GameCheckpointer.resume(store, game_key)
+    except CheckpointInUse:
+        raise HTTPException(status_code=409, detail="Game is already being resumed")
+    if checkpoint is None:
+        raise HTTPException(status_code=404, detail="Checkpoint not found")
+
+    if checkpoint.status == "complete":
+        async def already_saved():
+            yield {"type": "saved", "game_id": checkpoint.game_id}
+
+        return _sse_response(already_saved(), batch)
+
+    meta = checkpoint.meta
+    # Checkpoints from before chunked logs carry the whole log in the snapshot
+    log = None
+    if "game_id" in meta:
+        log = GameLogWriter(meta["game_id"])
+        await repository.reopen_game(db, meta["game_id"])
+    return _sse_response(
+        _game_events(db, meta["user_id"], meta["bot1"], meta["bot2"], checkpoint, meta.get("scoring_profile"), log),
+        batch,
+    )
 
-    bot1 = bot1_res.data[0]
-    bot2 = bot2_res.data[0]
 
-    async def event_generator():
-        game_result = None
-        async for event in run_game_stream(bot1, bot2):
-            event_type = event["type"]
-            yield f"event: {event_type}\ndata: {json.dumps(event)}\n\n"
+async def _game_events(
+    db: Client,
+    user_id: str,
+    bot1: dict,
+    bot2: dict,
+    checkpoint: GameCheckpointer | None,
+    scoring_profile: str | None,
+    log: GameLogWriter | None = None,
+):
+    trace = tracing.start(
+        "game", bot1=bot1["name"], bot2=bot2["name"], game_id=log.game_id if log is not None else ""
+    )
+    game = None
+    try:
+        if checkpoint is not None:
+            yield {"type": "checkpoint", "game_key": checkpoint.game_key}
+        if log is not None:
+            yield {"type": "game_started", "game_id": log.game_id}
 
-            if event_type == "game_complete":
+        game_result = None
+        async for event in run_game_stream(
+            bot1, bot2, checkpoint=checkpoint, scoring_profile=scoring_profile, game_log=log
+        ):
+            if event["type"] == "game_complete":
                 game_result = event
+                if log is not None:
+                    # The lines have all been streamed; the writer stays on game_result
+                    event = {k: v for k, v in event.items() if k != "game_log"}
+                    event["game_log_digest"] = log.digest()
+            elif log is not None:
+                await repository.save_log_chunks(db, log.take_chunks())
+            yield event
 
         # Save to DB after game completes
         if game_result:
-            winner_bot_id = None
-            if game_result["bot1_score"] > game_result["bot2_score"]:
-                winner_bot_id = body.bot1_id
-            elif game_result["bot2_score"] > game_result["bot1_score"]:
-                winner_bot_id = body.bot2_id
-
-            game_row = {
-                "user_id": body.user_id,
-                "bot1_id": body.bot1_id,
-                "bot2_id": body.bot2_id,
-                "bot1_score": game_result["bot1_score"],
-                "bot2_score": game_result["bot2_score"],
-                "winner_bot_id": winner_bot_id,
-                "status": "complete",
-                "game_log": game_result["game_log"],
-            }
-            game_res = db.table("games").insert(game_row).execute()
-
-            if game_res.data:
-                game = game_res.data[0]
-                game_id = game["id"]
-
-                draft_rows = []
-                for order, pick in enumerate(game_result["bot1_team"]):
-                    draft_rows.append({
-                        "game_id": game_id,
-                        "bot_id": body.bot1_id,
-                        "player_id": pick["player_id"],
-                        "bid_amount": pick["bid_amount"],
-                        "fantasy_points": pick["fantasy_points"],
-                        "draft_order": order + 1,
-                    })
-                for order, pick in enumerate(game_result["bot2_team"]):
-                    draft_rows.append({
-                        "game_id": game_id,
-                        "bot_id": body.bot2_id,
-                        "player_id": pick["player_id"],
-                        "bid_amount": pick["bid_amount"],
-                        "fantasy_points": pick["fantasy_points"],
-                        "draft_order": order + 1,
-                    })
-                if draft_rows:
-                    db.table("game_players").insert(draft_rows).execute()
-
-                yield f"event: saved\ndata: {json.dumps({'game_id': game_id})}\n\n"
-
+            with tracing.span("save_game"):
+                game = await repository.save_game(
+                    db, user_id, bot1["id"], bot2["id"], game_result, log.game_id if log is not None else None
+                )
+                if checkpoint is not None:
+                    await checkpoint.finish(game["id"] if game else None)
+            if game:
+                yield {"type": "saved", "game_id": game["id"]}
+    finally:
+        if log is not None and game is None:
+            await _abandon(db, log.game_id)
+        if checkpoint is not None:
+            checkpoint.release()
+        tracing.finish(trace)
+
+
+async def _abandon(db: Client, game_id: str):
+    """Mark a streamed game that ended unsaved (disconnect, error) abandoned."""
+    # Shielded: on a client disconnect the stream's scope is already cancelled
+    with anyio.CancelScope(shield=True):
+        try:
+            await repository.abandon_game(db, game_id)
+        except Exception as e:
+            logger.warning("Failed to mark game %s abandoned: %s", game_id, e)
+
+
+def _sse_response(events, batch: bool = False) -> StreamingResponse:
     return StreamingResponse(
-        event_generator(),
+        sse.batched_frames(events) if batch else sse.frames(events),
         media_type="text/event-stream",
         headers={
             "Cache-Control": "no-cache",
@@ -191,32 +228,22 @@ async def stream_game(body: GameRequest):
 
 
 @router.get("/games/user/{user_id}", response_model=list[GameResponse])
-def get_user_games(user_id: str):
-    db = get_supabase()
-
-    games_res = (
-        db.table("games")
-        .select("*, bots!games_bot1_id_fkey(name), bot2:bots!games_bot2_id_fkey(name)")
-        .eq("user_id", user_id)
-        .order("created_at", desc=True)
-        .limit(20)
-        .execute()
-    )
+async def get_user_games(
+    user_id: str,
+    limit: int = Query(20, ge=1, le=MAX_GAMES_PAGE),
+    before: datetime | None = Query(None, description="created_at of the last game on the previous page"),
+    before_id: uuid.UUID | None = Query(None, description="id of that game, to break created_at ties"),
+    db: Client = Depends(get_db),
+):
+    # Keyset pagination on (created_at, id): each page is an index range scan,
+    # and the page's drafted players come back in one more query
+    games, picks_by_game = await repository.get_user_games(db, user_id, limit, before, before_id)
 
     results = []
-    for g in games_res.data:
-        # Get game players
-        gp_res = (
-            db.table("game_players")
-            .select("*, players(first_name, last_name)")
-            .eq("game_id", g["id"])
-            .order("draft_order")
-            .execute()
-        )
-
+    for g in games:
         bot1_team = []
         bot2_team = []
-        for gp in gp_res.data:
+        for gp in picks_by_game[g["id"]]:
             item = GamePlayerResult(
                 player_id=gp["player_id"],
                 first_name=gp["players"]["first_name"],
@@ -245,7 +272,7 @@ def get_user_games(user_id: str):
                 bot2_score=g["bot2_score"],
                 winner_bot_id=g["winner_bot_id"],
                 status=g["status"],
-                game_log=g["game_log"] or [],
+                scoring_profile=g["scoring_profile"],
                 bot1_team=bot1_team,
                 bot2_team=bot2_team,
                 created_at=g["created_at"],
@@ -253,3 +280,17 @@ def get_user_games(user_id: str):
         )
 
     return results
+
+
+@router.get("/games/{game_id}/log", response_model=GameLogPage)
+async def get_game_log(
+    game_id: str,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(200, ge=1, le=1000),
+    db: Client = Depends(get_db),
+):
+    page = await repository.get_game_log(db, game_id, offset, limit)
+    if page is None:
+        raise HTTPException(status_code=404, detail="Game not found")
+    lines, more = page
+    return GameLogPage(game_id=game_id, offset=offset, lines=lines, next_offset=offset + len(lines) if more else None)
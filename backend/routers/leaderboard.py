@@ -1,46 +1,33 @@
-from fastapi import APIRouter, Query
-from database import get_supabase
+from fastapi import APIRouter, Query, Depends, Request
+from pydantic import TypeAdapter
+from config import settings
+from database import Client, get_db
 from models import LeaderboardEntry
+from services import leaderboard_cache, repository, response_cache
 
 router = APIRouter(tags=["leaderboard"])
 
+_entries = TypeAdapter(list[LeaderboardEntry])
 
-@router.get("/leaderboard", response_model=list[LeaderboardEntry])
-def get_leaderboard(limit: int = Query(20, ge=1, le=100)):
-    db = get_supabase()
 
-    # Get top game scores with user and bot names
-    result = (
-        db.table("games")
-        .select("id, bot1_score, bot2_score, winner_bot_id, created_at, user_id, users(username), bots!games_bot1_id_fkey(name), bot2:bots!games_bot2_id_fkey(name)")
-        .eq("status", "complete")
-        .order("bot1_score", desc=True)  # We'll sort in code since we need max of bot1/bot2
-        .limit(limit * 2)  # Fetch extra since we re-sort
-        .execute()
+@router.get("/leaderboard", response_model=list[LeaderboardEntry])
+async def get_leaderboard(
+    request: Request,
+    limit: int = Query(20, ge=1, le=leaderboard_cache.CAPACITY),
+    db: Client = Depends(get_db),
+):
+    async def build(headers: dict[str, str]):
+        return [
+            {
+                "game_id": e["game_id"],
+                "username": e["username"],
+                "bot_name": e["bot_name"],
+                "score": e["score"],
+                "created_at": e["created_at"],
+            }
+            for e in await repository.get_leaderboard(db, limit)
+        ]
+
+    return await response_cache.respond(
+        request, "leaderboard", settings.leaderboard_response_ttl, ("leaderboard",), _entries, build
     )
-
-    entries = []
-    for g in result.data:
-        # Determine winning score and which bot won
-        if g["bot1_score"] >= g["bot2_score"]:
-            score = g["bot1_score"]
-            bot_name = g["bots"]["name"] if g.get("bots") else "Bot 1"
-        else:
-            score = g["bot2_score"]
-            bot_name = g["bot2"]["name"] if g.get("bot2") else "Bot 2"
-
-        username = g["users"]["username"] if g.get("users") else "Unknown"
-
-        entries.append(
-            LeaderboardEntry(
-                game_id=g["id"],
-                username=username,
-                bot_name=bot_name,
-                score=score,
-                created_at=g["created_at"],
-            )
-        )
-
-    # Sort by score descending and take top N
-    entries.sort(key=lambda e: e.score, reverse=True)
-    return entries[:limit]
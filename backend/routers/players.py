@@ -1,28 +1,38 @@
-from fastapi import APIRouter, Query
-from database import get_supabase
+from fastapi import APIRouter, HTTPException, Query, Request
+from pydantic import TypeAdapter
+from config import settings
 from models import PlayerResponse
+from services import player_search, repository, response_cache
 
 router = APIRouter(tags=["players"])
 
+_players = TypeAdapter(list[PlayerResponse])
+
 
 @router.get("/players", response_model=list[PlayerResponse])
-def list_players(
+async def list_players(
+    request: Request,
     search: str = Query("", description="Search by name"),
     limit: int = Query(50, ge=1, le=200),
-    offset: int = Query(0, ge=0),
+    cursor: str | None = Query(None, description="X-Next-Cursor from the previous page"),
+    offset: int = Query(0, ge=0, description="Deprecated; use cursor"),
 ):
-    db = get_supabase()
-    query = db.table("players").select("*")
+    after = None
+    if cursor:
+        try:
+            after = player_search.decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
 
-    if search:
-        query = query.or_(
-            f"first_name.ilike.%{search}%,last_name.ilike.%{search}%"
-        )
+    async def build(headers: dict[str, str]):
+        index = await repository.get_player_index()
+        page, next_key = index.search(search, offset + limit, after)
+        if offset:
+            page = page[offset:]
+        if next_key is not None:
+            headers["X-Next-Cursor"] = player_search.encode_cursor(next_key)
+        return page
 
-    result = (
-        query
-        .order("fantasy_points", desc=True)
-        .range(offset, offset + limit - 1)
-        .execute()
+    return await response_cache.respond(
+        request, "players", settings.players_response_ttl, ("players",), _players, build
     )
-    return result.data
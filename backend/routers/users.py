@@ -1,23 +1,22 @@
-from fastapi import APIRouter, HTTPException
-from database import get_supabase
+from fastapi import APIRouter, HTTPException, Depends
+from database import Client, get_db
 from models import UserCreate, UserResponse
+from services import repository
 
 router = APIRouter(tags=["users"])
 
 
 @router.post("/users", response_model=UserResponse)
-def create_user(body: UserCreate):
-    db = get_supabase()
-    result = db.table("users").insert({"username": body.username}).execute()
-    if not result.data:
+async def create_user(body: UserCreate, db: Client = Depends(get_db)):
+    user = await repository.create_user(db, body.username)
+    if user is None:
         raise HTTPException(status_code=500, detail="Failed to create user")
-    return result.data[0]
+    return user
 
 
 @router.get("/users/{user_id}", response_model=UserResponse)
-def get_user(user_id: str):
-    db = get_supabase()
-    result = db.table("users").select("*").eq("id", user_id).execute()
-    if not result.data:
+async def get_user(user_id: str, db: Client = Depends(get_db)):
+    user = await repository.get_user(db, user_id)
+    if user is None:
         raise HTTPException(status_code=404, detail="User not found")
-    return result.data[0]
+    return user
@@ -49,7 +49,15 @@ CREATE TABLE games (
     bot1_score FLOAT DEFAULT 0,
     bot2_score FLOAT DEFAULT 0,
     winner_bot_id UUID REFERENCES bots(id) ON DELETE SET NULL,
+    -- Denormalized leaderboard score: the higher of the two scores and its bot
+    best_score FLOAT,
+    best_bot_id UUID REFERENCES bots(id) ON DELETE SET NULL,
+    -- Scoring profile the scores were computed under (services.scoring.PROFILES)
+    scoring_profile TEXT NOT NULL DEFAULT 'standard',
+    -- 'in_progress' while a streamed game runs, then 'complete', or 'abandoned'
+    -- if its stream ended first (resuming the checkpoint can still complete it)
     status TEXT NOT NULL DEFAULT 'pending',
+    -- Only games saved before game_log_chunks existed have a log here
     game_log JSONB DEFAULT '[]'::jsonb,
     created_at TIMESTAMPTZ DEFAULT now()
 );
@@ -65,10 +73,43 @@ CREATE TABLE game_players (
     draft_order INTEGER NOT NULL
 );
 
+-- Game log lines in chunks of 64: zlib-compressed JSON arrays, base64 encoded
+CREATE TABLE game_log_chunks (
+    game_id UUID NOT NULL REFERENCES games(id) ON DELETE CASCADE,
+    seq INTEGER NOT NULL,
+    line_count INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (game_id, seq)
+);
+
+-- Checkpoints of in-progress games (used when CHECKPOINT_STORE=supabase)
+CREATE TABLE game_checkpoints (
+    game_key TEXT PRIMARY KEY,
+    meta JSONB NOT NULL,
+    snapshot JSONB,
+    status TEXT NOT NULL DEFAULT 'running',
+    game_id UUID REFERENCES games(id) ON DELETE SET NULL,
+    created_at TIMESTAMPTZ DEFAULT now(),
+    updated_at TIMESTAMPTZ DEFAULT now()
+);
+
+-- Bot decisions journaled during a checkpointed game, in call order
+CREATE TABLE game_decisions (
+    game_key TEXT NOT NULL REFERENCES game_checkpoints(game_key) ON DELETE CASCADE,
+    seq INTEGER NOT NULL,
+    decision JSONB NOT NULL,
+    PRIMARY KEY (game_key, seq)
+);
+
 -- Indexes
-CREATE INDEX idx_games_user_id ON games(user_id);
+CREATE INDEX idx_games_user_created ON games(user_id, created_at DESC, id DESC) WHERE status = 'complete';
 CREATE INDEX idx_bots_user_id ON bots(user_id);
-CREATE INDEX idx_game_players_game_id ON game_players(game_id);
+-- Unique so a resumed game's save can upsert its picks instead of duplicating them
+CREATE UNIQUE INDEX idx_game_players_game_player ON game_players(game_id, player_id);
+CREATE INDEX idx_games_best_score ON games(scoring_profile, best_score DESC) WHERE status = 'complete';
+
+-- Existing databases: apply the files in migrations/ in order (each is safe to re-run)
+-- Existing databases: create game_log_chunks above; old games keep their inline game_log
 
 -- RLS: Enable with permissive policies (hackathon mode)
 ALTER TABLE users ENABLE ROW LEVEL SECURITY;
@@ -76,9 +117,15 @@ ALTER TABLE players ENABLE ROW LEVEL SECURITY;
 ALTER TABLE bots ENABLE ROW LEVEL SECURITY;
 ALTER TABLE games ENABLE ROW LEVEL SECURITY;
 ALTER TABLE game_players ENABLE ROW LEVEL SECURITY;
+ALTER TABLE game_log_chunks ENABLE ROW LEVEL SECURITY;
+ALTER TABLE game_checkpoints ENABLE ROW LEVEL SECURITY;
+ALTER TABLE game_decisions ENABLE ROW LEVEL SECURITY;
 
 CREATE POLICY "Allow all on users" ON users FOR ALL USING (true) WITH CHECK (true);
 CREATE POLICY "Allow all on players" ON players FOR ALL USING (true) WITH CHECK (true);
 CREATE POLICY "Allow all on bots" ON bots FOR ALL USING (true) WITH CHECK (true);
 CREATE POLICY "Allow all on games" ON games FOR ALL USING (true) WITH CHECK (true);
 CREATE POLICY "Allow all on game_players" ON game_players FOR ALL USING (true) WITH CHECK (true);
+CREATE POLICY "Allow all on game_log_chunks" ON game_log_chunks FOR ALL USING (true) WITH CHECK (true);
+CREATE POLICY "Allow all on game_checkpoints" ON game_checkpoints FOR ALL USING (true) WITH CHECK (true);
+CREATE POLICY "Allow all on game_decisions" ON game_decisions FOR ALL USING (true) WITH CHECK (true);
@@ -0,0 +1,215 @@
+"""
+Decision backends the game engine asks for bids.
+
+`run_game_stream` talks to a `BotBackend` rather than to OpenAI directly:
+- OpenAIBackend: the LLM bots in services.bot_brain (default)
+- HeuristicBackend: deterministic rule-based bidding, no network
+- ScriptedBackend: replays canned actions, for tests and benchmarks
+"""
+
+import heapq
+from collections.abc import Callable, Iterable
+from typing import Protocol
+from config import settings
+from services import bot_brain
+from services.bot_brain import InitialBidAction, BidResponseAction
+from services.prompt_builder import PromptBuilder
+
+SCORING_SLOTS = 5
+
+
+class BotBackend(Protocol):
+    async def get_initial_bid(
+        self,
+        strategy: str,
+        available_players: list[dict],
+        balance: int,
+        opponent_balance: int,
+        my_team: list[dict],
+        opponent_team: list[dict],
+        pool: list[dict],
+    ) -> InitialBidAction: ...
+
+    async def get_bid_response(
+        self,
+        strategy: str,
+        player: dict,
+        current_bid: int,
+        bidder_name: str,
+        balance: int,
+        opponent_balance: int,
+        my_team: list[dict],
+        opponent_team: list[dict],
+        available_players: list[dict],
+        pool: list[dict],
+    ) -> BidResponseAction: ...
+
+
+class OpenAIBackend:
+    """
+    LLM bots driven by each bot's strategy prompt. Keeps one PromptBuilder so
+    player rows and team tables are formatted once per game.
+    """
+
+    def __init__(self, token_budget: int | None = None):
+        if token_budget is None:
+            token_budget = settings.prompt_token_budget
+        self.prompts = PromptBuilder(token_budget)
+
+    async def get_initial_bid(self, **kwargs) -> InitialBidAction:
+        return await bot_brain.get_initial_bid(prompts=self.prompts, **kwargs)
+
+    async def get_bid_response(self, **kwargs) -> BidResponseAction:
+        return await bot_brain.get_bid_response(prompts=self.prompts, **kwargs)
+
+
+def _top_points(team: list[dict]) -> list[float]:
+    return sorted((p["fantasy_points"] for p in team), reverse=True)[:SCORING_SLOTS]
+
+
+def _marginal_value(top: list[float], fantasy_points: float) -> float:
+    """How much `fantasy_points` would add to a team's top-5 score."""
+    if len(top) < SCORING_SLOTS:
+        return fantasy_points
+    return max(0.0, fantasy_points - top[-1])
+
+
+class HeuristicBackend:
+    """
+    Deterministic value-per-credit bidder. Each player's ceiling is its share
+    of the remaining budget in proportion to the top-5 points it adds, with
+    a credit held back for every scoring slot still to fill. Players the
+    opponent needs count for `block_weight` of their value to them.
+    """
+
+    def __init__(self, opening_fraction: float = 0.4, block_weight: float = 0.5):
+        self.opening_fraction = opening_fraction
+        self.block_weight = block_weight
+
+    def _spendable(self, balance: int, my_top: list[float]) -> int:
+        open_slots = max(0, SCORING_SLOTS - len(my_top))
+        return max(0, balance - max(0, open_slots - 1))
+
+    def _ceiling(
+        self,
+        player: dict,
+        balance: int,
+        my_team: list[dict],
+        opponent_team: list[dict],
+        available_players: list[dict],
+    ) -> int:
+        my_top = _top_points(my_team)
+        opp_top = _top_points(opponent_team)
+        value = _marginal_value(my_top, player["fantasy_points"])
+        value += self.block_weight * _marginal_value(opp_top, player["fantasy_points"])
+        if value <= 0:
+            return 0
+
+        # Budget pacing: compare against the best targets still needed
+        open_slots = max(1, SCORING_SLOTS - len(my_top))
+        best = heapq.nlargest(open_slots, (p["fantasy_points"] for p in available_players))
+        pool_value = sum(_marginal_value(my_top, fp) for fp in best) or value
+        share = min(1.0, value / pool_value)
+        return min(self._spendable(balance, my_top), max(1, round(balance * share)))
+
+    async def get_initial_bid(
+        self,
+        strategy: str,
+        available_players: list[dict],
+        balance: int,
+        opponent_balance: int,
+        my_team: list[dict],
+        opponent_team: list[dict],
+        pool: list[dict] | None = None,
+    ) -> InitialBidAction:
+        my_top = _top_points(my_team)
+        opp_top = _top_points(opponent_team)
+        target = max(
+            available_players,
+            key=lambda p: (
+                _marginal_value(my_top, p["fantasy_points"])
+                + self.block_weight * _marginal_value(opp_top, p["fantasy_points"]),
+                p["fantasy_points"],
+                -p["id"],
+            ),
+        )
+        if opponent_balance == 0:
+            return InitialBidAction(player_id=target["id"], amount=1, reasoning="Opponent is out of credits")
+
+        ceiling = self._ceiling(target, balance, my_team, opponent_team, available_players)
+        amount = max(1, min(balance, round(ceiling * self.opening_fraction)))
+        return InitialBidAction(
+            player_id=target["id"],
+            amount=amount,
+            reasoning=f"Best top-5 upgrade; opening at {amount} with a ceiling of {ceiling}",
+        )
+
+    async def get_bid_response(
+        self,
+        strategy: str,
+        player: dict,
+        current_bid: int,
+        bidder_name: str,
+        balance: int,
+        opponent_balance: int,
+        my_team: list[dict],
+        opponent_team: list[dict],
+        available_players: list[dict],
+        pool: list[dict] | None = None,
+    ) -> BidResponseAction:
+        ceiling = self._ceiling(player, balance, my_team, opponent_team, available_players)
+        if current_bid < ceiling:
+            # Close half the gap to the ceiling so bidding wars stay short
+            amount = current_bid + max(1, (ceiling - current_bid) // 2)
+            return BidResponseAction(
+                action="counter",
+                amount=amount,
+                reasoning=f"Still below my ceiling of {ceiling}",
+            )
+        return BidResponseAction(action="pass", reasoning=f"{current_bid} meets my ceiling of {ceiling}")
+
+
+class ScriptedBackend:
+    """
+    Returns pre-baked actions in order. Each script entry is either an action
+    or a callable taking the call's keyword arguments. Once a script runs out,
+    the backend bids 1 on the first available player and passes every bid.
+    """
+
+    def __init__(
+        self,
+        initial_bids: Iterable[InitialBidAction | Callable[..., InitialBidAction]] = (),
+        bid_responses: Iterable[BidResponseAction | Callable[..., BidResponseAction]] = (),
+    ):
+        self._initial_bids = iter(initial_bids)
+        self._bid_responses = iter(bid_responses)
+        self.initial_bid_calls = 0
+        self.bid_response_calls = 0
+
+    async def get_initial_bid(self, **kwargs) -> InitialBidAction:
+        self.initial_bid_calls += 1
+        action = next(self._initial_bids, None)
+        if action is None:
+            return InitialBidAction(player_id=kwargs["available_players"][0]["id"], amount=1, reasoning="scripted")
+        return action(**kwargs) if callable(action) else action.model_copy()
+
+    async def get_bid_response(self, **kwargs) -> BidResponseAction:
+        self.bid_response_calls += 1
+        action = next(self._bid_responses, None)
+        if action is None:
+            return BidResponseAction(action="pass", reasoning="scripted")
+        return action(**kwargs) if callable(action) else action.model_copy()
+
+
+BACKENDS = {
+    "openai": OpenAIBackend,
+    "heuristic": HeuristicBackend,
+    "scripted": ScriptedBackend,
+}
+
+
+def get_backend(name: str) -> BotBackend:
+    try:
+        return BACKENDS[name]()
+    except KeyError:
+        raise ValueError(f"Unknown bot backend {name!r}, expected one of {sorted(BACKENDS)}") from None
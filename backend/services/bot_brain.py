@@ -1,6 +1,19 @@
-from openai import AsyncOpenAI
+import asyncio
+import logging
+import time
+from functools import lru_cache
+from typing import TYPE_CHECKING
 from pydantic import BaseModel, Field
 from config import settings
+from services import llm_cache, llm_scheduler, metrics, tracing
+from services.prompt_builder import PromptBuilder, estimate_tokens
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
+
+logger = logging.getLogger(__name__)
+
+_client: "AsyncOpenAI | None" = None
 
 
 class InitialBidAction(BaseModel):
@@ -17,25 +30,117 @@ class BidResponseAction(BaseModel):
     reasoning: str = Field(description="Brief explanation of the decision")
 
 
-def _build_client():
-    return AsyncOpenAI(api_key=settings.openai_api_key)
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
 
+def _build_client() -> "AsyncOpenAI":
+    # openai is the heaviest import in the app; only games that call it pay for it
+    import httpx
+    from openai import AsyncOpenAI, DefaultAsyncHttpxClient
 
-def _format_player(p: dict) -> str:
-    return (
-        f"  ID:{p['id']} {p['first_name']} {p['last_name']} - "
-        f"PPG:{p['ppg']} RPG:{p['rpg']} APG:{p['apg']} SPG:{p['spg']} BPG:{p['bpg']} "
-        f"Fantasy:{p['fantasy_points']}"
+    http_client = DefaultAsyncHttpxClient(
+        http2=_http2_available(),
+        limits=httpx.Limits(
+            max_connections=settings.openai_max_connections,
+            max_keepalive_connections=settings.openai_max_connections,
+            keepalive_expiry=settings.openai_keepalive_expiry,
+        ),
+        timeout=httpx.Timeout(settings.openai_timeout, connect=5.0),
     )
+    return AsyncOpenAI(
+        api_key=settings.openai_api_key,
+        base_url=settings.openai_base_url,
+        http_client=http_client,
+        max_retries=0,  # llm_scheduler retries, so a 429 slows every game down
+    )
+
 
+def get_client() -> "AsyncOpenAI":
+    """Return the process-wide OpenAI client, creating it on first use."""
+    global _client
+    if _client is None:
+        _client = _build_client()
+    return _client
+
+
+async def close_client():
+    global _client
+    if _client is not None:
+        await _client.close()
+        _client = None
+
+
+@lru_cache(maxsize=None)
+def _response_schema(response_format: type[BaseModel]) -> dict:
+    return response_format.model_json_schema()
+
+
+def _default_prompts() -> PromptBuilder:
+    return PromptBuilder(settings.prompt_token_budget)
+
+
+async def _complete(prompt: str, response_format: type[BaseModel], call: str) -> BaseModel:
+    """Ask the model for a structured decision, going through the decision cache."""
+    cache = llm_cache.get_cache()
+    key = None
+    if cache is not None:
+        key = llm_cache.make_key(
+            settings.openai_model,
+            settings.openai_temperature,
+            prompt,
+            _response_schema(response_format),
+        )
+        cached = cache.get_memory(key)
+        if cached is None and cache.has_disk:
+            # The disk tier can wait on the writer's commit; keep it off the loop
+            cached = await asyncio.to_thread(cache.get_disk, key)
+        if cached is not None:
+            return response_format.model_validate_json(cached)
+
+    def request():
+        return get_client().beta.chat.completions.parse(
+            model=settings.openai_model,
+            temperature=settings.openai_temperature,
+            messages=[{"role": "user", "content": prompt}],
+            response_format=response_format,
+        )
+
+    # Latency includes time queued for the rate limits
+    start = time.perf_counter()
+    tokens = estimate_tokens(prompt) + llm_scheduler.COMPLETION_TOKENS_ESTIMATE
+    with tracing.span("llm", call=call, model=settings.openai_model) as span:
+        completion = await llm_scheduler.get_scheduler().call(request, tokens)
+    latency = time.perf_counter() - start
+    latency_ms = latency * 1000
+    metrics.llm_call_seconds.observe(latency, call)
+    result = completion.choices[0].message.parsed
 
-def _format_team(team: list[dict]) -> str:
-    if not team:
-        return "  (empty)"
-    lines = []
-    for p in team:
-        lines.append(f"  {p['first_name']} {p['last_name']} (Fantasy:{p['fantasy_points']}, Cost:{p['bid_amount']})")
-    return "\n".join(lines)
+    usage = completion.usage
+    if usage is not None:
+        metrics.llm_tokens.observe(usage.prompt_tokens, call, "prompt")
+        metrics.llm_tokens.observe(usage.completion_tokens, call, "completion")
+        if span is not None:
+            span.attrs.update(prompt_tokens=usage.prompt_tokens, completion_tokens=usage.completion_tokens)
+        details = getattr(usage, "prompt_tokens_details", None)
+        cached_tokens = (details.cached_tokens or 0) if details else 0
+        metrics.llm_tokens.observe(cached_tokens, call, "cached")
+        logger.info(
+            "%s: prompt_tokens=%d cached_tokens=%d completion_tokens=%d latency_ms=%.0f",
+            call,
+            usage.prompt_tokens,
+            cached_tokens,
+            usage.completion_tokens,
+            latency_ms,
+        )
+
+    if cache is not None:
+        cache.put(key, result.model_dump_json())
+    return result
 
 
 async def get_initial_bid(
@@ -45,44 +150,16 @@ async def get_initial_bid(
     opponent_balance: int,
     my_team: list[dict],
     opponent_team: list[dict],
+    pool: list[dict] | None = None,
+    prompts: PromptBuilder | None = None,
 ) -> InitialBidAction:
-    client = _build_client()
-
-    players_str = "\n".join(_format_player(p) for p in available_players)
-    my_team_str = _format_team(my_team)
-    opp_team_str = _format_team(opponent_team)
-
-    prompt = f"""You are a fantasy basketball bidding bot. Your strategy is: "{strategy}"
-
-AVAILABLE PLAYERS:
-{players_str}
-
-YOUR TEAM:
-{my_team_str}
-
-OPPONENT TEAM:
-{opp_team_str}
-
-YOUR BALANCE: {balance} credits
-OPPONENT BALANCE: {opponent_balance} credits
-
-RULES:
-- Pick one available player and set an opening bid (minimum 1 credit)
-- Your bid CANNOT exceed your balance of {balance}
-- Only your top 5 players by fantasy points count for scoring
-- Consider which players would most improve your team
-- Consider blocking opponent from getting key players
-- If your opponent has 0 credits, they cannot counter — you will win at any bid, so bid the minimum (1 credit)
-
-Pick a player and opening bid amount. Follow your strategy."""
-
-    completion = await client.beta.chat.completions.parse(
-        model="gpt-4o-mini",
-        temperature=0.7,
-        messages=[{"role": "user", "content": prompt}],
-        response_format=InitialBidAction,
+    if prompts is None:
+        prompts = _default_prompts()
+    prompt = prompts.initial_bid(
+        strategy, available_players, balance, opponent_balance, my_team, opponent_team, pool
     )
-    result = completion.choices[0].message.parsed
+
+    result = await _complete(prompt, InitialBidAction, "get_initial_bid")
 
     # Validate
     valid_ids = {p["id"] for p in available_players}
@@ -104,44 +181,25 @@ async def get_bid_response(
     my_team: list[dict],
     opponent_team: list[dict],
     available_players: list[dict],
+    pool: list[dict] | None = None,
+    prompts: PromptBuilder | None = None,
 ) -> BidResponseAction:
-    client = _build_client()
-
-    my_team_str = _format_team(my_team)
-    opp_team_str = _format_team(opponent_team)
-
-    prompt = f"""You are a fantasy basketball bidding bot. Your strategy is: "{strategy}"
-
-CURRENT BID:
-  Player: {player['first_name']} {player['last_name']} (Fantasy: {player['fantasy_points']})
-  Current bid: {current_bid} credits (by {bidder_name})
-
-YOUR TEAM:
-{my_team_str}
-
-OPPONENT TEAM:
-{opp_team_str}
-
-YOUR BALANCE: {balance} credits
-OPPONENT BALANCE: {opponent_balance} credits
-REMAINING PLAYERS IN POOL: {len(available_players)}
-
-RULES:
-- "pass" = let the bidder win this player at the current price
-- "counter" = raise the bid (must be higher than {current_bid}, cannot exceed your balance of {balance})
-- Only your top 5 players by fantasy points count for scoring
-- You have a maximum of 12 slots, but can only score for the top 5.
-- If your opponent has 0 credits, they cannot counter — you will win at any bid
-- Each player starts with 100 credits, meaing the average active roster player is worth about 20 credits.
-Decide: counter or pass. Follow your strategy."""
-
-    completion = await client.beta.chat.completions.parse(
-        model="gpt-4o-mini",
-        temperature=0.7,
-        messages=[{"role": "user", "content": prompt}],
-        response_format=BidResponseAction,
+    if prompts is None:
+        prompts = _default_prompts()
+    prompt = prompts.bid_response(
+        strategy,
+        player,
+        current_bid,
+        bidder_name,
+        balance,
+        opponent_balance,
+        my_team,
+        opponent_team,
+        available_players,
+        pool,
     )
-    result = completion.choices[0].message.parsed
+
+    result = await _complete(prompt, BidResponseAction, "get_bid_response")
 
     # Normalize: anything that isn't "counter" is a pass
     if result.action != "counter":
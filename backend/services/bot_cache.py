@@ -0,0 +1,73 @@
+"""
+Per-worker cache of bot rows by id.
+
+Starting a game needs both bots' strategy prompts, and bots are rarely
+edited, so repository.get_bots answers from here and fetches only the misses
+(in one query). update_bot and delete_bot invalidate the edited id; edits
+made through another worker show up once the entry is older than
+`settings.bot_cache_ttl`. Rows are shared, not copied: treat them as
+read-only.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from config import settings
+
+_entries: OrderedDict[str, tuple[dict, float]] = OrderedDict()  # id -> (row, loaded_at)
+_version = 0
+_lock = threading.Lock()
+hits = 0
+misses = 0
+
+
+def version() -> int:
+    """Bumped by every invalidation; pass it to `put` to drop rows read before one."""
+    return _version
+
+
+def get_many(bot_ids: list[str]) -> tuple[dict[str, dict], list[str]]:
+    """Fresh cached rows by id, and the ids that need fetching."""
+    global hits, misses
+    found: dict[str, dict] = {}
+    missing: list[str] = []
+    now = time.monotonic()
+    with _lock:
+        for bot_id in dict.fromkeys(bot_ids):
+            cached = _entries.get(bot_id)
+            if cached is not None and now - cached[1] <= settings.bot_cache_ttl:
+                _entries.move_to_end(bot_id)
+                found[bot_id] = cached[0]
+            else:
+                missing.append(bot_id)
+        hits += len(found)
+        misses += len(missing)
+    return found, missing
+
+
+def put(bots: list[dict], read_at_version: int):
+    """Cache freshly read rows, unless a bot was invalidated since they were read."""
+    now = time.monotonic()
+    with _lock:
+        if read_at_version != _version:
+            return
+        for bot in bots:
+            _entries[bot["id"]] = (bot, now)
+            _entries.move_to_end(bot["id"])
+        while len(_entries) > settings.bot_cache_size:
+            _entries.popitem(last=False)
+
+
+def invalidate(bot_id: str | None = None):
+    """Drop one bot, or every bot when `bot_id` is None."""
+    global _version
+    with _lock:
+        _version += 1
+        if bot_id is None:
+            _entries.clear()
+        else:
+            _entries.pop(bot_id, None)
+
+
+def stats() -> dict:
+    return {"entries": len(_entries), "hits": hits, "misses": misses}
@@ -0,0 +1,381 @@
+"""
+Checkpoints for resumable games.
+
+While a game runs, every bot decision is appended to a journal as soon as it
+is made, and the full GameState (plus the log so far) is snapshotted after
+each draft event. Resuming restores the last snapshot and replays the
+decisions journaled after it, so no LLM call that already happened is made
+again.
+
+Stores (`settings.checkpoint_store`):
+- "supabase": game_checkpoints / game_decisions tables (see schema.sql)
+- "sqlite":   a local SQLite file at `settings.checkpoint_path`
+- "file":     one directory per game under `settings.checkpoint_path`
+- "none":     checkpointing disabled
+
+A game key (`uuid4().hex`) is played by one stream at a time per worker:
+starting or resuming a game claims its key until the stream ends.
+"""
+
+import json
+import os
+import re
+import sqlite3
+import threading
+import weakref
+from collections import deque
+from typing import Protocol
+from pydantic import BaseModel
+from config import settings
+from services import repository
+from services.game_state import GameState
+
+
+GAME_KEY_PATTERN = re.compile(r"[0-9a-f]{32}")
+
+
+def valid_game_key(game_key: str) -> bool:
+    """Game keys are uuid4().hex, so anything else never names a checkpoint."""
+    return GAME_KEY_PATTERN.fullmatch(game_key) is not None
+
+
+class CheckpointStore(Protocol):
+    def create(self, game_key: str, meta: dict) -> None: ...
+    def save_snapshot(self, game_key: str, snapshot: dict) -> None: ...
+    def append_decision(self, game_key: str, seq: int, decision: dict) -> None: ...
+    def finish(self, game_key: str, game_id: str | None) -> None: ...
+    def load(self, game_key: str) -> dict | None: ...
+
+
+class SQLiteCheckpointStore:
+    def __init__(self, path: str):
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._db.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS game_checkpoints (
+                    game_key TEXT PRIMARY KEY,
+                    meta TEXT NOT NULL,
+                    snapshot TEXT,
+                    status TEXT NOT NULL DEFAULT 'running',
+                    game_id TEXT
+                );
+                CREATE TABLE IF NOT EXISTS game_decisions (
+                    game_key TEXT NOT NULL,
+                    seq INTEGER NOT NULL,
+                    decision TEXT NOT NULL,
+                    PRIMARY KEY (game_key, seq)
+                );
+                """
+            )
+
+    def _write(self, sql: str, params: tuple):
+        with self._lock:
+            self._db.execute(sql, params)
+            self._db.commit()
+
+    def create(self, game_key: str, meta: dict):
+        self._write("INSERT INTO game_checkpoints (game_key, meta) VALUES (?, ?)", (game_key, json.dumps(meta)))
+
+    def save_snapshot(self, game_key: str, snapshot: dict):
+        self._write("UPDATE game_checkpoints SET snapshot = ? WHERE game_key = ?", (json.dumps(snapshot), game_key))
+
+    def append_decision(self, game_key: str, seq: int, decision: dict):
+        self._write(
+            "INSERT OR REPLACE INTO game_decisions (game_key, seq, decision) VALUES (?, ?, ?)",
+            (game_key, seq, json.dumps(decision)),
+        )
+
+    def finish(self, game_key: str, game_id: str | None):
+        self._write(
+            "UPDATE game_checkpoints SET status = 'complete', game_id = ? WHERE game_key = ?",
+            (game_id, game_key),
+        )
+
+    def load(self, game_key: str) -> dict | None:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT meta, snapshot, status, game_id FROM game_checkpoints WHERE game_key = ?",
+                (game_key,),
+            ).fetchone()
+            if row is None:
+                return None
+            decisions = self._db.execute(
+                "SELECT decision FROM game_decisions WHERE game_key = ? ORDER BY seq",
+                (game_key,),
+            ).fetchall()
+        return {
+            "meta": json.loads(row[0]),
+            "snapshot": json.loads(row[1]) if row[1] else None,
+            "status": row[2],
+            "game_id": row[3],
+            "decisions": [json.loads(d[0]) for d in decisions],
+        }
+
+
+class FileCheckpointStore:
+    """meta.json + snapshot.json (replaced atomically) + decisions.jsonl per game."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _dir(self, game_key: str) -> str:
+        # The key becomes a directory name, so it must not be able to escape
+        if not valid_game_key(game_key):
+            raise ValueError(f"Invalid game key {game_key!r}")
+        return os.path.join(self.directory, game_key)
+
+    def _path(self, game_key: str, name: str) -> str:
+        return os.path.join(self._dir(game_key), name)
+
+    def _write_json(self, path: str, data: dict):
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp, path)
+
+    def create(self, game_key: str, meta: dict):
+        os.makedirs(self._dir(game_key))
+        self._write_json(self._path(game_key, "meta.json"), {"meta": meta, "status": "running", "game_id": None})
+
+    def save_snapshot(self, game_key: str, snapshot: dict):
+        self._write_json(self._path(game_key, "snapshot.json"), snapshot)
+
+    def append_decision(self, game_key: str, seq: int, decision: dict):
+        line = (json.dumps({"seq": seq, "decision": decision}) + "\n").encode()
+        with open(self._path(game_key, "decisions.jsonl"), "a+b") as f:
+            # Terminate a torn line left by an interrupted process before appending
+            if f.tell() > 0:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    line = b"\n" + line
+            f.write(line)
+
+    def finish(self, game_key: str, game_id: str | None):
+        path = self._path(game_key, "meta.json")
+        with open(path) as f:
+            data = json.load(f)
+        data.update({"status": "complete", "game_id": game_id})
+        self._write_json(path, data)
+
+    def load(self, game_key: str) -> dict | None:
+        meta_path = self._path(game_key, "meta.json")
+        if not os.path.exists(meta_path):
+            return None
+        with open(meta_path) as f:
+            data = json.load(f)
+
+        snapshot = None
+        if os.path.exists(self._path(game_key, "snapshot.json")):
+            with open(self._path(game_key, "snapshot.json")) as f:
+                snapshot = json.load(f)
+
+        decisions = {}
+        if os.path.exists(self._path(game_key, "decisions.jsonl")):
+            with open(self._path(game_key, "decisions.jsonl")) as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # torn write from an interrupted process
+                    decisions[entry["seq"]] = entry["decision"]
+        # Replay stops at the first missing seq; later appends reuse it
+        ordered = []
+        while len(ordered) in decisions:
+            ordered.append(decisions[len(ordered)])
+
+        return {
+            "meta": data["meta"],
+            "snapshot": snapshot,
+            "status": data["status"],
+            "game_id": data["game_id"],
+            "decisions": ordered,
+        }
+
+
+class SupabaseCheckpointStore:
+    def create(self, game_key: str, meta: dict):
+        from database import get_supabase
+
+        get_supabase().table("game_checkpoints").insert({"game_key": game_key, "meta": meta}).execute()
+
+    def save_snapshot(self, game_key: str, snapshot: dict):
+        from database import get_supabase
+
+        (
+            get_supabase().table("game_checkpoints")
+            .update({"snapshot": snapshot, "updated_at": "now()"})
+            .eq("game_key", game_key)
+            .execute()
+        )
+
+    def append_decision(self, game_key: str, seq: int, decision: dict):
+        from database import get_supabase
+
+        (
+            get_supabase().table("game_decisions")
+            .upsert({"game_key": game_key, "seq": seq, "decision": decision})
+            .execute()
+        )
+
+    def finish(self, game_key: str, game_id: str | None):
+        from database import get_supabase
+
+        (
+            get_supabase().table("game_checkpoints")
+            .update({"status": "complete", "game_id": game_id, "updated_at": "now()"})
+            .eq("game_key", game_key)
+            .execute()
+        )
+
+    def load(self, game_key: str) -> dict | None:
+        from database import get_supabase
+
+        db = get_supabase()
+        res = db.table("game_checkpoints").select("*").eq("game_key", game_key).execute()
+        if not res.data:
+            return None
+        row = res.data[0]
+        decisions = (
+            db.table("game_decisions")
+            .select("decision")
+            .eq("game_key", game_key)
+            .order("seq")
+            .execute()
+        )
+        return {
+            "meta": row["meta"],
+            "snapshot": row["snapshot"],
+            "status": row["status"],
+            "game_id": row["game_id"],
+            "decisions": [d["decision"] for d in decisions.data],
+        }
+
+
+_store: CheckpointStore | None = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> CheckpointStore | None:
+    """Return the configured store, or None when checkpointing is disabled."""
+    global _store
+    kind = settings.checkpoint_store
+    if kind == "none":
+        return None
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                if kind == "sqlite":
+                    _store = SQLiteCheckpointStore(settings.checkpoint_path)
+                elif kind == "file":
+                    _store = FileCheckpointStore(settings.checkpoint_path)
+                elif kind == "supabase":
+                    _store = SupabaseCheckpointStore()
+                else:
+                    raise ValueError(f"Unknown checkpoint store {kind!r}")
+    return _store
+
+
+class RecordedBotError(Exception):
+    """A bot error replayed from the decision journal."""
+
+
+class CheckpointInUse(Exception):
+    """The game is already being played from its checkpoint in this worker."""
+
+
+# game_key -> the checkpointer playing it. Weak, so a stream that is never
+# started (or never reaches its cleanup) doesn't hold the key forever.
+_running: "weakref.WeakValueDictionary[str, GameCheckpointer]" = weakref.WeakValueDictionary()
+
+
+class GameCheckpointer:
+    """Journals one game's decisions and snapshots through a CheckpointStore."""
+
+    def __init__(self, store: CheckpointStore, game_key: str, meta: dict):
+        self.store = store
+        self.game_key = game_key
+        self.meta = meta
+        self.snapshot: dict | None = None
+        self.status = "running"
+        self.game_id: str | None = None
+        self.seq = 0
+        self._replay: deque[dict] = deque()
+
+    @classmethod
+    async def start(cls, store: CheckpointStore, game_key: str, meta: dict) -> "GameCheckpointer":
+        await repository.run(store.create, game_key, meta)
+        checkpointer = cls(store, game_key, meta)
+        checkpointer._claim()
+        return checkpointer
+
+    @classmethod
+    async def resume(cls, store: CheckpointStore, game_key: str) -> "GameCheckpointer | None":
+        saved = await repository.run(store.load, game_key)
+        if saved is None:
+            return None
+        checkpointer = cls(store, game_key, saved["meta"])
+        checkpointer.snapshot = saved["snapshot"]
+        checkpointer.status = saved["status"]
+        checkpointer.game_id = saved["game_id"]
+        decisions = saved["decisions"]
+        checkpointer.seq = len(decisions)
+        applied = saved["snapshot"]["seq"] if saved["snapshot"] else 0
+        checkpointer._replay.extend(decisions[applied:])
+        if checkpointer.status != "complete":
+            checkpointer._claim()
+        return checkpointer
+
+    def _claim(self):
+        """Raises CheckpointInUse if another stream in this worker holds the key."""
+        if _running.setdefault(self.game_key, self) is not self:
+            raise CheckpointInUse(self.game_key)
+
+    def release(self):
+        """Let the game be resumed again; call once its stream has ended."""
+        if _running.get(self.game_key) is self:
+            del _running[self.game_key]
+
+    @property
+    def replaying(self) -> bool:
+        return bool(self._replay)
+
+    async def decide(self, kind: str, model: type[BaseModel], call):
+        """
+        Return the next journaled decision of `kind` if one is waiting,
+        otherwise await `call()` and journal its outcome (including errors).
+        """
+        if self._replay:
+            recorded = self._replay.popleft()
+            if recorded["kind"] == kind:
+                if "error" in recorded:
+                    raise RecordedBotError(recorded["error"])
+                return model.model_validate(recorded["action"])
+            # The journal no longer matches the game; continue live from here
+            self._replay.clear()
+
+        try:
+            action = await call()
+        except Exception as e:
+            await self._append({"kind": kind, "error": str(e)})
+            raise
+        await self._append({"kind": kind, "action": action.model_dump()})
+        return action
+
+    async def _append(self, decision: dict):
+        seq = self.seq
+        self.seq += 1
+        await repository.run(self.store.append_decision, self.game_key, seq, decision)
+
+    async def save(self, state: GameState, game_log):
+        # A GameLogWriter is snapshotted as its position and unflushed lines
+        log = game_log.to_dict() if hasattr(game_log, "to_dict") else game_log
+        snapshot = {"state": state.to_dict(), "game_log": log, "seq": self.seq}
+        await repository.run(self.store.save_snapshot, self.game_key, snapshot)
+
+    async def finish(self, game_id: str | None):
+        self.status = "complete"
+        self.game_id = game_id
+        await repository.run(self.store.finish, self.game_key, game_id)
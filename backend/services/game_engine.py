@@ -4,258 +4,367 @@ Server-side game loop that replaces client-side GameScreen logic.
 
 import asyncio
 import random
-from database import get_supabase
-from services.bot_brain import get_initial_bid, get_bid_response
+import time
+from config import settings
+from services import llm_scheduler, metrics, repository, tracing
+from services.bot_backends import BotBackend, OpenAIBackend
+from services.bot_brain import InitialBidAction, BidResponseAction
+from services.checkpoints import GameCheckpointer
+from services.game_log import LogSink
+from services.game_state import BOT_KEYS, GameState, other
+from services.scoring import DEFAULT_PROFILE
 
+MAX_TURNS = 200
+MAX_BID_ROUNDS = 20
 
-def _select_player_pool() -> list[dict]:
+
+async def _select_player_pool(rng: random.Random, profile: str = DEFAULT_PROFILE) -> list[dict]:
     """
     Stratified random pick of 24 players:
     5 elite (40+), 7 good (25-40), 7 mid (15-25), 5 role (8-15 fantasy pts)
     """
-    db = get_supabase()
-    result = (
-        db.table("players")
-        .select("id, first_name, last_name, ppg, rpg, apg, spg, bpg, topg, fantasy_points")
-        .gte("fantasy_points", 8)
-        .order("fantasy_points", desc=True)
-        .execute()
-    )
-    all_players = result.data
+    snapshot = await repository.get_player_snapshot()
+    return snapshot.sample(rng, profile=profile)
 
-    elite = [p for p in all_players if p["fantasy_points"] >= 40]
-    good = [p for p in all_players if 25 <= p["fantasy_points"] < 40]
-    mid = [p for p in all_players if 15 <= p["fantasy_points"] < 25]
-    role = [p for p in all_players if 8 <= p["fantasy_points"] < 15]
 
-    pool = []
-    pool.extend(random.sample(elite, min(5, len(elite))))
-    pool.extend(random.sample(good, min(7, len(good))))
-    pool.extend(random.sample(mid, min(7, len(mid))))
-    pool.extend(random.sample(role, min(5, len(role))))
-
-    while len(pool) < 24 and len(all_players) > len(pool):
-        remaining = [p for p in all_players if p not in pool]
-        if not remaining:
-            break
-        pool.append(random.choice(remaining))
+class _NominationPrefetch:
+    """
+    Speculative next nomination. While a bid response is pending, the
+    responder's next opening bid is requested as if it passes and the current
+    bidder wins. The result is used only if the game reaches exactly that state.
+    """
 
-    random.shuffle(pool)
-    return pool[:24]
+    def __init__(self):
+        self.key: tuple | None = None
+        self.task: asyncio.Task | None = None
+        self.hits = 0
+        self.misses = 0
+
+    def start(self, key: tuple, coro):
+        self.cancel()
+        self.key = key
+        self.task = asyncio.create_task(coro)
+
+    def take(self, key: tuple) -> asyncio.Task | None:
+        """Return the prefetched task if it was made for `key`, else discard it."""
+        if self.task is None:
+            return None
+        if key != self.key:
+            self.cancel()
+            return None
+        task, self.task, self.key = self.task, None, None
+        self.hits += 1
+        return task
+
+    def cancel(self):
+        if self.task is None:
+            return
+        task, self.task, self.key = self.task, None, None
+        self.misses += 1
+        task.cancel()
+        if task.done() and not task.cancelled():
+            task.exception()  # mark retrieved so a failed prefetch isn't logged
+
+
+def _prefetch_next_nomination(
+    prefetch: _NominationPrefetch,
+    backend: BotBackend,
+    state: GameState,
+    bots: dict,
+    bidder: str,
+    player: dict,
+    current_bid: int,
+):
+    """Predict: responder passes, bidder wins at current_bid, responder nominates next."""
+    responder = other(bidder)
+    predicted_pick = {
+        "player_id": player["id"],
+        "first_name": player["first_name"],
+        "last_name": player["last_name"],
+        "fantasy_points": player["fantasy_points"],
+        "bid_amount": current_bid,
+        "draft_order": state.draft_order + 1,
+    }
+    balances = dict(state.balances)
+    balances[bidder] -= current_bid
+    prefetch.start(
+        (responder, state.draft_order + 1, balances["bot1"], balances["bot2"]),
+        backend.get_initial_bid(
+            strategy=bots[responder]["strategy_prompt"],
+            available_players=[p for p in state.available_players() if p["id"] != player["id"]],
+            balance=balances[responder],
+            opponent_balance=balances[bidder],
+            my_team=list(state.teams[responder]),
+            opponent_team=state.teams[bidder] + [predicted_pick],
+            pool=state.pool,
+        ),
+    )
 
 
-async def run_game_stream(bot1: dict, bot2: dict):
+async def run_game_stream(
+    bot1: dict,
+    bot2: dict,
+    seed: int | None = None,
+    backend: BotBackend | None = None,
+    speculate: bool | None = None,
+    checkpoint: GameCheckpointer | None = None,
+    scoring_profile: str | None = None,
+    game_log: LogSink | None = None,
+):
     """
     Async generator that yields event dicts as the game progresses.
-    Event types: "log", "draft", "game_complete"
+    Event types: "log", "draft", "game_complete" ("resumed" first on resume)
+
+    Passing `seed` reproduces the player pool and the opening turn. Bids come
+    from `backend` (the OpenAI bots by default). With `speculate` (default
+    `settings.speculative_bids`) the next nomination is prefetched while a bid
+    response is pending; hit/miss counts are reported on game_complete.
+    Players' fantasy_points (and so the final scores) follow `scoring_profile`
+    (default `settings.scoring_profile`).
+
+    With a `checkpoint`, every bot decision is journaled as it is made and the
+    state is snapshotted after each draft event. If the checkpointer was
+    loaded from an interrupted game, play continues from its last snapshot and
+    journaled decisions are replayed instead of asking the backend again.
+
+    Log lines are appended to `game_log` (a new list by default). Pass a
+    services.game_log.GameLogWriter to have them stored in chunks instead of
+    held in memory; game_complete then carries the writer, not a list.
     """
-    available = _select_player_pool()
-    bot1_team: list[dict] = []
-    bot2_team: list[dict] = []
-    bot1_balance = 100
-    bot2_balance = 100
-    game_log: list[str] = []
-    draft_order = 0
-
-    current_turn = random.choice(["bot1", "bot2"])
-    first_name = bot1["name"] if current_turn == "bot1" else bot2["name"]
-    msg = f"Game started! {first_name} goes first."
-    game_log.append(msg)
-    yield {"type": "log", "message": msg}
-    await asyncio.sleep(0)
+    if backend is None:
+        backend = OpenAIBackend()
+    if speculate is None:
+        speculate = settings.speculative_bids
+    prefetch = _NominationPrefetch() if speculate else None
+    if scoring_profile is None:
+        scoring_profile = settings.scoring_profile
+
+    # This game's LLM calls share one fair-queuing slot in the scheduler
+    llm_scheduler.start_game()
+    started = time.perf_counter()
+    total_bid_rounds = 0
+
+    bots = {"bot1": bot1, "bot2": bot2}
+    if checkpoint is not None and checkpoint.snapshot is not None:
+        state = GameState.from_dict(checkpoint.snapshot["state"])
+        saved_log = checkpoint.snapshot["game_log"]
+        if isinstance(saved_log, dict):
+            # Writer snapshot: earlier lines are already in stored chunks
+            game_log.restore(saved_log)
+            resumed_log = {"game_log": list(saved_log["pending"]), "log_offset": saved_log["offset"]}
+        else:
+            game_log = list(saved_log)
+            resumed_log = {"game_log": list(game_log)}
+        yield {
+            "type": "resumed",
+            **resumed_log,
+            "bot1_team": list(state.teams["bot1"]),
+            "bot2_team": list(state.teams["bot2"]),
+            "bot1_balance": state.balances["bot1"],
+            "bot2_balance": state.balances["bot2"],
+        }
+    else:
+        rng = random.Random(seed)
+        state = GameState(await _select_player_pool(rng, scoring_profile), rng.choice(BOT_KEYS))
+        if game_log is None:
+            game_log = []
 
-    msg = "---"
-    game_log.append(msg)
-    yield {"type": "log", "message": msg}
-    await asyncio.sleep(0)
-
-    max_turns = 200
-    turn_count = 0
-
-    while available and turn_count < max_turns:
-        turn_count += 1
-
-        if bot1_balance == 0 and bot2_balance == 0:
-            break
-
-        active_bot = bot1 if current_turn == "bot1" else bot2
-        active_balance = bot1_balance if current_turn == "bot1" else bot2_balance
-        active_team = bot1_team if current_turn == "bot1" else bot2_team
-        opponent_bot = bot2 if current_turn == "bot1" else bot1
-        opponent_balance = bot2_balance if current_turn == "bot1" else bot1_balance
-        opponent_team = bot2_team if current_turn == "bot1" else bot1_team
-
-        if active_balance == 0:
-            current_turn = "bot2" if current_turn == "bot1" else "bot1"
-            continue
-
-        try:
-            initial = await get_initial_bid(
-                strategy=active_bot["strategy_prompt"],
-                available_players=available,
-                balance=active_balance,
-                opponent_balance=opponent_balance,
-                my_team=active_team,
-                opponent_team=opponent_team,
-            )
-        except Exception as e:
-            msg = f"{active_bot['name']} had an error making a bid: {e}"
-            game_log.append(msg)
-            yield {"type": "log", "message": msg}
-            await asyncio.sleep(0)
-            current_turn = "bot2" if current_turn == "bot1" else "bot1"
-            continue
-
-        player = next((p for p in available if p["id"] == initial.player_id), None)
-        if not player:
-            current_turn = "bot2" if current_turn == "bot1" else "bot1"
-            continue
-
-        current_bid = initial.amount
-        bidder = current_turn
-        bidder_bot = active_bot
-
-        msg = (
-            f"{active_bot['name']} bids {current_bid} credits for "
-            f"{player['first_name']} {player['last_name']} (Fantasy: {player['fantasy_points']})"
-        )
+        msg = f"Game started! {bots[state.current_turn]['name']} goes first."
         game_log.append(msg)
         yield {"type": "log", "message": msg}
-        await asyncio.sleep(0)
 
-        reasoning_msg = f"  💭 {active_bot['name']}: {initial.reasoning}"
-        game_log.append(reasoning_msg)
-        yield {"type": "log", "message": reasoning_msg}
-        await asyncio.sleep(0)
+        msg = "---"
+        game_log.append(msg)
+        yield {"type": "log", "message": msg}
 
-        bid_rounds = 0
-        max_bid_rounds = 20
+        if checkpoint is not None:
+            await checkpoint.save(state, game_log)
+    teams = state.teams
+    balances = state.balances
 
-        while bid_rounds < max_bid_rounds:
-            bid_rounds += 1
+    try:
+        while state.available and state.turn_count < MAX_TURNS:
+            state.turn_count += 1
 
-            responding_turn = "bot2" if bidder == "bot1" else "bot1"
-            responding_bot = bot2 if responding_turn == "bot2" else bot1
-            responding_balance = bot2_balance if responding_turn == "bot2" else bot1_balance
-            responding_team = bot2_team if responding_turn == "bot2" else bot1_team
-            responding_opp_team = bot1_team if responding_turn == "bot2" else bot2_team
+            if balances["bot1"] == 0 and balances["bot2"] == 0:
+                break
 
-            if responding_balance == 0:
-                msg = (
-                    f"{responding_bot['name']} has no credits. "
-                    f"{bidder_bot['name']} wins {player['first_name']} {player['last_name']} for {current_bid}!"
+            active = state.current_turn
+            opponent = other(active)
+            active_bot = bots[active]
+
+            if balances[active] == 0:
+                state.current_turn = opponent
+                continue
+
+            prefetched = prefetch.take(state.state_key()) if prefetch is not None else None
+
+            def nominate():
+                if prefetched is not None:
+                    return prefetched
+                return backend.get_initial_bid(
+                    strategy=active_bot["strategy_prompt"],
+                    available_players=state.available_players(),
+                    balance=balances[active],
+                    opponent_balance=balances[opponent],
+                    my_team=teams[active],
+                    opponent_team=teams[opponent],
+                    pool=state.pool,
                 )
-                game_log.append(msg)
-                yield {"type": "log", "message": msg}
-                await asyncio.sleep(0)
-                break
 
             try:
-                response = await get_bid_response(
-                    strategy=responding_bot["strategy_prompt"],
-                    player=player,
-                    current_bid=current_bid,
-                    bidder_name=bidder_bot["name"],
-                    balance=responding_balance,
-                    opponent_balance=bot1_balance if responding_turn == "bot2" else bot2_balance,
-                    my_team=responding_team,
-                    opponent_team=responding_opp_team,
-                    available_players=available,
-                )
+                with tracing.span("nomination", turn=state.turn_count, bot=active_bot["name"]):
+                    if checkpoint is not None:
+                        initial = await checkpoint.decide("initial_bid", InitialBidAction, nominate)
+                    else:
+                        initial = await nominate()
             except Exception as e:
-                msg = f"{responding_bot['name']} had an error: {e}. Auto-folding."
+                msg = f"{active_bot['name']} had an error making a bid: {e}"
                 game_log.append(msg)
                 yield {"type": "log", "message": msg}
-                await asyncio.sleep(0)
-                break
+                state.current_turn = opponent
+                continue
 
-            reasoning_msg = f"  💭 {responding_bot['name']}: {response.reasoning}"
-            game_log.append(reasoning_msg)
-            yield {"type": "log", "message": reasoning_msg}
-            await asyncio.sleep(0)
+            player = state.player(initial.player_id)
+            if not player:
+                state.current_turn = opponent
+                continue
 
-            if response.action == "counter":
-                current_bid = response.amount
-                bidder = responding_turn
-                bidder_bot = responding_bot
-                msg = f"{responding_bot['name']} counters with {current_bid} credits"
-                game_log.append(msg)
-                yield {"type": "log", "message": msg}
-                await asyncio.sleep(0)
-            else:  # pass
-                msg = (
-                    f"{responding_bot['name']} passes. "
-                    f"{bidder_bot['name']} wins {player['first_name']} {player['last_name']} for {current_bid}!"
-                )
-                game_log.append(msg)
-                yield {"type": "log", "message": msg}
-                await asyncio.sleep(0)
-                break
-
-        # Award player to bidder
-        draft_order += 1
-        pick = {
-            "player_id": player["id"],
-            "first_name": player["first_name"],
-            "last_name": player["last_name"],
-            "fantasy_points": player["fantasy_points"],
-            "bid_amount": current_bid,
-            "draft_order": draft_order,
-        }
+            current_bid = initial.amount
+            bidder = active
 
-        if bidder == "bot1":
-            bot1_team.append(pick)
-            bot1_balance -= current_bid
-        else:
-            bot2_team.append(pick)
-            bot2_balance -= current_bid
-
-        available = [p for p in available if p["id"] != player["id"]]
+            msg = (
+                f"{active_bot['name']} bids {current_bid} credits for "
+                f"{player['first_name']} {player['last_name']} (Fantasy: {player['fantasy_points']})"
+            )
+            game_log.append(msg)
+            yield {"type": "log", "message": msg}
 
-        # Emit draft event with updated state
-        yield {
-            "type": "draft",
-            "bot_key": bidder,
-            "player": pick,
-            "bot1_balance": bot1_balance,
-            "bot2_balance": bot2_balance,
-        }
-        await asyncio.sleep(0)
+            reasoning_msg = f"  💭 {active_bot['name']}: {initial.reasoning}"
+            game_log.append(reasoning_msg)
+            yield {"type": "log", "message": reasoning_msg}
 
-        msg = f"  Balances: {bot1['name']}={bot1_balance}, {bot2['name']}={bot2_balance}"
-        game_log.append(msg)
-        yield {"type": "log", "message": msg}
-        await asyncio.sleep(0)
+            bid_rounds = 0
+
+            while bid_rounds < MAX_BID_ROUNDS:
+                bid_rounds += 1
+                total_bid_rounds += 1
+
+                responder = other(bidder)
+                responding_bot = bots[responder]
+                bidder_bot = bots[bidder]
+
+                if balances[responder] == 0:
+                    msg = (
+                        f"{responding_bot['name']} has no credits. "
+                        f"{bidder_bot['name']} wins {player['first_name']} {player['last_name']} for {current_bid}!"
+                    )
+                    game_log.append(msg)
+                    yield {"type": "log", "message": msg}
+                    break
+
+                if (
+                    prefetch is not None
+                    and len(state.available) > 1
+                    and state.turn_count < MAX_TURNS
+                    and not (checkpoint is not None and checkpoint.replaying)
+                ):
+                    _prefetch_next_nomination(prefetch, backend, state, bots, bidder, player, current_bid)
+
+                def respond():
+                    return backend.get_bid_response(
+                        strategy=responding_bot["strategy_prompt"],
+                        player=player,
+                        current_bid=current_bid,
+                        bidder_name=bidder_bot["name"],
+                        balance=balances[responder],
+                        opponent_balance=balances[bidder],
+                        my_team=teams[responder],
+                        opponent_team=teams[bidder],
+                        available_players=state.available_players(),
+                        pool=state.pool,
+                    )
+
+                try:
+                    with tracing.span(
+                        "bid_round", turn=state.turn_count, round=bid_rounds, bot=responding_bot["name"]
+                    ):
+                        if checkpoint is not None:
+                            response = await checkpoint.decide("bid_response", BidResponseAction, respond)
+                        else:
+                            response = await respond()
+                except Exception as e:
+                    msg = f"{responding_bot['name']} had an error: {e}. Auto-folding."
+                    game_log.append(msg)
+                    yield {"type": "log", "message": msg}
+                    break
+
+                reasoning_msg = f"  💭 {responding_bot['name']}: {response.reasoning}"
+                game_log.append(reasoning_msg)
+                yield {"type": "log", "message": reasoning_msg}
+
+                if response.action == "counter":
+                    if prefetch is not None:
+                        prefetch.cancel()
+                    current_bid = response.amount
+                    bidder = responder
+                    msg = f"{responding_bot['name']} counters with {current_bid} credits"
+                    game_log.append(msg)
+                    yield {"type": "log", "message": msg}
+                else:  # pass
+                    msg = (
+                        f"{responding_bot['name']} passes. "
+                        f"{bidder_bot['name']} wins {player['first_name']} {player['last_name']} for {current_bid}!"
+                    )
+                    game_log.append(msg)
+                    yield {"type": "log", "message": msg}
+                    break
+
+            # Award player to bidder
+            pick = state.award(bidder, player["id"], current_bid)
+
+            # Emit draft event with updated state
+            yield {
+                "type": "draft",
+                "bot_key": bidder,
+                "player": pick,
+                "bot1_balance": balances["bot1"],
+                "bot2_balance": balances["bot2"],
+            }
+
+            msg = f"  Balances: {bot1['name']}={balances['bot1']}, {bot2['name']}={balances['bot2']}"
+            game_log.append(msg)
+            yield {"type": "log", "message": msg}
 
-        msg = "---"
-        game_log.append(msg)
-        yield {"type": "log", "message": msg}
-        await asyncio.sleep(0)
+            msg = "---"
+            game_log.append(msg)
+            yield {"type": "log", "message": msg}
 
-        current_turn = "bot2" if bidder == "bot1" else "bot1"
+            state.current_turn = other(bidder)
+            if checkpoint is not None:
+                await checkpoint.save(state, game_log)
+            # One scheduling point per turn rather than per event, so a backend
+            # that never awaits still can't hold the loop for a whole game
+            await asyncio.sleep(0)
+    finally:
+        if prefetch is not None:
+            prefetch.cancel()
 
-    # Calculate scores (top 5 by fantasy points)
-    bot1_sorted = sorted(bot1_team, key=lambda p: p["fantasy_points"], reverse=True)
-    bot2_sorted = sorted(bot2_team, key=lambda p: p["fantasy_points"], reverse=True)
-    bot1_top5 = bot1_sorted[:5]
-    bot2_top5 = bot2_sorted[:5]
-    bot1_score = round(sum(p["fantasy_points"] for p in bot1_top5), 1)
-    bot2_score = round(sum(p["fantasy_points"] for p in bot2_top5), 1)
+    # Scores are the top 5 by fantasy points, maintained as picks are awarded
+    bot1_score = state.score("bot1")
+    bot2_score = state.score("bot2")
 
     msg = "=== GAME COMPLETE ==="
     game_log.append(msg)
     yield {"type": "log", "message": msg}
-    await asyncio.sleep(0)
 
-    msg = f"{bot1['name']}: {len(bot1_team)} players drafted, Top 5 score: {bot1_score}"
+    msg = f"{bot1['name']}: {len(teams['bot1'])} players drafted, Top 5 score: {bot1_score}"
     game_log.append(msg)
     yield {"type": "log", "message": msg}
-    await asyncio.sleep(0)
 
-    msg = f"{bot2['name']}: {len(bot2_team)} players drafted, Top 5 score: {bot2_score}"
+    msg = f"{bot2['name']}: {len(teams['bot2'])} players drafted, Top 5 score: {bot2_score}"
     game_log.append(msg)
     yield {"type": "log", "message": msg}
-    await asyncio.sleep(0)
 
     winner = bot1["name"] if bot1_score > bot2_score else bot2["name"]
     if bot1_score == bot2_score:
@@ -263,26 +372,53 @@ async def run_game_stream(bot1: dict, bot2: dict):
     msg = f"Winner: {winner}"
     game_log.append(msg)
     yield {"type": "log", "message": msg}
-    await asyncio.sleep(0)
 
-    yield {
+    metrics.game_turns.observe(state.turn_count)
+    metrics.game_bid_rounds.observe(total_bid_rounds)
+    metrics.game_seconds.observe(time.perf_counter() - started)
+
+    complete = {
         "type": "game_complete",
         "bot1_score": bot1_score,
         "bot2_score": bot2_score,
-        "bot1_team": bot1_team,
-        "bot2_team": bot2_team,
+        "bot1_team": teams["bot1"],
+        "bot2_team": teams["bot2"],
         "game_log": game_log,
+        "scoring_profile": scoring_profile,
     }
-    await asyncio.sleep(0)
-
-
-async def run_game(bot1: dict, bot2: dict) -> dict:
+    if prefetch is not None:
+        attempts = prefetch.hits + prefetch.misses
+        complete["speculation"] = {
+            "hits": prefetch.hits,
+            "misses": prefetch.misses,
+            "hit_rate": round(prefetch.hits / attempts, 3) if attempts else 0.0,
+        }
+    yield complete
+
+
+async def run_game(
+    bot1: dict,
+    bot2: dict,
+    seed: int | None = None,
+    backend: BotBackend | None = None,
+    speculate: bool | None = None,
+    checkpoint: GameCheckpointer | None = None,
+    scoring_profile: str | None = None,
+) -> dict:
     """
     Run a full game between two bots. Returns scores, teams, and game log.
     Backward-compatible wrapper around run_game_stream.
     """
     result = None
-    async for event in run_game_stream(bot1, bot2):
+    async for event in run_game_stream(
+        bot1,
+        bot2,
+        seed=seed,
+        backend=backend,
+        speculate=speculate,
+        checkpoint=checkpoint,
+        scoring_profile=scoring_profile,
+    ):
         if event["type"] == "game_complete":
             result = event
     return result
@@ -0,0 +1,106 @@
+"""
+Chunked storage for game logs.
+
+A game's log lines are stored in `game_log_chunks` rows of CHUNK_LINES lines
+each. Each row holds a zlib-compressed JSON array, base64 encoded. Nothing
+log-sized is kept on the `games` row. A streamed game writes its log through
+a GameLogWriter, which the engine appends to like a list. The writer holds
+only the lines not yet flushed, so its memory doesn't grow with game length.
+History reads fetch pages of lines on demand (see `page_chunks`).
+"""
+
+import base64
+import json
+import zlib
+from typing import Protocol
+
+# Fixed so chunk seq = line // CHUNK_LINES; changing it breaks reads of old games
+CHUNK_LINES = 64
+
+
+def digest(lines: list[str]) -> dict:
+    """Line count and CRC-32 of the newline-joined log, to check a client's copy."""
+    crc = 0
+    for i, line in enumerate(lines):
+        crc = zlib.crc32((line if i == 0 else "\n" + line).encode(), crc)
+    return {"lines": len(lines), "crc32": crc}
+
+
+def encode_chunk(lines: list[str]) -> str:
+    raw = json.dumps(lines, separators=(",", ":"), ensure_ascii=False).encode()
+    return base64.b64encode(zlib.compress(raw)).decode()
+
+
+def decode_chunk(data: str) -> list[str]:
+    return json.loads(zlib.decompress(base64.b64decode(data)))
+
+
+def chunk_rows(game_id: str, lines: list[str], start: int = 0) -> list[dict]:
+    """game_log_chunks rows for `lines`, the first of which is line `start` (a chunk boundary)."""
+    return [
+        {
+            "game_id": game_id,
+            "seq": (start + i) // CHUNK_LINES,
+            "line_count": len(lines[i : i + CHUNK_LINES]),
+            "data": encode_chunk(lines[i : i + CHUNK_LINES]),
+        }
+        for i in range(0, len(lines), CHUNK_LINES)
+    ]
+
+
+def page_chunks(offset: int, limit: int) -> tuple[int, int]:
+    """First and last chunk seq holding lines [offset, offset + limit)."""
+    return offset // CHUNK_LINES, (offset + limit - 1) // CHUNK_LINES
+
+
+class LogSink(Protocol):
+    """What the engine appends log lines to: a plain list or a GameLogWriter."""
+
+    def append(self, line: str) -> None: ...
+    def __len__(self) -> int: ...
+
+
+class GameLogWriter:
+    """
+    List-like sink for a game's log lines that keeps only the lines not yet
+    taken by `take_chunks`. `len()` is the total number of lines so far.
+    """
+
+    def __init__(self, game_id: str):
+        self.game_id = game_id
+        self.offset = 0  # lines already in stored chunks
+        self.pending: list[str] = []
+        self._crc = 0
+
+    def append(self, line: str):
+        self._crc = zlib.crc32((line if len(self) == 0 else "\n" + line).encode(), self._crc)
+        self.pending.append(line)
+
+    def __len__(self) -> int:
+        return self.offset + len(self.pending)
+
+    def digest(self) -> dict:
+        return {"lines": len(self), "crc32": self._crc}
+
+    def take_chunks(self, final: bool = False) -> list[dict]:
+        """
+        Rows for every complete chunk of pending lines (and the last, partial
+        one if `final`). The lines are dropped from memory.
+        """
+        full = len(self.pending) - len(self.pending) % CHUNK_LINES
+        take = len(self.pending) if final else full
+        if not take:
+            return []
+        rows = chunk_rows(self.game_id, self.pending[:take], self.offset)
+        del self.pending[:take]
+        self.offset += take
+        return rows
+
+    def to_dict(self) -> dict:
+        return {"game_id": self.game_id, "offset": self.offset, "pending": list(self.pending), "crc32": self._crc}
+
+    def restore(self, data: dict):
+        """Rewind to a checkpointed `to_dict()`; chunks stored since are rewritten on replay."""
+        self.offset = data["offset"]
+        self.pending = list(data["pending"])
+        self._crc = data["crc32"]
@@ -0,0 +1,114 @@
+"""
+Mutable state of one draft, shaped for the engine's per-turn access pattern.
+"""
+
+import bisect
+
+BOT_KEYS = ("bot1", "bot2")
+STARTING_BALANCE = 100
+SCORING_SLOTS = 5
+
+
+def other(bot_key: str) -> str:
+    return "bot2" if bot_key == "bot1" else "bot1"
+
+
+class GameState:
+    """
+    Available players are an id-indexed dict (O(1) lookup and removal, pool
+    order preserved), teams/balances/top-5 are keyed by "bot1"/"bot2", and
+    each team's top-5 fantasy points are kept sorted as picks are awarded.
+    """
+
+    __slots__ = (
+        "pool",
+        "available",
+        "teams",
+        "balances",
+        "top5",
+        "top5_sums",
+        "current_turn",
+        "draft_order",
+        "turn_count",
+        "_available_list",
+    )
+
+    def __init__(self, players: list[dict], current_turn: str, balance: int = STARTING_BALANCE):
+        self.pool: tuple[dict, ...] = tuple(players)  # every player in the game, drafted or not
+        self.available: dict[int, dict] = {p["id"]: p for p in players}
+        self.teams: dict[str, list[dict]] = {"bot1": [], "bot2": []}
+        self.balances: dict[str, int] = {"bot1": balance, "bot2": balance}
+        self.top5: dict[str, list[float]] = {"bot1": [], "bot2": []}  # ascending
+        self.top5_sums: dict[str, float] = {"bot1": 0.0, "bot2": 0.0}
+        self.current_turn = current_turn
+        self.draft_order = 0
+        self.turn_count = 0
+        self._available_list: list[dict] | None = None
+
+    def available_players(self) -> list[dict]:
+        """List view of the available players, rebuilt at most once per pick."""
+        if self._available_list is None:
+            self._available_list = list(self.available.values())
+        return self._available_list
+
+    def player(self, player_id: int) -> dict | None:
+        return self.available.get(player_id)
+
+    def award(self, bot_key: str, player_id: int, amount: int) -> dict:
+        """Move a player onto `bot_key`'s team for `amount` credits and return the pick."""
+        player = self.available.pop(player_id)
+        self._available_list = None
+        self.draft_order += 1
+        pick = {
+            "player_id": player["id"],
+            "first_name": player["first_name"],
+            "last_name": player["last_name"],
+            "fantasy_points": player["fantasy_points"],
+            "bid_amount": amount,
+            "draft_order": self.draft_order,
+        }
+        self.teams[bot_key].append(pick)
+        self.balances[bot_key] -= amount
+
+        top = self.top5[bot_key]
+        if len(top) < SCORING_SLOTS or pick["fantasy_points"] > top[0]:
+            bisect.insort(top, pick["fantasy_points"])
+            if len(top) > SCORING_SLOTS:
+                top.pop(0)
+            # Sum highest-first so scores round exactly like a sorted top-5 sum
+            self.top5_sums[bot_key] = sum(reversed(top))
+        return pick
+
+    def score(self, bot_key: str) -> float:
+        return round(self.top5_sums[bot_key], 1)
+
+    def state_key(self) -> tuple:
+        """Identifies the decision point the next nomination is made from."""
+        return (self.current_turn, self.draft_order, self.balances["bot1"], self.balances["bot2"])
+
+    def to_dict(self) -> dict:
+        return {
+            "pool": list(self.pool),
+            "available": list(self.available.values()),
+            "teams": {k: list(v) for k, v in self.teams.items()},
+            "balances": dict(self.balances),
+            "current_turn": self.current_turn,
+            "draft_order": self.draft_order,
+            "turn_count": self.turn_count,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "GameState":
+        state = cls(data["available"], data["current_turn"])
+        if "pool" in data:  # older checkpoints only kept the available players
+            state.pool = tuple(data["pool"])
+        state.balances = dict(data["balances"])
+        state.draft_order = data["draft_order"]
+        state.turn_count = data["turn_count"]
+        for key in BOT_KEYS:
+            team = list(data["teams"][key])
+            state.teams[key] = team
+            top = sorted(p["fantasy_points"] for p in team)[-SCORING_SLOTS:]
+            state.top5[key] = top
+            state.top5_sums[key] = sum(reversed(top))
+        return state
@@ -0,0 +1,98 @@
+"""
+Persistence for games (games, game_players and game_log_chunks rows).
+"""
+
+from database import Client
+from services import game_log, leaderboard_cache
+from services.scoring import DEFAULT_PROFILE
+
+
+def winner_bot_id(bot1_id: str, bot2_id: str, result: dict) -> str | None:
+    if result["bot1_score"] > result["bot2_score"]:
+        return bot1_id
+    if result["bot2_score"] > result["bot1_score"]:
+        return bot2_id
+    return None
+
+
+def _draft_rows(game_id: str, bot_id: str, team: list[dict]) -> list[dict]:
+    return [
+        {
+            "game_id": game_id,
+            "bot_id": bot_id,
+            "player_id": pick["player_id"],
+            "bid_amount": pick["bid_amount"],
+            "fantasy_points": pick["fantasy_points"],
+            "draft_order": order + 1,
+        }
+        for order, pick in enumerate(team)
+    ]
+
+
+def start_game(db: Client, user_id: str, bot1_id: str, bot2_id: str) -> dict | None:
+    """Insert an in_progress games row, so a streamed game can store its log as it runs."""
+    row = {"user_id": user_id, "bot1_id": bot1_id, "bot2_id": bot2_id, "status": "in_progress"}
+    result = db.table("games").insert(row).execute()
+    return result.data[0] if result.data else None
+
+
+def set_status(db: Client, game_id: str, status: str, current: str) -> bool:
+    """Move a game from status `current` to `status`; False if it wasn't in `current`."""
+    result = db.table("games").update({"status": status}).eq("id", game_id).eq("status", current).execute()
+    return bool(result.data)
+
+
+def save_log_chunks(db: Client, rows: list[dict]):
+    if rows:
+        # Upsert: a resumed game rewrites the chunks after its last checkpoint
+        db.table("game_log_chunks").upsert(rows).execute()
+
+
+def save_game(
+    db: Client,
+    user_id: str,
+    bot1_id: str,
+    bot2_id: str,
+    result: dict,
+    game_id: str | None = None,
+) -> dict | None:
+    """
+    Save a completed game result (as produced by run_game) and its drafted
+    players. With `game_id`, completes the row made by start_game instead of
+    inserting one. A game_log list is stored as chunks; a GameLogWriter's
+    remaining lines are flushed. Returns the games row, or None if the write
+    failed.
+    """
+    best_score, best_bot_id = leaderboard_cache.best_of(bot1_id, bot2_id, result)
+    game_row = {
+        "bot1_score": result["bot1_score"],
+        "bot2_score": result["bot2_score"],
+        "winner_bot_id": winner_bot_id(bot1_id, bot2_id, result),
+        "best_score": best_score,
+        "best_bot_id": best_bot_id,
+        "scoring_profile": result.get("scoring_profile") or DEFAULT_PROFILE,
+        "status": "complete",
+    }
+    if game_id is None:
+        game_row.update({"user_id": user_id, "bot1_id": bot1_id, "bot2_id": bot2_id})
+        game_res = db.table("games").insert(game_row).execute()
+    else:
+        game_res = db.table("games").update(game_row).eq("id", game_id).execute()
+    if not game_res.data:
+        return None
+    game = game_res.data[0]
+
+    log = result["game_log"]
+    if isinstance(log, game_log.GameLogWriter):
+        save_log_chunks(db, log.take_chunks(final=True))
+    else:
+        save_log_chunks(db, game_log.chunk_rows(game["id"], log))
+
+    draft_rows = _draft_rows(game["id"], bot1_id, result["bot1_team"])
+    draft_rows += _draft_rows(game["id"], bot2_id, result["bot2_team"])
+    if draft_rows:
+        # Upsert: a resumed game may have saved its picks before it was interrupted
+        db.table("game_players").upsert(draft_rows, on_conflict="game_id,player_id").execute()
+
+    leaderboard_cache.record(game)
+    return game
@@ -0,0 +1,169 @@
+"""
+In-process top-K leaderboard.
+
+Each games row stores its winning score in the denormalized, indexed
+`best_score` column (with `best_bot_id`), so the database can return the top
+K with one index scan of K rows. Each worker keeps that top K in a bounded
+min-heap that is warmed at startup and updated by game_store.save_game. It is
+re-read after `settings.leaderboard_ttl` seconds so games saved by other
+workers show up. Reads never scan more than CAPACITY entries.
+
+Scores under different scoring profiles aren't comparable, so the
+leaderboard only ranks games played under the deployment's default profile
+(`settings.scoring_profile`); games with another profile stay in history.
+"""
+
+import heapq
+import threading
+import time
+from database import get_supabase
+from config import settings
+
+CAPACITY = 100  # largest `limit` the leaderboard endpoint accepts
+
+LEADERBOARD_COLUMNS = (
+    "id, user_id, bot1_id, best_score, best_bot_id, created_at, "
+    "users(username), best_bot:bots!games_best_bot_id_fkey(name)"
+)
+
+_heap: list[tuple[float, str]] = []  # (score, game_id), lowest score first
+_entries: dict[str, dict] = {}
+_ranked: list[dict] | None = None
+_loaded_at: float | None = None
+_lock = threading.Lock()
+
+
+def best_of(bot1_id: str, bot2_id: str, result: dict) -> tuple[float, str]:
+    """Winning score of a game and the bot that scored it (bot1 on ties)."""
+    if result["bot1_score"] >= result["bot2_score"]:
+        return result["bot1_score"], bot1_id
+    return result["bot2_score"], bot2_id
+
+
+def _entry(row: dict) -> dict:
+    entry = {
+        "game_id": row["id"],
+        "user_id": row["user_id"],
+        "bot1_id": row.get("bot1_id"),
+        "best_bot_id": row["best_bot_id"],
+        "score": row["best_score"],
+        "created_at": row["created_at"],
+        "username": None,
+        "bot_name": None,
+    }
+    if "users" in row:
+        entry["username"] = row["users"]["username"] if row["users"] else "Unknown"
+    if "best_bot" in row:
+        entry["bot_name"] = row["best_bot"]["name"] if row["best_bot"] else _fallback_bot_name(entry)
+    return entry
+
+
+def _fallback_bot_name(entry: dict) -> str:
+    return "Bot 1" if entry["best_bot_id"] == entry["bot1_id"] else "Bot 2"
+
+
+def _push(entry: dict) -> bool:
+    """Add an entry if it makes the top CAPACITY. Caller holds the lock."""
+    global _ranked
+    if entry["game_id"] in _entries:
+        return False
+    item = (entry["score"], entry["game_id"])
+    if len(_heap) < CAPACITY:
+        heapq.heappush(_heap, item)
+    elif item > _heap[0]:
+        _, evicted = heapq.heapreplace(_heap, item)
+        del _entries[evicted]
+    else:
+        return False
+    _entries[entry["game_id"]] = entry
+    _ranked = None
+    return True
+
+
+def load(rows: list[dict]):
+    """Replace the leaderboard with games rows (as selected by LEADERBOARD_COLUMNS)."""
+    global _ranked, _loaded_at
+    with _lock:
+        _heap.clear()
+        _entries.clear()
+        _ranked = None
+        for row in rows:
+            if row.get("best_score") is not None:
+                _push(_entry(row))
+        _loaded_at = time.monotonic()
+
+
+def warm(db=None):
+    """Load the top CAPACITY games from the database."""
+    if db is None:
+        db = get_supabase()
+    result = (
+        db.table("games")
+        .select(LEADERBOARD_COLUMNS)
+        .eq("status", "complete")
+        .eq("scoring_profile", settings.scoring_profile)
+        # DESC puts NULLs first; rows the backfill missed must not fill the page
+        .not_.is_("best_score", "null")
+        .order("best_score", desc=True)
+        .limit(CAPACITY)
+        .execute()
+    )
+    load(result.data)
+
+
+def record(game: dict) -> bool:
+    """Offer a freshly saved games row; returns True if it entered the top K."""
+    with _lock:
+        if _loaded_at is None:
+            return False  # not warmed yet; the first read loads it from the database
+        if game.get("best_score") is None or game.get("scoring_profile") != settings.scoring_profile:
+            return False
+        return _push(_entry(game))
+
+
+def invalidate():
+    """Drop the in-process copy; the next read re-warms it."""
+    global _ranked, _loaded_at
+    with _lock:
+        _heap.clear()
+        _entries.clear()
+        _ranked = None
+        _loaded_at = None
+
+
+def rename_bot(bot_id: str, name: str):
+    with _lock:
+        for entry in _entries.values():
+            if entry["best_bot_id"] == bot_id:
+                entry["bot_name"] = name
+
+
+def _hydrate(db, entries: list[dict]):
+    """Fill in usernames and bot names for games recorded since the last warm."""
+    ids = [e["game_id"] for e in entries]
+    result = db.table("games").select(LEADERBOARD_COLUMNS).in_("id", ids).execute()
+    rows = {row["id"]: _entry(row) for row in result.data}
+    with _lock:
+        for entry in entries:
+            row = rows.get(entry["game_id"])
+            entry["username"] = row["username"] if row else "Unknown"
+            entry["bot_name"] = row["bot_name"] if row else _fallback_bot_name(entry)
+
+
+def top(limit: int, db=None) -> list[dict]:
+    """Highest-scoring games, best first."""
+    global _ranked
+    if _loaded_at is None or time.monotonic() - _loaded_at > settings.leaderboard_ttl:
+        warm(db)
+
+    with _lock:
+        if _ranked is None:
+            _ranked = sorted(_entries.values(), key=lambda e: (e["score"], e["game_id"]), reverse=True)
+        ranked = _ranked[:limit]
+
+    missing = [e for e in ranked if e["username"] is None]
+    if missing:
+        if db is None:
+            db = get_supabase()
+        _hydrate(db, missing)
+    return ranked
@@ -0,0 +1,182 @@
+"""
+Content-addressed cache for bot LLM decisions.
+
+Keys are a hash of (model, temperature, prompt, response schema), so the same
+situation replayed in another game or tournament resolves without a model
+call. Entries live in a bounded in-memory LRU, optionally backed by a SQLite
+file that survives restarts. Disk writes are write-behind: `put` only
+updates memory and queues the row, and one writer thread inserts whatever
+has queued up and commits once per batch. Reads are split the same way:
+`get_memory` never touches SQLite, and async callers run `get_disk` on a
+thread, so the event loop never waits on SQLite.
+
+Enabled by `settings.llm_cache`; when left unset, the cache is only on in
+deterministic mode (`openai_temperature == 0`), where a cached answer is
+exactly what the model would return anyway.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from config import settings
+
+
+def make_key(model: str, temperature: float, prompt: str, schema: dict) -> str:
+    # Trailing whitespace never changes the model's answer, so normalize it away
+    normalized_prompt = "\n".join(line.rstrip() for line in prompt.strip().splitlines())
+    payload = json.dumps(
+        {
+            "model": model,
+            "temperature": round(float(temperature), 4),
+            "prompt": normalized_prompt,
+            "schema": schema,
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class LLMCache:
+    def __init__(self, max_entries: int, path: str | None = None):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, str] = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: sqlite3.Connection | None = None
+        self._db_lock = threading.Lock()
+        self._pending: dict[str, str] = {}  # queued for the writer
+        self._flush_scheduled: Future | None = None
+        self._writer: ThreadPoolExecutor | None = None
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("CREATE TABLE IF NOT EXISTS llm_cache (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+            self._db.commit()
+            self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="llm-cache-writer")
+
+    @property
+    def has_disk(self) -> bool:
+        return self._db is not None
+
+    def get(self, key: str) -> str | None:
+        """Memory, then disk; blocks on SQLite, so not for the event loop."""
+        value = self.get_memory(key)
+        if value is None and self._db is not None:
+            value = self.get_disk(key)
+        return value
+
+    def get_memory(self, key: str) -> str | None:
+        """The in-memory tier only. A miss is counted here unless `get_disk` follows."""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            value = self._pending.get(key)  # evicted before the writer got to it
+            if value is not None:
+                self._remember(key, value)
+                self.hits += 1
+                return value
+            if self._db is None:
+                self.misses += 1
+            return None
+
+    def get_disk(self, key: str) -> str | None:
+        """
+        The SQLite tier; may wait for the writer's commit, so call it from a
+        thread. Outside the memory lock, so a put never waits on the disk.
+        """
+        with self._db_lock:
+            row = self._db.execute("SELECT value FROM llm_cache WHERE key = ?", (key,)).fetchone()
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return None
+            self._remember(key, row[0])
+            self.hits += 1
+            self.disk_hits += 1
+            return row[0]
+
+    def put(self, key: str, value: str):
+        with self._lock:
+            self._remember(key, value)
+            if self._writer is not None:
+                self._pending[key] = value
+                if self._flush_scheduled is None:
+                    self._flush_scheduled = self._writer.submit(self._write_pending)
+
+    def _write_pending(self):
+        """Writer thread: insert everything queued so far in one transaction."""
+        with self._lock:
+            rows = list(self._pending.items())
+            self._pending.clear()
+            self._flush_scheduled = None
+        if rows:
+            with self._db_lock:
+                self._db.executemany("INSERT OR REPLACE INTO llm_cache (key, value) VALUES (?, ?)", rows)
+                self._db.commit()
+
+    def flush(self):
+        """Block until every queued row is on disk (tournament end, tests)."""
+        if self._writer is not None:
+            self._writer.submit(self._write_pending).result()
+
+    def _remember(self, key: str, value: str):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._pending.clear()
+            if self._db is not None:
+                with self._db_lock:
+                    self._db.execute("DELETE FROM llm_cache")
+                    self._db.commit()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "entries": len(self._entries),
+            "pending_writes": len(self._pending),
+        }
+
+
+_cache: LLMCache | None = None
+_cache_lock = threading.Lock()
+
+
+def is_enabled() -> bool:
+    if settings.llm_cache is not None:
+        return settings.llm_cache
+    return settings.openai_temperature == 0
+
+
+def get_cache() -> LLMCache | None:
+    """Return the process-wide cache, or None when caching is disabled."""
+    global _cache
+    if not is_enabled():
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = LLMCache(settings.llm_cache_size, settings.llm_cache_path)
+    return _cache
+
+
+def stats() -> dict | None:
+    """Stats of the process-wide cache; None until it is first used or when disabled."""
+    cache = _cache
+    return cache.stats() if cache is not None else None
@@ -0,0 +1,274 @@
+"""
+Process-wide admission control for LLM calls.
+
+Every bot decision that reaches OpenAI goes through `LLMScheduler.call`. A
+call waits for room in two token buckets, requests per minute
+(`settings.openai_rpm`) and tokens per minute (`settings.openai_tpm`).
+A request's tokens are estimated up front from the prompt, then corrected
+from the response's usage. Waiting calls are queued per game and admitted
+round-robin, so a game with a burst of calls can't starve the others. The
+game is taken from the `current_game` context variable, which the engine
+sets.
+
+A 429 pauses admission for everyone: for the provider's Retry-After when
+given, otherwise for a jittered exponential backoff. The call is then
+retried through the queue, up to `settings.openai_max_retries` times.
+Connection errors and 5xx responses are retried with the same backoff
+without pausing the others. So the OpenAI client is built with its own
+retries off.
+"""
+
+import asyncio
+import contextvars
+import itertools
+import random
+import time
+import weakref
+from collections import deque
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+from config import settings
+
+if TYPE_CHECKING:
+    import openai
+
+# Completion tokens reserved per call until the real usage is known
+COMPLETION_TOKENS_ESTIMATE = 150
+
+current_game: contextvars.ContextVar = contextvars.ContextVar("llm_game", default=None)
+_game_ids = itertools.count(1)
+
+
+def start_game() -> int:
+    """Give the current context (a game) its own queue in the scheduler."""
+    game = next(_game_ids)
+    current_game.set(game)
+    return game
+
+
+class TokenBucket:
+    """
+    Refills continuously at `per_minute` / 60 per second. Holds at most one
+    second's worth, since providers also enforce per-minute limits over
+    shorter windows and a full minute's burst would trip them.
+    """
+
+    def __init__(self, per_minute: int):
+        self.rate = per_minute / 60
+        self.capacity = self.rate
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until `amount` (capped at capacity) is available."""
+        self._refill(now)
+        missing = min(amount, self.capacity) - self.level
+        return max(0.0, missing / self.rate)
+
+    def take(self, amount: float):
+        self.level -= amount  # may go negative when usage beats the estimate
+
+    def give(self, amount: float):
+        self.level = min(self.capacity, self.level + amount)
+
+
+@dataclass
+class _Waiter:
+    future: asyncio.Future
+    tokens: int
+    queued_at: float = field(default_factory=time.monotonic)
+
+
+class LLMScheduler:
+    def __init__(
+        self,
+        rpm: int | None = None,
+        tpm: int | None = None,
+        max_retries: int = 5,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0,
+    ):
+        self.requests = TokenBucket(rpm) if rpm else None
+        self.tokens = TokenBucket(tpm) if tpm else None
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self._queues: dict[object, deque[_Waiter]] = {}
+        self._turns: deque = deque()  # games with waiters, in round-robin order
+        self._paused_until = 0.0
+        self._timer: asyncio.TimerHandle | None = None
+
+        self.in_flight = 0
+        self.admitted = 0
+        self.rate_limited = 0
+        self.retries = 0
+        self.failed = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    # --- Admission ---
+
+    def _wait_time(self, tokens: int, now: float) -> float:
+        wait = self._paused_until - now
+        if self.requests is not None:
+            wait = max(wait, self.requests.wait_time(1, now))
+        if self.tokens is not None:
+            wait = max(wait, self.tokens.wait_time(tokens, now))
+        return max(0.0, wait)
+
+    def _admit(self, waiter: _Waiter, now: float):
+        if self.requests is not None:
+            self.requests.take(1)
+        if self.tokens is not None:
+            self.tokens.take(waiter.tokens)
+        waited = now - waiter.queued_at
+        self.admitted += 1
+        self.wait_total += waited
+        self.wait_max = max(self.wait_max, waited)
+        waiter.future.set_result(waited)
+
+    def _pump(self):
+        self._timer = None
+        now = time.monotonic()
+        while self._turns:
+            game = self._turns[0]
+            queue = self._queues[game]
+            waiter = queue[0]
+            if waiter.future.done():  # cancelled while queued
+                queue.popleft()
+            else:
+                wait = self._wait_time(waiter.tokens, now)
+                if wait > 0:
+                    self._timer = asyncio.get_running_loop().call_later(wait, self._pump)
+                    return
+                queue.popleft()
+                self._admit(waiter, now)
+            self._turns.popleft()
+            if queue:
+                self._turns.append(game)  # back of the line
+            else:
+                del self._queues[game]
+
+    async def acquire(self, tokens: int) -> float:
+        """Wait for admission of one request of ~`tokens`; returns seconds waited."""
+        game = current_game.get()
+        waiter = _Waiter(asyncio.get_running_loop().create_future(), tokens)
+        queue = self._queues.get(game)
+        if queue is None:
+            queue = self._queues[game] = deque()
+            self._turns.append(game)
+        queue.append(waiter)
+        if self._timer is None:
+            self._pump()
+        return await waiter.future
+
+    def settle(self, reserved: int, used: int):
+        """Correct the token bucket once a call's real usage is known."""
+        if self.tokens is not None:
+            self.tokens.give(reserved - used)
+
+    def _pause(self, seconds: float):
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._turns:
+            self._timer = asyncio.get_running_loop().call_later(seconds, self._pump)
+
+    # --- Calls ---
+
+    def _backoff(self, attempt: int) -> float:
+        # Full jitter, so retries from many games don't arrive together
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2**attempt))
+
+    async def call(self, request, tokens: int):
+        """
+        Run `request()` (a coroutine function making one API call) once
+        admitted, retrying 429s, connection errors and 5xx responses.
+        """
+        import openai  # deferred with the client; already loaded by the time a call is made
+
+        attempt = 0
+        while True:
+            await self.acquire(tokens)
+            self.in_flight += 1
+            try:
+                result = await request()
+            except openai.RateLimitError as e:
+                self.rate_limited += 1
+                error = e
+                # The provider is over its limit for everyone, not just this
+                # call: hold the whole queue, then retry from the back of it
+                self._pause(max(self._backoff(attempt), _retry_after(e)))
+                delay = 0.0
+            except (openai.APIConnectionError, openai.InternalServerError) as e:
+                error = e
+                delay = self._backoff(attempt)
+            else:
+                usage = getattr(result, "usage", None)
+                if usage is not None:
+                    self.settle(tokens, usage.total_tokens)
+                return result
+            finally:
+                self.in_flight -= 1
+
+            if attempt >= self.max_retries:
+                self.failed += 1
+                raise error
+            attempt += 1
+            self.retries += 1
+            if delay:
+                await asyncio.sleep(delay)
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        queued = sum(1 for q in self._queues.values() for w in q if not w.future.done())
+        return {
+            "queue_depth": queued,
+            "queued_games": len(self._queues),
+            "in_flight": self.in_flight,
+            "admitted": self.admitted,
+            "rate_limited": self.rate_limited,
+            "retries": self.retries,
+            "failed": self.failed,
+            "wait_avg_ms": round(self.wait_total / self.admitted * 1000, 1) if self.admitted else 0.0,
+            "wait_max_ms": round(self.wait_max * 1000, 1),
+            "paused_ms": round(max(0.0, self._paused_until - now) * 1000, 1),
+            "requests_available": None if self.requests is None else int(self.requests.level),
+            "tokens_available": None if self.tokens is None else int(self.tokens.level),
+        }
+
+
+def _retry_after(error: "openai.RateLimitError") -> float:
+    try:
+        return float(error.response.headers.get("retry-after", 0))
+    except (AttributeError, ValueError):
+        return 0.0
+
+
+_schedulers: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, LLMScheduler]" = weakref.WeakKeyDictionary()
+
+
+def get_scheduler() -> LLMScheduler:
+    """The scheduler for the running event loop (one per worker in the server)."""
+    loop = asyncio.get_running_loop()
+    scheduler = _schedulers.get(loop)
+    if scheduler is None:
+        scheduler = _schedulers[loop] = LLMScheduler(
+            rpm=settings.openai_rpm,
+            tpm=settings.openai_tpm,
+            max_retries=settings.openai_max_retries,
+            backoff_base=settings.openai_backoff_base,
+            backoff_max=settings.openai_backoff_max,
+        )
+    return scheduler
+
+
+def stats() -> dict:
+    """Stats of the running loop's scheduler (all zero before the first call)."""
+    return get_scheduler().stats()
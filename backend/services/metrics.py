@@ -0,0 +1,130 @@
+"""
+In-process metrics, rendered in the Prometheus text format at /api/metrics.
+
+Histograms and gauges are plain counters in lists. They are only updated
+from the event loop thread (DB timings are taken around the thread offload,
+not inside it), so recording needs no locks: one bisect, a dict lookup and
+a few increments.
+"""
+
+import bisect
+import math
+
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 15.0, 30.0, 60.0)
+DB_BUCKETS = (0.002, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+TOKEN_BUCKETS = (100, 250, 500, 1000, 2000, 4000, 8000, 16000)
+COUNT_BUCKETS = (5, 10, 15, 20, 25, 30, 40, 60, 100, 200)
+GAME_BUCKETS = (1, 5, 15, 30, 60, 120, 300, 600, 1200)
+
+_registry: list = []
+
+
+def _labels(names: tuple[str, ...], values: tuple, extra: str = "") -> str:
+    parts = [f'{n}="{v}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, buckets: tuple, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(buckets)
+        self.label_names = labels
+        # label values -> per-bucket counts (last slot is +Inf), sum
+        self._series: dict[tuple, list] = {}
+        _registry.append(self)
+
+    def observe(self, value: float, *labels):
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def total(self, *labels) -> tuple[int, float]:
+        """(observations, sum) for one set of label values."""
+        series = self._series.get(labels)
+        return (sum(series[0]), series[1]) if series is not None else (0, 0.0)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, total) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                le = _labels(self.label_names, labels, f'le="{_number(bound)}"')
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, labels)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, labels)} {cumulative}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = labels
+        self._values: dict[tuple, float] = {}
+        _registry.append(self)
+
+    def inc(self, *labels, amount: float = 1):
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels) -> float:
+        return self._values.get(labels, 0)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_labels(self.label_names, labels)} {_number(value)}")
+        return lines
+
+
+class Gauge:
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self.value = 0
+        _registry.append(self)
+
+    def inc(self, amount: float = 1):
+        self.value += amount
+
+    def dec(self, amount: float = 1):
+        self.value -= amount
+
+    def render(self) -> list[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge", f"{self.name} {_number(self.value)}"]
+
+
+def render(scraped: list[tuple[str, str, str, float]] = ()) -> str:
+    """Every registered metric, plus `scraped` (name, type, help, value) samples read at scrape time."""
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    for name, kind, help, value in scraped:
+        lines.extend([f"# HELP {name} {help}", f"# TYPE {name} {kind}", f"{name} {_number(value)}"])
+    return "\n".join(lines) + "\n"
+
+
+llm_call_seconds = Histogram(
+    "llm_call_seconds", "OpenAI call latency, including rate-limit queueing", LATENCY_BUCKETS, ("call",)
+)
+llm_tokens = Histogram("llm_tokens_per_call", "Tokens per OpenAI call", TOKEN_BUCKETS, ("call", "kind"))
+db_call_seconds = Histogram("db_call_seconds", "Database call latency, including pool wait", DB_BUCKETS, ("table",))
+game_turns = Histogram("game_turns", "Turns per finished game", COUNT_BUCKETS)
+game_bid_rounds = Histogram("game_bid_rounds", "Bid rounds per finished game", COUNT_BUCKETS)
+game_seconds = Histogram("game_duration_seconds", "Wall-clock time per finished game", GAME_BUCKETS)
+response_cache_requests = Counter(
+    "response_cache_requests_total", "Cached read-endpoint requests by outcome (hit or miss)", ("route", "result")
+)
+response_not_modified = Counter("response_not_modified_total", "Conditional GETs answered with 304", ("route",))
+sse_streams = Gauge("sse_active_streams", "Game event streams currently open")
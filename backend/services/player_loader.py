@@ -8,66 +8,78 @@ Usage:
 
 import sys
 import pandas as pd
-from services.scoring import calculate_fantasy_points
+from services.scoring import calculate_fantasy_points, round_points
+
+
+# players column -> CSV column for the season totals copied as-is
+TOTAL_COLUMNS = {
+    "minutes": "numMinutes",
+    "points": "points",
+    "assists": "assists",
+    "blocks": "blocks",
+    "steals": "steals",
+    "rebounds_total": "reboundsTotal",
+    "turnovers": "turnovers",
+}
+
+# Per-game average -> CSV season total it is derived from
+PER_GAME_COLUMNS = {
+    "ppg": "points",
+    "rpg": "reboundsTotal",
+    "apg": "assists",
+    "spg": "steals",
+    "bpg": "blocks",
+    "topg": "turnovers",
+}
 
 
 def load_players(csv_path: str):
     df = pd.read_csv(csv_path)
 
-    # Compute per-game averages
-    df = df[df["gamesPlayed"] >= 10].copy()  # Filter viable players
+    df = df[df["gamesPlayed"] >= 10]  # Filter viable players
     gp = df["gamesPlayed"]
-    df["ppg"] = (df["points"] / gp).round(2)
-    df["rpg"] = (df["reboundsTotal"] / gp).round(2)
-    df["apg"] = (df["assists"] / gp).round(2)
-    df["spg"] = (df["steals"] / gp).round(2)
-    df["bpg"] = (df["blocks"] / gp).round(2)
-    df["topg"] = (df["turnovers"] / gp).round(2)
-
-    df["fantasy_points"] = df.apply(
-        lambda r: round(
-            calculate_fantasy_points(r["ppg"], r["rpg"], r["apg"], r["spg"], r["bpg"], r["topg"]),
-            2,
-        ),
-        axis=1,
+
+    players = pd.DataFrame(
+        {
+            "id": df["personId"].astype("int64"),
+            "first_name": df["firstName"],
+            "last_name": df["lastName"],
+            "games_played": gp.astype("int64"),
+        }
     )
+    for column, source in TOTAL_COLUMNS.items():
+        players[column] = df[source].astype("float64")
+
+    # Compute per-game averages, one column-wide division each
+    for column, source in PER_GAME_COLUMNS.items():
+        players[column] = (df[source] / gp).round(2)
 
-    rows = []
-    for _, r in df.iterrows():
-        rows.append(
-            {
-                "id": int(r["personId"]),
-                "first_name": r["firstName"],
-                "last_name": r["lastName"],
-                "games_played": int(r["gamesPlayed"]),
-                "minutes": float(r["numMinutes"]),
-                "points": float(r["points"]),
-                "assists": float(r["assists"]),
-                "blocks": float(r["blocks"]),
-                "steals": float(r["steals"]),
-                "rebounds_total": float(r["reboundsTotal"]),
-                "turnovers": float(r["turnovers"]),
-                "ppg": float(r["ppg"]),
-                "rpg": float(r["rpg"]),
-                "apg": float(r["apg"]),
-                "spg": float(r["spg"]),
-                "bpg": float(r["bpg"]),
-                "topg": float(r["topg"]),
-                "fantasy_points": float(r["fantasy_points"]),
-            }
+    players["fantasy_points"] = round_points(
+        calculate_fantasy_points(
+            players["ppg"], players["rpg"], players["apg"], players["spg"], players["bpg"], players["topg"]
         )
+    )
 
-    return rows
+    # Columnar to_dict("records"): tolist() converts each column to Python
+    # scalars in one C pass instead of boxing value by value
+    columns = list(players.columns)
+    values = [players[c].tolist() for c in columns]
+    return [dict(zip(columns, row)) for row in zip(*values)]
 
 
 def seed_supabase(rows: list[dict]):
     from database import get_supabase
+    from services import player_pool, response_cache
 
     db = get_supabase()
     # Upsert in batches of 100
     for i in range(0, len(rows), 100):
         batch = rows[i : i + 100]
         db.table("players").upsert(batch).execute()
+    # Refresh this process's snapshot (and with it the search index); other
+    # workers pick it up on TTL expiry
+    player_pool.prime(rows)
+    response_cache.invalidate("players")
     print(f"Seeded {len(rows)} players into Supabase")
 
 
@@ -0,0 +1,219 @@
+"""
+Process-wide player snapshot and stratified pool sampler.
+
+The players table changes about once a season, so every worker keeps one
+snapshot in memory (refreshed after `settings.player_cache_ttl` seconds or on
+`invalidate()`) with the tier buckets precomputed as index tuples. Sampling a
+game pool never touches the network once the snapshot is warm. The snapshot
+holds the whole table, so the players endpoint searches it too (see
+`PlayerSnapshot.search_index`); only players with MIN_FANTASY_POINTS or more
+are ever sampled.
+"""
+
+import random
+import threading
+import time
+from database import get_supabase
+from config import settings
+from services import player_search, scoring
+
+PLAYER_COLUMNS = "id, first_name, last_name, games_played, ppg, rpg, apg, spg, bpg, topg, fantasy_points"
+_PLAYER_KEYS = tuple(c.strip() for c in PLAYER_COLUMNS.split(","))
+MIN_FANTASY_POINTS = 8
+POOL_SIZE = 24
+
+# (tier name, min fantasy points inclusive, max exclusive, players per pool)
+TIERS = [
+    ("elite", 40, None, 5),
+    ("good", 25, 40, 7),
+    ("mid", 15, 25, 7),
+    ("role", 8, 15, 5),
+]
+
+
+class PlayerSnapshot:
+    """
+    Immutable view of the players table with precomputed tier indexes.
+    Scores and tiers for non-default scoring profiles are computed from the
+    stat matrix on first use and cached on the snapshot. Players are sorted
+    by fantasy points, so the sampleable ones are the first `eligible`.
+    """
+
+    __slots__ = ("players", "eligible", "tiers", "loaded_at", "version", "stats", "_profiles", "_search")
+
+    def __init__(self, players: list[dict], version: int):
+        self.players = tuple(sorted(players, key=lambda p: p["fantasy_points"], reverse=True))
+        self.eligible = sum(1 for p in self.players if p["fantasy_points"] >= MIN_FANTASY_POINTS)
+        self.loaded_at = time.monotonic()
+        self.version = version
+
+        buckets: dict[str, list[int]] = {name: [] for name, *_ in TIERS}
+        for i, p in enumerate(self.players[: self.eligible]):
+            fp = p["fantasy_points"]
+            for name, low, high, _ in TIERS:
+                if fp >= low and (high is None or fp < high):
+                    buckets[name].append(i)
+                    break
+        self.tiers = {name: tuple(idx) for name, idx in buckets.items()}
+
+        self.stats = scoring.stat_matrix(self.players[: self.eligible])
+        # profile name -> (weights, scores by player index, tiers)
+        self._profiles: dict[str, tuple] = {}
+        self._search: player_search.PlayerIndex | None = None
+
+    def _score_profiles(self):
+        """Score every registered profile in one matrix product."""
+        import numpy as np
+
+        names = [n for n in scoring.PROFILES if n != scoring.DEFAULT_PROFILE]
+        matrix = scoring.score_profiles(self.stats, names)
+        # Same tier sizes as the default profile, filled by rank
+        sizes = [len(self.tiers[tier]) for tier, *_ in TIERS]
+        profiles = {}
+        for col, name in enumerate(names):
+            scores = matrix[:, col]
+            order = np.argsort(-scores, kind="stable").tolist()
+            tiers = {}
+            start = 0
+            for (tier, *_), size in zip(TIERS, sizes):
+                tiers[tier] = tuple(order[start : start + size])
+                start += size
+            profiles[name] = (scoring.PROFILES[name], tuple(scores.tolist()), tiers)
+        # Swapped in whole, so concurrent readers see either the old or new cache
+        self._profiles = profiles
+
+    def profile(self, name: str) -> tuple[tuple[float, ...] | None, dict[str, tuple[int, ...]]]:
+        """
+        (scores by player index, tiers) under scoring profile `name`. The
+        default profile is the stored fantasy_points column, so its scores
+        are None.
+        """
+        if name == scoring.DEFAULT_PROFILE:
+            return None, self.tiers
+        weights = scoring.get_profile(name)
+        cached = self._profiles.get(name)
+        if cached is None or cached[0] != weights:
+            self._score_profiles()
+            cached = self._profiles[name]
+        return cached[1], cached[2]
+
+    def is_stale(self, ttl: float) -> bool:
+        return time.monotonic() - self.loaded_at > ttl
+
+    def search_index(self, build: bool = True) -> player_search.PlayerIndex | None:
+        """
+        Name search over every player, built on first use and kept for the
+        snapshot's lifetime. With `build=False`, None until it has been built.
+        """
+        index = self._search
+        if index is None and build:
+            index = self._search = player_search.PlayerIndex(self.players)
+        return index
+
+    def sample_indices(
+        self,
+        rng: random.Random,
+        size: int = POOL_SIZE,
+        tiers: dict[str, tuple[int, ...]] | None = None,
+    ) -> list[int]:
+        """
+        Stratified random pick of `size` player indexes:
+        5 elite (40+), 7 good (25-40), 7 mid (15-25), 5 role (8-15 fantasy pts),
+        topped up from the other eligible players if a tier is short. Pass a
+        profile's `tiers` to stratify by that profile instead.
+        """
+        if tiers is None:
+            tiers = self.tiers
+        picked: list[int] = []
+        for name, _, _, count in TIERS:
+            bucket = tiers[name]
+            picked.extend(rng.sample(bucket, min(count, len(bucket))))
+
+        missing = min(size, self.eligible) - len(picked)
+        if missing > 0:
+            chosen = set(picked)
+            remaining = [i for i in range(self.eligible) if i not in chosen]
+            picked.extend(rng.sample(remaining, missing))
+
+        rng.shuffle(picked)
+        return picked[:size]
+
+    def sample(self, rng: random.Random, size: int = POOL_SIZE, profile: str = scoring.DEFAULT_PROFILE) -> list[dict]:
+        """Sampled player dicts, with fantasy_points scored under `profile`."""
+        scores, tiers = self.profile(profile)
+        indices = self.sample_indices(rng, size, tiers)
+        if scores is None:
+            return [dict(self.players[i]) for i in indices]
+        return [{**self.players[i], "fantasy_points": scores[i]} for i in indices]
+
+
+_snapshot: PlayerSnapshot | None = None
+_version = 0
+_lock = threading.Lock()
+
+
+def _fetch_players() -> list[dict]:
+    db = get_supabase()
+    result = (
+        db.table("players")
+        .select(PLAYER_COLUMNS)
+        .order("fantasy_points", desc=True)
+        .execute()
+    )
+    return result.data
+
+
+def prime(players: list[dict]) -> PlayerSnapshot:
+    """Install a snapshot built from already-loaded rows (no DB round trip)."""
+    global _snapshot, _version
+    rows = [{k: p[k] for k in _PLAYER_KEYS} for p in players]
+    with _lock:
+        _version += 1
+        _snapshot = PlayerSnapshot(rows, _version)
+        return _snapshot
+
+
+def cached_snapshot() -> PlayerSnapshot | None:
+    """The current snapshot if it is loaded and fresh, without any I/O."""
+    snap = _snapshot
+    if snap is None or snap.is_stale(settings.player_cache_ttl):
+        return None
+    return snap
+
+
+def get_snapshot(force_refresh: bool = False) -> PlayerSnapshot:
+    """Return the current snapshot, loading it from Supabase if missing or expired."""
+    global _snapshot, _version
+    snap = _snapshot
+    if snap is not None and not force_refresh and not snap.is_stale(settings.player_cache_ttl):
+        return snap
+
+    with _lock:
+        snap = _snapshot
+        if snap is not None and not force_refresh and not snap.is_stale(settings.player_cache_ttl):
+            return snap
+        players = _fetch_players()
+        _version += 1
+        _snapshot = PlayerSnapshot(players, _version)
+        return _snapshot
+
+
+def invalidate():
+    """Drop the cached snapshot; the next read reloads it from Supabase."""
+    global _snapshot
+    with _lock:
+        _snapshot = None
+
+
+def sample_pool(
+    seed: int | None = None,
+    rng: random.Random | None = None,
+    profile: str = scoring.DEFAULT_PROFILE,
+) -> list[dict]:
+    """
+    Sample a game pool scored under `profile`. Pass `seed` (or a seeded
+    `rng`) to reproduce a pool exactly for the same snapshot.
+    """
+    if rng is None:
+        rng = random.Random(seed)
+    return get_snapshot().sample(rng, profile=profile)
@@ -0,0 +1,92 @@
+"""
+In-memory player search for the players endpoint.
+
+Every worker keeps an index over the whole players table. Matching is by
+case- and accent-insensitive substring of the first, last or full name. It
+uses a posting list for every 1-3 character gram, and candidates are checked
+against the normalized names. Results are ranked by fantasy points and
+paginated with a keyset cursor, so autocomplete never touches the database
+once the index is warm. The index is built from player_pool's snapshot (see
+`PlayerSnapshot.search_index`), so it is reloaded and reseeded along with it.
+"""
+
+import bisect
+import unicodedata
+
+MAX_GRAM = 3
+
+
+def normalize(text: str) -> str:
+    """Lowercase and strip accents, so "jokic" finds "Jokić"."""
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).lower().strip()
+
+
+def _grams(text: str, n: int) -> set[str]:
+    return {text[i : i + n] for i in range(len(text) - n + 1)}
+
+
+class PlayerIndex:
+    """Players ranked by fantasy points with gram posting lists over their names."""
+
+    __slots__ = ("players", "names", "keys", "postings")
+
+    def __init__(self, players: list[dict]):
+        self.players = tuple(sorted(players, key=lambda p: (-p["fantasy_points"], p["id"])))
+        # Rank order as (-fantasy_points, id) keys, for cursor lookups
+        self.keys = [(-p["fantasy_points"], p["id"]) for p in self.players]
+        # "first\nlast\nfirst last": one substring test covers all three names
+        self.names = tuple(
+            "\n".join((normalize(p["first_name"]), normalize(p["last_name"]),
+                       normalize(f"{p['first_name']} {p['last_name']}")))
+            for p in self.players
+        )
+        postings: dict[str, set[int]] = {}
+        for rank, name in enumerate(self.names):
+            for n in range(1, MAX_GRAM + 1):
+                for gram in _grams(name, n):
+                    if "\n" not in gram:
+                        postings.setdefault(gram, set()).add(rank)
+        self.postings = {gram: frozenset(ranks) for gram, ranks in postings.items()}
+
+    def _matches(self, query: str) -> list[int] | range:
+        if not query:
+            return range(len(self.players))
+        n = min(len(query), MAX_GRAM)
+        sets = []
+        for gram in _grams(query, n):
+            ranks = self.postings.get(gram)
+            if ranks is None:
+                return []
+            sets.append(ranks)
+        sets.sort(key=len)
+        candidates = sets[0].intersection(*sets[1:])
+        if len(query) > MAX_GRAM:
+            candidates = [r for r in candidates if query in self.names[r]]
+        return sorted(candidates)
+
+    def search(self, query: str, limit: int, after: tuple[float, int] | None = None) -> tuple[list[dict], tuple | None]:
+        """
+        Up to `limit` players matching `query`, best first, starting after the
+        `after` cursor key. Returns the page and the cursor for the next page.
+        """
+        ranks = self._matches(normalize(query))
+        start = 0
+        if after is not None:
+            # Ranks are positions in key order, so the cursor maps to a rank
+            start = bisect.bisect_left(ranks, bisect.bisect_right(self.keys, after))
+        page = [self.players[r] for r in ranks[start : start + limit]]
+        next_key = None
+        if start + limit < len(ranks):
+            next_key = self.keys[ranks[start + limit - 1]]
+        return page, next_key
+
+
+def encode_cursor(key: tuple[float, int]) -> str:
+    return f"{-key[0]}:{key[1]}"
+
+
+def decode_cursor(cursor: str) -> tuple[float, int]:
+    """Inverse of encode_cursor; raises ValueError on a malformed cursor."""
+    fantasy_points, player_id = cursor.rsplit(":", 1)
+    return (-float(fantasy_points), int(player_id))
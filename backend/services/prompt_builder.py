@@ -0,0 +1,196 @@
+"""
+Compact, token-budgeted prompts for the LLM bots.
+
+Players and teams are encoded as pipe-separated tables, and each player's row
+is formatted once per builder. Every prompt a bot sends during a game opens
+with the same prefix: the rules, its strategy and the game's whole player
+pool. Provider prompt caching only applies past 1024 tokens; with the
+24-player CSV pool the prefix is about 1.1k (benchmarks/prompt_cache.py
+measures it), so smaller pools won't cache. Drafting doesn't change it;
+players already taken are listed by id (DRAFTED) in the per-turn part, after
+the call's task. With a token budget, the pool table is trimmed to the top
+players once per game, so it stays identical between calls.
+"""
+
+GAME_RULES = """You are a fantasy basketball bidding bot in a two-bot auction draft.
+
+RULES:
+- Each bot starts with 100 credits, meaning the average active roster player is worth about 20 credits.
+- Only your top 5 players by fantasy points count for scoring
+- You have a maximum of 12 slots, but can only score for the top 5.
+- Your bids CANNOT exceed YOUR BALANCE
+- If your opponent has 0 credits, they cannot counter — you will win at any bid
+- Consider which players would most improve your team
+- Consider blocking opponent from getting key players
+
+Tables are pipe-separated. Players: id|name|gp|ppg|rpg|apg|spg|bpg|topg|fantasy. Teams: name|fantasy|cost.
+Players listed under DRAFTED are no longer available."""
+
+INITIAL_BID_TASK = """YOUR TASK: pick one available player and set an opening bid (minimum 1 credit).
+If your opponent has 0 credits, bid the minimum (1 credit)."""
+
+BID_RESPONSE_TASK = """YOUR TASK: respond to the current bid.
+- "pass" = let the bidder win this player at the current price
+- "counter" = raise the bid (must be higher than the current bid, cannot exceed YOUR BALANCE)"""
+
+# Tokens kept free for the per-turn part when a budget trims the pool table
+TURN_RESERVE_TOKENS = 300
+
+MAX_CACHED_TEAM_TABLES = 1024
+MAX_CACHED_POOL_TABLES = 64
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token for English/JSON-ish text)."""
+    return len(text) // 4 + 1
+
+
+class PromptBuilder:
+    """
+    Builds bot prompts, caching formatted player rows and team tables.
+    One builder is meant to live for a game (or a tournament over the same
+    player snapshot).
+    """
+
+    def __init__(self, token_budget: int | None = None):
+        self.token_budget = token_budget
+        self._player_rows: dict[tuple, str] = {}
+        self._team_tables: dict[tuple, str] = {}
+        self._pool_tables: dict[tuple, str] = {}
+
+    def player_row(self, p: dict) -> str:
+        # Keyed on the score too: a player's fantasy_points depend on the game's scoring profile
+        key = (p["id"], p["fantasy_points"])
+        row = self._player_rows.get(key)
+        if row is None:
+            row = (
+                f"{p['id']}|{p['first_name']} {p['last_name']}|{p['games_played']}|"
+                f"{p['ppg']}|{p['rpg']}|{p['apg']}|{p['spg']}|{p['bpg']}|{p['topg']}|{p['fantasy_points']}"
+            )
+            self._player_rows[key] = row
+        return row
+
+    def team_table(self, team: list[dict]) -> str:
+        # Teams only grow by appending picks, so the pick ids identify the table
+        key = tuple((p["player_id"], p["bid_amount"]) for p in team)
+        table = self._team_tables.get(key)
+        if table is None:
+            if not team:
+                table = "(empty)"
+            else:
+                table = "\n".join(
+                    f"{p['first_name']} {p['last_name']}|{p['fantasy_points']}|{p['bid_amount']}"
+                    for p in team
+                )
+            if len(self._team_tables) >= MAX_CACHED_TEAM_TABLES:
+                self._team_tables.clear()
+            self._team_tables[key] = table
+        return table
+
+    def pool_table(self, pool: list[dict], strategy_head: str) -> str:
+        """
+        The game's whole player pool, best first. It doesn't change while the
+        game runs, so it belongs in the cached prefix. With a token budget
+        it's trimmed once per pool to the top players, keeping a reserve for
+        the per-turn part.
+        """
+        key = tuple((p["id"], p["fantasy_points"]) for p in pool)
+        budget = None
+        if self.token_budget is not None:
+            budget = max(0, self.token_budget - estimate_tokens(strategy_head) - TURN_RESERVE_TOKENS)
+            key += (budget,)
+        table = self._pool_tables.get(key)
+        if table is None:
+            ranked = sorted(pool, key=lambda p: (-p["fantasy_points"], p["id"]))
+            rows = []
+            used = 0
+            for p in ranked:
+                row = self.player_row(p)
+                cost = estimate_tokens(row)
+                if budget is not None and rows and used + cost > budget:
+                    break
+                rows.append(row)
+                used += cost
+            if len(rows) < len(ranked):
+                title = f"PLAYER POOL (top {len(rows)} of {len(ranked)} by fantasy points):"
+            else:
+                title = "PLAYER POOL:"
+            table = title + "\n" + "\n".join(rows)
+            if len(self._pool_tables) >= MAX_CACHED_POOL_TABLES:
+                self._pool_tables.clear()
+            self._pool_tables[key] = table
+        return table
+
+    def _prefix(self, strategy: str, pool: list[dict]) -> str:
+        """Rules, strategy and pool: identical for every call a bot makes in a game."""
+        head = f'{GAME_RULES}\n\nYour strategy is: "{strategy}"\n\n'
+        return head + self.pool_table(pool, head) + "\n\n"
+
+    @staticmethod
+    def _drafted(pool: list[dict], available_players: list[dict]) -> str:
+        available = {p["id"] for p in available_players}
+        drafted = [str(p["id"]) for p in pool if p["id"] not in available]
+        return ",".join(drafted) if drafted else "(none)"
+
+    def initial_bid(
+        self,
+        strategy: str,
+        available_players: list[dict],
+        balance: int,
+        opponent_balance: int,
+        my_team: list[dict],
+        opponent_team: list[dict],
+        pool: list[dict] | None = None,
+    ) -> str:
+        """`pool` is every player in the game; without it the available players stand in."""
+        if pool is None:
+            pool = available_players
+        return f"""{self._prefix(strategy, pool)}{INITIAL_BID_TASK}
+
+DRAFTED: {self._drafted(pool, available_players)}
+
+YOUR TEAM:
+{self.team_table(my_team)}
+
+OPPONENT TEAM:
+{self.team_table(opponent_team)}
+
+YOUR BALANCE: {balance} credits
+OPPONENT BALANCE: {opponent_balance} credits
+
+Pick a player and opening bid amount. Follow your strategy."""
+
+    def bid_response(
+        self,
+        strategy: str,
+        player: dict,
+        current_bid: int,
+        bidder_name: str,
+        balance: int,
+        opponent_balance: int,
+        my_team: list[dict],
+        opponent_team: list[dict],
+        available_players: list[dict],
+        pool: list[dict] | None = None,
+    ) -> str:
+        if pool is None:
+            pool = available_players
+        return f"""{self._prefix(strategy, pool)}{BID_RESPONSE_TASK}
+
+CURRENT BID:
+  Player: {player['first_name']} {player['last_name']} (Fantasy: {player['fantasy_points']})
+  Current bid: {current_bid} credits (by {bidder_name})
+
+DRAFTED: {self._drafted(pool, available_players)}
+
+YOUR TEAM:
+{self.team_table(my_team)}
+
+OPPONENT TEAM:
+{self.team_table(opponent_team)}
+
+YOUR BALANCE: {balance} credits
+OPPONENT BALANCE: {opponent_balance} credits
+REMAINING PLAYERS IN POOL: {len(available_players)}
+
+Decide: counter or pass. Follow your strategy."""
@@ -0,0 +1,250 @@
+"""
+Async data access for the route handlers and the game engine.
+
+The Supabase client is synchronous. Awaiting it directly from an async
+handler blocks the event loop and stalls every SSE stream on the worker. So
+each query's network round trip runs on a worker thread instead. Threads are
+bounded by a limiter sized to the PostgREST connection pool
+(`settings.db_pool_size`), so an offloaded call never queues twice. Building
+a query stays on the loop; only `.execute()` is offloaded.
+"""
+
+import asyncio
+import functools
+import time
+import weakref
+from datetime import datetime
+from uuid import UUID
+import anyio
+import anyio.to_thread
+from database import Client
+from config import settings
+from services import bot_cache, game_log, game_store, leaderboard_cache, metrics, player_pool, player_search, response_cache, tracing
+
+_limiters: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, anyio.CapacityLimiter]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _limiter() -> anyio.CapacityLimiter:
+    # One per event loop: a limiter can't be shared across loops (CLI runs, tests)
+    loop = asyncio.get_running_loop()
+    limiter = _limiters.get(loop)
+    if limiter is None:
+        limiter = _limiters[loop] = anyio.CapacityLimiter(settings.db_pool_size)
+    return limiter
+
+
+def _table(fn) -> str:
+    # A query's bound .execute knows its path ("/games"); helpers go by name
+    path = getattr(getattr(fn, "__self__", None), "path", None)
+    if isinstance(path, str):
+        return path.lstrip("/")
+    return getattr(fn, "__name__", "other")
+
+
+async def run(fn, *args, **kwargs):
+    """Run a blocking call on the bounded DB thread pool."""
+    table = _table(fn)
+    if kwargs:
+        fn = functools.partial(fn, **kwargs)
+    start = time.perf_counter()
+    try:
+        with tracing.span("db", table=table):
+            return await anyio.to_thread.run_sync(fn, *args, limiter=_limiter())
+    finally:
+        # Timed here on the loop thread, so the histogram needs no lock
+        metrics.db_call_seconds.observe(time.perf_counter() - start, table)
+
+
+# --- Users ---
+
+async def create_user(db: Client, username: str) -> dict | None:
+    result = await run(db.table("users").insert({"username": username}).execute)
+    return result.data[0] if result.data else None
+
+
+async def get_user(db: Client, user_id: str) -> dict | None:
+    result = await run(db.table("users").select("*").eq("id", user_id).execute)
+    return result.data[0] if result.data else None
+
+
+# --- Bots ---
+
+async def create_bot(db: Client, user_id: str, name: str, strategy_prompt: str) -> dict | None:
+    query = db.table("bots").insert({"user_id": user_id, "name": name, "strategy_prompt": strategy_prompt})
+    result = await run(query.execute)
+    response_cache.invalidate(f"bots:{user_id}")
+    return result.data[0] if result.data else None
+
+
+async def get_bots(db: Client, bot_ids: list[str]) -> dict[str, dict]:
+    """Bots by id, from the bot cache; misses are fetched in one query."""
+    bots, missing = bot_cache.get_many(bot_ids)
+    if missing:
+        version = bot_cache.version()
+        result = await run(db.table("bots").select("*").in_("id", missing).execute)
+        bot_cache.put(result.data, version)
+        bots.update((bot["id"], bot) for bot in result.data)
+    return bots
+
+
+async def get_user_bots(db: Client, user_id: str) -> list[dict]:
+    query = db.table("bots").select("*").eq("user_id", user_id).order("created_at", desc=False)
+    return (await run(query.execute)).data
+
+
+async def update_bot(db: Client, bot_id: str, updates: dict) -> dict | None:
+    result = await run(db.table("bots").update(updates).eq("id", bot_id).execute)
+    if not result.data:
+        return None
+    bot = result.data[0]
+    bot_cache.invalidate(bot_id)
+    response_cache.invalidate(f"bots:{bot['user_id']}")
+    if "name" in updates:
+        leaderboard_cache.rename_bot(bot_id, updates["name"])
+        response_cache.invalidate("leaderboard")
+    return bot
+
+
+async def delete_bot(db: Client, bot_id: str):
+    result = await run(db.table("bots").delete().eq("id", bot_id).execute)
+    bot_cache.invalidate(bot_id)
+    # Deleting a bot cascades to its games
+    leaderboard_cache.invalidate()
+    response_cache.invalidate("leaderboard", *{f"bots:{bot['user_id']}" for bot in result.data})
+
+
+# --- Games ---
+
+# Everything but the legacy inline game_log; logs are paged by get_game_log.
+# History only lists complete games: streamed games are 'in_progress' while
+# they run and 'abandoned' if the stream ends before the save
+HISTORY_COLUMNS = (
+    "id, user_id, bot1_id, bot2_id, bot1_score, bot2_score, winner_bot_id, scoring_profile, status, created_at"
+)
+
+
+async def start_game(db: Client, user_id: str, bot1_id: str, bot2_id: str) -> dict | None:
+    return await run(game_store.start_game, db, user_id, bot1_id, bot2_id)
+
+
+async def save_game(
+    db: Client, user_id: str, bot1_id: str, bot2_id: str, result: dict, game_id: str | None = None
+) -> dict | None:
+    game = await run(game_store.save_game, db, user_id, bot1_id, bot2_id, result, game_id)
+    if game is not None:
+        response_cache.invalidate("leaderboard")
+    return game
+
+
+async def abandon_game(db: Client, game_id: str) -> bool:
+    """Mark an in_progress game abandoned (a resume from its checkpoint can still complete it)."""
+    return await run(game_store.set_status, db, game_id, "abandoned", "in_progress")
+
+
+async def reopen_game(db: Client, game_id: str) -> bool:
+    """Mark an abandoned game in_progress again when its stream is resumed."""
+    return await run(game_store.set_status, db, game_id, "in_progress", "abandoned")
+
+
+async def save_log_chunks(db: Client, rows: list[dict]):
+    if rows:
+        await run(game_store.save_log_chunks, db, rows)
+
+
+async def get_game_log(db: Client, game_id: str, offset: int, limit: int) -> tuple[list[str], bool] | None:
+    """
+    Log lines [offset, offset + limit) of a game, and whether more follow.
+    None if the game doesn't exist.
+    """
+    # One line past the page tells us whether there is a next one
+    first, last = game_log.page_chunks(offset, limit + 1)
+    query = (
+        db.table("game_log_chunks")
+        .select("seq, data")
+        .eq("game_id", game_id)
+        .gte("seq", first)
+        .lte("seq", last)
+        .order("seq")
+    )
+    chunks = (await run(query.execute)).data
+    if chunks:
+        lines = [line for chunk in chunks for line in game_log.decode_chunk(chunk["data"])]
+        start = offset - first * game_log.CHUNK_LINES
+    else:
+        # Games saved before chunked logs kept the whole log on the row
+        rows = (await run(db.table("games").select("game_log").eq("id", game_id).execute)).data
+        if not rows:
+            return None
+        lines = rows[0]["game_log"] or []
+        start = offset
+    page = lines[start : start + limit + 1]
+    return page[:limit], len(page) > limit
+
+
+async def get_user_games(
+    db: Client,
+    user_id: str,
+    limit: int,
+    before: datetime | None = None,
+    before_id: UUID | None = None,
+) -> tuple[list[dict], dict[str, list[dict]]]:
+    """
+    One page of a user's games, newest first, keyed on (created_at, id),
+    plus their drafted players grouped by game id.
+    """
+    query = (
+        db.table("games")
+        .select(f"{HISTORY_COLUMNS}, bots!games_bot1_id_fkey(name), bot2:bots!games_bot2_id_fkey(name)")
+        .eq("user_id", user_id)
+        .eq("status", "complete")
+    )
+    if before is not None:
+        # Only parsed values go into the filter string, so a cursor can't add terms
+        created_at = before.isoformat()
+        if before_id is not None:
+            query = query.or_(
+                f'created_at.lt."{created_at}",and(created_at.eq."{created_at}",id.lt.{before_id})'
+            )
+        else:
+            query = query.lt("created_at", created_at)
+    games = (await run(query.order("created_at", desc=True).order("id", desc=True).limit(limit).execute)).data
+
+    # All drafted players for the page in one round trip
+    picks_by_game: dict[str, list[dict]] = {g["id"]: [] for g in games}
+    if games:
+        query = (
+            db.table("game_players")
+            .select("*, players(first_name, last_name)")
+            .in_("game_id", list(picks_by_game))
+            .order("draft_order")
+        )
+        for gp in (await run(query.execute)).data:
+            picks_by_game[gp["game_id"]].append(gp)
+    return games, picks_by_game
+
+
+# --- Leaderboard ---
+
+async def get_leaderboard(db: Client, limit: int) -> list[dict]:
+    return await run(leaderboard_cache.top, limit, db)
+
+
+# --- Players ---
+
+async def get_player_snapshot() -> player_pool.PlayerSnapshot:
+    """The warm snapshot without leaving the loop; reloads go to a thread."""
+    snapshot = player_pool.cached_snapshot()
+    if snapshot is None:
+        snapshot = await run(player_pool.get_snapshot)
+    return snapshot
+
+
+async def get_player_index() -> player_search.PlayerIndex:
+    """The snapshot's search index; building it after a reload goes to a thread."""
+    snapshot = await get_player_snapshot()
+    index = snapshot.search_index(build=False)
+    if index is None:
+        index = await run(snapshot.search_index)
+    return index
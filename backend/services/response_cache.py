@@ -0,0 +1,192 @@
+"""
+Server-side cache and conditional GETs for the hot read endpoints.
+
+`respond()` serves /api/players, /api/leaderboard and /api/bots/user/{id}.
+It keys on the path plus the sorted query string and keeps the serialized
+body, a strong ETag and the route's extra headers in a bounded per-worker
+LRU for the route's TTL. A request whose If-None-Match matches gets a 304,
+whether the body came from the cache or was just built. Responses are sent
+with `Cache-Control: no-cache`, so browsers revalidate every time instead of
+showing a stale list.
+
+Each entry carries tags ("players", "leaderboard", "bots:<user id>"). The
+write paths call `invalidate()` with the tags they affect. A response built
+while one of its tags was being invalidated is served but not stored. Other
+workers only see the write when their entries expire, so the TTLs
+(`settings.*_response_ttl`) bound the staleness.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+from config import settings
+from services import metrics
+
+
+@dataclass
+class _Entry:
+    body: bytes
+    etag: str
+    headers: dict[str, str]
+    tags: tuple[str, ...]
+    expires: float
+
+
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """If-None-Match uses the weak comparison, so W/ prefixes are ignored."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+class ResponseCache:
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._by_tag: dict[str, set[str]] = {}
+        self._generations: dict[str, int] = {}
+        # Writes invalidate from DB worker threads as well as the loop
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> _Entry | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.expires <= time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def generation(self, tags: tuple[str, ...]) -> tuple[int, ...]:
+        with self._lock:
+            return tuple(self._generations.get(tag, 0) for tag in tags)
+
+    def put(self, key: str, entry: _Entry, generation: tuple[int, ...]) -> bool:
+        """Store `entry` unless one of its tags was invalidated since `generation`."""
+        with self._lock:
+            if tuple(self._generations.get(tag, 0) for tag in entry.tags) != generation:
+                return False
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            for tag in entry.tags:
+                self._by_tag.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+            return True
+
+    def _remove(self, key: str):
+        """Caller holds the lock."""
+        entry = self._entries.pop(key)
+        for tag in entry.tags:
+            keys = self._by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_tag[tag]
+
+    def invalidate(self, *tags: str) -> int:
+        """Drop every entry carrying one of `tags`; returns how many were dropped."""
+        dropped = 0
+        with self._lock:
+            for tag in tags:
+                self._generations[tag] = self._generations.get(tag, 0) + 1
+                for key in list(self._by_tag.get(tag, ())):
+                    self._remove(key)
+                    dropped += 1
+        return dropped
+
+    def clear(self):
+        with self._lock:
+            for tag in self._by_tag:
+                self._generations[tag] = self._generations.get(tag, 0) + 1
+            self._entries.clear()
+            self._by_tag.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_cache = ResponseCache(settings.response_cache_size)
+_routes: set[str] = set()
+
+
+def invalidate(*tags: str) -> int:
+    return _cache.invalidate(*tags)
+
+
+def clear():
+    _cache.clear()
+
+
+def _key(request: Request) -> str:
+    query = "&".join(sorted(request.url.query.split("&"))) if request.url.query else ""
+    return f"{request.url.path}?{query}"
+
+
+def _response(entry: _Entry, request: Request, route: str, cache_status: str) -> Response:
+    headers = {**entry.headers, "ETag": entry.etag, "Cache-Control": "no-cache", "X-Cache": cache_status}
+    if etag_matches(request.headers.get("if-none-match"), entry.etag):
+        metrics.response_not_modified.inc(route)
+        return Response(status_code=304, headers=headers)
+    return Response(entry.body, media_type="application/json", headers=headers)
+
+
+async def respond(
+    request: Request,
+    route: str,
+    ttl: float,
+    tags: tuple[str, ...],
+    adapter: TypeAdapter,
+    build: Callable[[dict[str, str]], Awaitable[object]],
+) -> Response:
+    """
+    The cached response for `request`, or a fresh one from `build(headers)`,
+    serialized through `adapter` (the route's response model). `build` may
+    set extra response headers in the dict it's given; they are cached with
+    the body. A `ttl` of 0 skips the cache but still sends the ETag.
+    """
+    _routes.add(route)
+    key = _key(request)
+    entry = _cache.get(key) if ttl > 0 else None
+    if entry is not None:
+        metrics.response_cache_requests.inc(route, "hit")
+        return _response(entry, request, route, "HIT")
+
+    metrics.response_cache_requests.inc(route, "miss")
+    generation = _cache.generation(tags)
+    headers: dict[str, str] = {}
+    data = await build(headers)
+    body = adapter.dump_json(adapter.validate_python(data))
+    entry = _Entry(body, make_etag(body), headers, tags, time.monotonic() + ttl)
+    if ttl > 0:
+        _cache.put(key, entry, generation)
+    return _response(entry, request, route, "MISS")
+
+
+def stats() -> dict:
+    """Hit rate per route for this worker."""
+    routes = {}
+    for route in sorted(_routes):
+        hits = metrics.response_cache_requests.value(route, "hit")
+        misses = metrics.response_cache_requests.value(route, "miss")
+        routes[route] = {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / (hits + misses), 3) if hits + misses else 0.0,
+            "not_modified": metrics.response_not_modified.value(route),
+        }
+    return {"entries": len(_cache), "max_entries": _cache.max_entries, "routes": routes}
@@ -1,6 +1,97 @@
-def calculate_fantasy_points(ppg: float, rpg: float, apg: float, spg: float, bpg: float, topg: float) -> float:
+"""
+Fantasy scoring: the standard formula plus a registry of scoring profiles.
+
+A profile is a weight per per-game stat column (STAT_COLUMNS). Scoring a
+player table under several profiles is one matrix product of the (players x
+stats) matrix with the (stats x profiles) weight matrix.
+"""
+
+import math
+from collections.abc import Iterable, Sequence
+from typing import TYPE_CHECKING, TypeVar
+
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+
+# numpy is imported where it is used, so routes that never score (health,
+# players, bots) don't load it on a cold start
+Stat = TypeVar("Stat", float, "np.ndarray", "pd.Series")
+
+
+def calculate_fantasy_points(ppg: Stat, rpg: Stat, apg: Stat, spg: Stat, bpg: Stat, topg: Stat) -> Stat:
     """
     Fantasy point formula (per-game averages):
     Points: 1x | Rebounds: 1.2x | Assists: 1.5x | Steals: 3x | Blocks: 3x | Turnovers: -1x
+
+    Takes scalars or equal-length NumPy arrays / pandas Series and computes
+    element-wise, so a whole stats table is scored in one expression.
     """
     return (ppg * 1.0) + (rpg * 1.2) + (apg * 1.5) + (spg * 3.0) + (bpg * 3.0) + (topg * -1.0)
+
+
+def round_points(values: "pd.Series", ndigits: int = 2) -> "pd.Series":
+    """
+    Round like the builtin round() on every element. NumPy rounds the scaled
+    value, which differs from round() for inputs within a hair of a .5 tie
+    (e.g. 20.915 -> 20.92 vs 20.91); those few elements are re-rounded one
+    at a time so stored fantasy points don't shift when players are reseeded.
+    """
+    import numpy as np
+
+    rounded = values.round(ndigits)
+    scaled = values * 10**ndigits
+    near_tie = (scaled - np.floor(scaled) - 0.5).abs() < 1e-6
+    if near_tie.any():
+        rounded[near_tie] = [round(v, ndigits) for v in values[near_tie]]
+    return rounded
+
+
+# Per-game stat columns, in the order profile weights are listed
+STAT_COLUMNS = ("ppg", "rpg", "apg", "spg", "bpg", "topg")
+
+DEFAULT_PROFILE = "standard"
+
+PROFILES: dict[str, tuple[float, ...]] = {
+    # The stored fantasy_points column (calculate_fantasy_points)
+    "standard": (1.0, 1.2, 1.5, 3.0, 3.0, -1.0),
+    # Points only
+    "points": (1.0, 0.0, 0.0, 0.0, 0.0, 0.0),
+    # Category-style: each stat weighted by ~1/its spread across eligible
+    # players, so every category moves a score about as much as scoring does
+    "categories": (1.0, 3.0, 4.0, 16.0, 18.0, -8.0),
+}
+
+
+def register_profile(name: str, weights: Sequence[float]):
+    """Add or replace a scoring profile (one weight per STAT_COLUMNS entry)."""
+    if name == DEFAULT_PROFILE:
+        raise ValueError(f"{DEFAULT_PROFILE!r} is the stored fantasy_points formula and can't be replaced")
+    weights = tuple(float(w) for w in weights)
+    if len(weights) != len(STAT_COLUMNS):
+        raise ValueError(f"Profile {name!r} needs {len(STAT_COLUMNS)} weights ({', '.join(STAT_COLUMNS)})")
+    if not all(math.isfinite(w) for w in weights):
+        raise ValueError(f"Profile {name!r} has a non-finite weight")
+    PROFILES[name] = weights
+
+
+def get_profile(name: str) -> tuple[float, ...]:
+    try:
+        return PROFILES[name]
+    except KeyError:
+        raise ValueError(f"Unknown scoring profile {name!r}, expected one of {sorted(PROFILES)}") from None
+
+
+def stat_matrix(players: Iterable[dict]) -> "np.ndarray":
+    """(players x STAT_COLUMNS) float matrix."""
+    import numpy as np
+
+    return np.array([[p[c] for c in STAT_COLUMNS] for p in players], dtype=np.float64).reshape(-1, len(STAT_COLUMNS))
+
+
+def score_profiles(stats: "np.ndarray", names: Sequence[str]) -> "np.ndarray":
+    """(players x profiles) scores, rounded to 2 decimals, for every profile in `names`."""
+    import numpy as np
+
+    weights = np.array([get_profile(n) for n in names], dtype=np.float64).T
+    return np.round(stats @ weights, 2)
@@ -0,0 +1,93 @@
+"""
+Server-sent event encoding for streamed games.
+
+`frames` writes one frame per engine event: the original wire format.
+
+`batched_frames` is the leaner mode. The engine runs in its own task and
+feeds a bounded queue. Each frame is an `event: batch` holding every event
+that was queued since the last write. So the events of one engine tick go
+out together, and a slow client gets fewer, larger frames instead of a
+growing backlog. Once the queue is full the engine waits for the client.
+Payloads are encoded with orjson when it is installed. The full game log on
+`game_complete` is replaced by a digest (see services.game_log), since the
+client has already received every line as a log event.
+"""
+
+import asyncio
+import json
+from config import settings
+from services import game_log, metrics
+
+try:
+    import orjson
+except ImportError:  # optional; the stdlib encoder is a fine fallback
+    orjson = None
+
+
+def dumps(data) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+def _compact(event: dict) -> dict:
+    if event["type"] != "game_complete" or "game_log" not in event:
+        return event
+    compact = {k: v for k, v in event.items() if k != "game_log"}
+    compact["game_log_digest"] = game_log.digest(event["game_log"])
+    return compact
+
+
+async def frames(events):
+    """One SSE frame per event."""
+    metrics.sse_streams.inc()
+    try:
+        async for event in events:
+            yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+    finally:
+        metrics.sse_streams.dec()
+        # Run the game's cleanup now rather than whenever the generator is collected
+        aclose = getattr(events, "aclose", None)
+        if aclose is not None:
+            await aclose()
+
+
+async def batched_frames(events, max_pending: int | None = None):
+    """
+    Coalesce `events` into `event: batch` frames, each holding a JSON array of
+    the events queued since the previous frame. At most `max_pending`
+    (default `settings.sse_queue_size`) events are buffered.
+    """
+    queue: asyncio.Queue = asyncio.Queue(max_pending or settings.sse_queue_size)
+    done = object()
+
+    async def produce():
+        try:
+            async for event in events:
+                await queue.put(event)
+        except Exception as e:
+            # Re-raised by the consumer, in the response task
+            await queue.put(e)
+            return
+        await queue.put(done)
+
+    producer = asyncio.create_task(produce())
+    metrics.sse_streams.inc()
+    try:
+        while True:
+            batch = [await queue.get()]
+            while not queue.empty():
+                batch.append(queue.get_nowait())
+
+            end = batch[-1] is done or isinstance(batch[-1], Exception)
+            payload = batch[:-1] if end else batch
+            if payload:
+                yield b"event: batch\ndata: " + dumps([_compact(e) for e in payload]) + b"\n\n"
+            if end:
+                if batch[-1] is not done:
+                    raise batch[-1]
+                return
+    finally:
+        # Client went away (or the stream failed): stop the game with it
+        producer.cancel()
+        metrics.sse_streams.dec()
@@ -0,0 +1,379 @@
+"""
+Headless bot-vs-bot tournaments on top of run_game.
+
+Matches run concurrently under a fixed worker limit and every finished match
+is appended to a JSONL journal as soon as it completes. Re-running the same
+command skips matches already in the journal, so an interrupted tournament
+resumes where it stopped. Each record notes the scoring profile and bot
+backend it was played with, and a journal is only resumed with the same ones.
+
+Usage:
+    cd backend
+    python -m services.tournament --bots <bot_id> <bot_id> ... --out results.jsonl
+    python -m services.tournament --prompts strategies.txt --format swiss --rounds 5 \\
+        --concurrency 16 --out results.jsonl --parquet results.parquet
+"""
+
+import argparse
+import asyncio
+import functools
+import hashlib
+import importlib.util
+import itertools
+import json
+import os
+import random
+import sys
+import time
+from config import settings
+from services.bot_backends import BACKENDS, BotBackend, get_backend
+from services.bot_brain import close_client
+from services.game_engine import run_game
+from services.scoring import PROFILES
+
+FORMATS = ("round-robin", "swiss")
+
+
+def load_bots(bot_ids: list[str]) -> list[dict]:
+    from database import get_supabase
+
+    result = get_supabase().table("bots").select("*").in_("id", bot_ids).execute()
+    by_id = {b["id"]: b for b in result.data}
+    missing = [bid for bid in bot_ids if bid not in by_id]
+    if missing:
+        raise ValueError(f"Bots not found: {', '.join(missing)}")
+    return [by_id[bid] for bid in bot_ids]
+
+
+def bots_from_prompts(prompts: list[str]) -> list[dict]:
+    """Build in-memory entrants from raw strategy prompts (ids are prompt hashes)."""
+    bots = []
+    for i, prompt in enumerate(prompts):
+        digest = hashlib.sha256(prompt.encode()).hexdigest()[:12]
+        bots.append({"id": f"prompt-{digest}", "name": f"Prompt {i + 1}", "strategy_prompt": prompt})
+    return bots
+
+
+def _match_seed(seed: int, match_id: str) -> int:
+    return int(hashlib.sha256(f"{seed}:{match_id}".encode()).hexdigest()[:12], 16)
+
+
+def _match(round_no: int, bot1: dict, bot2: dict, seed: int) -> dict:
+    match_id = f"r{round_no}:{bot1['id']}:{bot2['id']}"
+    return {
+        "match_id": match_id,
+        "round": round_no,
+        "bot1": bot1,
+        "bot2": bot2,
+        "seed": _match_seed(seed, match_id),
+    }
+
+
+def round_robin_schedule(bots: list[dict], rounds: int, seed: int) -> list[dict]:
+    """Every pair meets once per round; seats alternate between rounds."""
+    matches = []
+    for round_no in range(1, rounds + 1):
+        for a, b in itertools.combinations(bots, 2):
+            first, second = (a, b) if round_no % 2 else (b, a)
+            matches.append(_match(round_no, first, second, seed))
+    return matches
+
+
+def standings(bots: list[dict], results: list[dict]) -> dict[str, dict]:
+    table = {b["id"]: {"name": b["name"], "points": 0.0, "wins": 0, "losses": 0, "ties": 0, "score_total": 0.0, "games": 0} for b in bots}
+    for r in results:
+        if r.get("error"):
+            continue
+        for key, opp in (("bot1", "bot2"), ("bot2", "bot1")):
+            row = table.get(r[f"{key}_id"])
+            if row is None:
+                continue
+            row["games"] += 1
+            row["score_total"] += r[f"{key}_score"]
+            if r[f"{key}_score"] > r[f"{opp}_score"]:
+                row["wins"] += 1
+                row["points"] += 1
+            elif r[f"{key}_score"] < r[f"{opp}_score"]:
+                row["losses"] += 1
+            else:
+                row["ties"] += 1
+                row["points"] += 0.5
+    return table
+
+
+def swiss_pairings(bots: list[dict], results: list[dict], round_no: int, seed: int) -> list[dict]:
+    """
+    Pair bots with equal (or nearest) tournament points, avoiding rematches
+    where possible. Deterministic for a given seed and set of prior results.
+    """
+    table = standings(bots, results)
+    played = {frozenset((r["bot1_id"], r["bot2_id"])) for r in results}
+    rng = random.Random(f"{seed}:{round_no}")
+    order = list(bots)
+    rng.shuffle(order)
+    order.sort(key=lambda b: table[b["id"]]["points"], reverse=True)
+
+    matches = []
+    while len(order) > 1:
+        bot = order.pop(0)
+        opp_index = next(
+            (i for i, other in enumerate(order) if frozenset((bot["id"], other["id"])) not in played),
+            0,
+        )
+        opponent = order.pop(opp_index)
+        matches.append(_match(round_no, bot, opponent, seed))
+    # An odd bot out gets a bye this round
+    return matches
+
+
+def load_journal(path: str) -> list[dict]:
+    if not os.path.exists(path):
+        return []
+    results = []
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                results.append(json.loads(line))
+            except json.JSONDecodeError:
+                # A torn last line from an interrupted run; the match is replayed
+                continue
+    return [r for r in results if not r.get("error")]
+
+
+def _summarize(match: dict, result: dict | None, elapsed: float, error: str | None) -> dict:
+    record = {
+        "match_id": match["match_id"],
+        "round": match["round"],
+        "seed": match["seed"],
+        "bot1_id": match["bot1"]["id"],
+        "bot2_id": match["bot2"]["id"],
+        "bot1_name": match["bot1"]["name"],
+        "bot2_name": match["bot2"]["name"],
+        "duration_s": round(elapsed, 3),
+    }
+    if error is not None:
+        record["error"] = error
+        return record
+    record.update(
+        {
+            "bot1_score": result["bot1_score"],
+            "bot2_score": result["bot2_score"],
+            "bot1_team": [(p["player_id"], p["bid_amount"]) for p in result["bot1_team"]],
+            "bot2_team": [(p["player_id"], p["bid_amount"]) for p in result["bot2_team"]],
+            "game_id": result.get("game_id"),
+        }
+    )
+    return record
+
+
+async def _play(
+    match: dict,
+    backend: BotBackend | None,
+    save_user_id: str | None,
+    scoring_profile: str | None = None,
+) -> dict:
+    start = time.perf_counter()
+    try:
+        result = await run_game(
+            match["bot1"], match["bot2"], seed=match["seed"], backend=backend, scoring_profile=scoring_profile
+        )
+        if save_user_id:
+            from database import get_supabase
+            from services import repository
+
+            game = await repository.save_game(
+                get_supabase(), save_user_id, match["bot1"]["id"], match["bot2"]["id"], result
+            )
+            result["game_id"] = game["id"] if game else None
+    except Exception as e:
+        return _summarize(match, None, time.perf_counter() - start, f"{type(e).__name__}: {e}")
+    return _summarize(match, result, time.perf_counter() - start, None)
+
+
+async def run_matches(
+    matches: list[dict],
+    journal,
+    concurrency: int,
+    backend: BotBackend | None = None,
+    save_user_id: str | None = None,
+    scoring_profile: str | None = None,
+    recorded_with: dict | None = None,
+) -> list[dict]:
+    """
+    Play `matches` with at most `concurrency` games in flight, appending each
+    record (plus the `recorded_with` fields) to the open `journal` file as it
+    finishes.
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+    for m in matches:
+        queue.put_nowait(m)
+    records: list[dict] = []
+
+    async def worker():
+        while True:
+            try:
+                match = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            record = {**await _play(match, backend, save_user_id, scoring_profile), **(recorded_with or {})}
+            journal.write(json.dumps(record) + "\n")
+            journal.flush()
+            records.append(record)
+            status = record.get("error") or f"{record['bot1_score']} - {record['bot2_score']}"
+            print(f"[{record['match_id']}] {record['bot1_name']} vs {record['bot2_name']}: {status}", file=sys.stderr)
+
+    await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+    return records
+
+
+async def run_tournament(
+    bots: list[dict],
+    out_path: str,
+    fmt: str = "round-robin",
+    rounds: int = 1,
+    concurrency: int = 8,
+    seed: int = 0,
+    backend: BotBackend | None = None,
+    save_user_id: str | None = None,
+    scoring_profile: str | None = None,
+) -> list[dict]:
+    """
+    Run (or resume) a tournament and return every completed match record.
+    Raises ValueError if `out_path` was recorded with another scoring profile
+    or backend.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format {fmt!r}, expected one of {FORMATS}")
+    if len(bots) < 2:
+        raise ValueError("A tournament needs at least two bots")
+
+    recorded_with = {
+        "scoring_profile": scoring_profile or settings.scoring_profile,
+        "backend": _backend_name(backend),
+    }
+    results = load_journal(out_path)
+    for r in results:
+        for key, value in recorded_with.items():
+            # Journals written before these fields were recorded can't be checked
+            if key in r and r[key] != value:
+                raise ValueError(f"{out_path} was recorded with {key} {r[key]!r}, not {value!r}")
+    done = {r["match_id"] for r in results}
+    play = functools.partial(
+        run_matches,
+        concurrency=concurrency,
+        backend=backend,
+        save_user_id=save_user_id,
+        scoring_profile=scoring_profile,
+        recorded_with=recorded_with,
+    )
+
+    with open(out_path, "a+") as journal:
+        # Terminate a torn line left by an interrupted run before appending
+        if journal.tell() > 0:
+            journal.seek(journal.tell() - 1)
+            if journal.read(1) != "\n":
+                journal.write("\n")
+
+        if fmt == "round-robin":
+            pending = [m for m in round_robin_schedule(bots, rounds, seed) if m["match_id"] not in done]
+            results += await play(pending, journal)
+            return [r for r in results if not r.get("error")]
+
+        # Later rounds were paired from completed matches only, so a match that
+        # failed in a round the journal has already moved past stays unplayed:
+        # replaying it would change pairings that have been played
+        reached = max((r["round"] for r in results), default=0)
+        completed: list[dict] = []
+        for round_no in range(1, rounds + 1):
+            pairings = swiss_pairings(bots, completed, round_no, seed)
+            match_ids = {m["match_id"] for m in pairings}
+            completed += [r for r in results if r["match_id"] in match_ids]
+            if round_no >= reached:
+                pending = [m for m in pairings if m["match_id"] not in done]
+                completed += [r for r in await play(pending, journal) if not r.get("error")]
+    return completed
+
+
+def _backend_name(backend: BotBackend | None) -> str:
+    if backend is None:
+        return "openai"  # run_game's default
+    return next((name for name, cls in BACKENDS.items() if isinstance(backend, cls)), type(backend).__name__)
+
+
+PARQUET_ENGINES = ("pyarrow", "fastparquet")
+
+
+def write_parquet(results: list[dict], path: str):
+    import pandas as pd
+
+    pd.DataFrame(results).to_parquet(path, index=False)
+
+
+def _print_standings(bots: list[dict], results: list[dict]):
+    table = standings(bots, results)
+    rows = sorted(table.values(), key=lambda r: (r["points"], r["score_total"]), reverse=True)
+    print(f"{'Bot':<24} {'Pts':>5} {'W':>4} {'L':>4} {'T':>4} {'Avg score':>10}")
+    for r in rows:
+        avg = r["score_total"] / r["games"] if r["games"] else 0.0
+        print(f"{r['name'][:24]:<24} {r['points']:>5} {r['wins']:>4} {r['losses']:>4} {r['ties']:>4} {avg:>10.1f}")
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="Run a headless bot tournament")
+    entrants = parser.add_mutually_exclusive_group(required=True)
+    entrants.add_argument("--bots", nargs="+", help="Bot ids to load from Supabase")
+    entrants.add_argument("--prompts", help="File with one strategy prompt per line")
+    parser.add_argument("--format", choices=FORMATS, default="round-robin")
+    parser.add_argument("--rounds", type=int, default=1)
+    parser.add_argument("--concurrency", type=int, default=8, help="Games in flight at once")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default="tournament.jsonl", help="JSONL journal (also used to resume)")
+    parser.add_argument("--parquet", help="Also export completed matches to this Parquet file (needs pyarrow)")
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default="openai", help="Bot decision backend")
+    parser.add_argument("--save-user-id", help="Persist each game to Supabase under this user")
+    parser.add_argument("--scoring-profile", choices=sorted(PROFILES), help="Scoring profile for every game")
+    args = parser.parse_args(argv)
+
+    # pandas needs a Parquet engine, and neither is in requirements.txt; fail
+    # now rather than after the whole tournament has been played
+    if args.parquet and not any(importlib.util.find_spec(m) for m in PARQUET_ENGINES):
+        parser.error("--parquet needs pyarrow or fastparquet (pip install pyarrow)")
+
+    if args.bots:
+        bots = load_bots(args.bots)
+    else:
+        with open(args.prompts) as f:
+            bots = bots_from_prompts([line.strip() for line in f if line.strip()])
+    if args.save_user_id and not args.bots:
+        parser.error("--save-user-id requires --bots (games reference stored bots)")
+
+    async def _run():
+        try:
+            return await run_tournament(
+                bots,
+                args.out,
+                fmt=args.format,
+                rounds=args.rounds,
+                concurrency=args.concurrency,
+                seed=args.seed,
+                backend=get_backend(args.backend),
+                save_user_id=args.save_user_id,
+                scoring_profile=args.scoring_profile,
+            )
+        finally:
+            await close_client()
+
+    try:
+        results = asyncio.run(_run())
+    except ValueError as e:
+        parser.error(str(e))
+    if args.parquet:
+        write_parquet(results, args.parquet)
+    _print_standings(bots, results)
+
+
+if __name__ == "__main__":
+    main()
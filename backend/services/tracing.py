@@ -0,0 +1,271 @@
+"""
+Opt-in per-game tracing.
+
+A sampled fraction of games (`settings.trace_sample_rate`) records a span
+for every nomination, bid round, LLM call and DB call. The finished trace is written
+to `settings.trace_dir`, either as Chrome trace JSON (open it in Perfetto or
+chrome://tracing) or as OTLP/JSON, as exported by OpenTelemetry.
+
+The rate and format can be changed at runtime for every worker: `set_shared`
+(PUT /api/tracing) writes them to `settings.trace_control_path`, and each
+worker re-reads that file from `start()` at most every
+`settings.trace_control_interval` seconds.
+
+The active trace and the current parent span live in context variables, so
+spans nest across awaits and tasks inherit them. When the current game isn't
+traced, `span()` returns a shared no-op context manager.
+"""
+
+import asyncio
+import contextlib
+import contextvars
+import itertools
+import json
+import logging
+import os
+import random
+import secrets
+import time
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ("chrome", "otlp")
+
+_trace: contextvars.ContextVar = contextvars.ContextVar("trace", default=None)
+_parent: contextvars.ContextVar = contextvars.ContextVar("trace_parent", default=None)
+_NOOP = contextlib.nullcontext()
+
+# This process's settings; `configure` (scripts, benchmarks) changes them
+# here only, `set_shared` in every worker
+_config = {"sample_rate": 0.0, "format": "chrome"}
+# When the control file was last checked, and the mtime last applied
+_control_checked = 0.0
+_control_mtime: int | None = None
+
+
+class Span:
+    __slots__ = ("trace", "id", "parent", "name", "attrs", "task", "start", "end", "_token")
+
+    def __init__(self, trace: "Trace", name: str, attrs: dict):
+        self.trace = trace
+        self.id = next(trace.ids)
+        self.parent = _parent.get()
+        self.name = name
+        self.attrs = attrs
+        self.task = trace.task_id()
+        self.start = self.end = 0
+
+    def __enter__(self) -> "Span":
+        self._token = _parent.set(self.id)
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.end = time.perf_counter_ns()
+        _parent.reset(self._token)
+        if exc_type is not None:
+            self.attrs["error"] = f"{exc_type.__name__}: {exc}"
+        self.trace.spans.append(self)
+
+
+class Trace:
+    def __init__(self, name: str, attrs: dict):
+        self.name = name
+        self.attrs = attrs
+        self.trace_id = secrets.token_hex(16)
+        self.spans: list[Span] = []  # in the order they end
+        self.ids = itertools.count(1)
+        self.tasks: dict[int, int] = {}
+        # Spans are timed with perf_counter_ns and placed on the wall clock at export
+        self.wall_start = time.time_ns()
+        self.perf_start = time.perf_counter_ns()
+
+    def task_id(self) -> int:
+        """Small per-trace id of the running task; Chrome traces use it as the thread."""
+        try:
+            key = id(asyncio.current_task())
+        except RuntimeError:
+            key = 0
+        return self.tasks.setdefault(key, len(self.tasks) + 1)
+
+    def _wall(self, perf_ns: int) -> int:
+        return self.wall_start + perf_ns - self.perf_start
+
+    def chrome(self) -> dict:
+        events = [
+            {"name": "thread_name", "ph": "M", "pid": 1, "tid": tid, "args": {"name": f"task {tid}"}}
+            for tid in self.tasks.values()
+        ]
+        for s in self.spans:
+            events.append(
+                {
+                    "name": s.name,
+                    "ph": "X",
+                    "pid": 1,
+                    "tid": s.task,
+                    "ts": (s.start - self.perf_start) / 1000,
+                    "dur": (s.end - s.start) / 1000,
+                    "args": {**s.attrs, "span_id": s.id, "parent_id": s.parent},
+                }
+            )
+        return {"traceEvents": events, "displayTimeUnit": "ms", "otherData": {"trace": self.name, **self.attrs}}
+
+    def otlp(self) -> dict:
+        def attributes(attrs: dict) -> list[dict]:
+            out = []
+            for key, value in attrs.items():
+                if isinstance(value, bool):
+                    v = {"boolValue": value}
+                elif isinstance(value, int):
+                    v = {"intValue": str(value)}
+                elif isinstance(value, float):
+                    v = {"doubleValue": value}
+                else:
+                    v = {"stringValue": str(value)}
+                out.append({"key": key, "value": v})
+            return out
+
+        def span_id(n: int) -> str:
+            return f"{n:016x}"
+
+        spans = [
+            {
+                "traceId": self.trace_id,
+                "spanId": span_id(s.id),
+                "parentSpanId": span_id(s.parent) if s.parent else "",
+                "name": s.name,
+                "kind": 1,  # SPAN_KIND_INTERNAL
+                "startTimeUnixNano": str(self._wall(s.start)),
+                "endTimeUnixNano": str(self._wall(s.end)),
+                "attributes": attributes(s.attrs),
+            }
+            for s in self.spans
+        ]
+        resource = {"service.name": "fantasy-basketball-api", "trace.name": self.name, **self.attrs}
+        return {
+            "resourceSpans": [
+                {
+                    "resource": {"attributes": attributes(resource)},
+                    "scopeSpans": [{"scope": {"name": __name__}, "spans": spans}],
+                }
+            ]
+        }
+
+
+def configure(sample_rate: float | None = None, format: str | None = None) -> dict:
+    """
+    Change sampling or the output format for games this process starts from
+    now on. Other workers keep their settings.
+    """
+    if sample_rate is not None and not 0.0 <= sample_rate <= 1.0:
+        raise ValueError("sample_rate must be between 0 and 1")
+    if format is not None and format not in FORMATS:
+        raise ValueError(f"format must be one of {', '.join(FORMATS)}")
+    if sample_rate is not None:
+        _config["sample_rate"] = sample_rate
+    if format is not None:
+        _config["format"] = format
+    return dict(_config)
+
+
+def _refresh():
+    """Apply the shared control file if it changed; checked at most once per interval."""
+    global _control_checked, _control_mtime
+    now = time.monotonic()
+    if now - _control_checked < settings.trace_control_interval:
+        return
+    _control_checked = now
+    path = settings.trace_control_path
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return  # no runtime override yet
+    if mtime == _control_mtime:
+        return
+    _control_mtime = mtime
+    try:
+        with open(path) as f:
+            data = json.load(f)
+        configure(data.get("sample_rate"), data.get("format"))
+    except (OSError, ValueError, TypeError, AttributeError) as e:
+        logger.warning("Ignoring trace control file %s: %s", path, e)
+
+
+def set_shared(sample_rate: float | None = None, format: str | None = None) -> dict:
+    """
+    Change sampling or the format in every worker: applied here at once and
+    written to the control file, which the other workers pick up within
+    `settings.trace_control_interval` seconds.
+    """
+    global _control_mtime
+    _refresh()
+    current = configure(sample_rate, format)
+    path = settings.trace_control_path
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(current, f)
+    os.replace(tmp, path)
+    _control_mtime = os.stat(path).st_mtime_ns
+    return current
+
+
+def config() -> dict:
+    _refresh()
+    return dict(_config)
+
+
+configure(settings.trace_sample_rate, settings.trace_format)  # rejects bad settings at startup
+
+
+def start(name: str, **attrs) -> Trace | None:
+    """Begin tracing the current context if it is sampled; returns the trace or None."""
+    _refresh()
+    rate = _config["sample_rate"]
+    if rate <= 0 or random.random() >= rate:
+        return None
+    trace = Trace(name, attrs)
+    _trace.set(trace)
+    _parent.set(None)
+    return trace
+
+
+def span(name: str, **attrs):
+    """Context manager recording `name` in the current trace, if any."""
+    trace = _trace.get()
+    if trace is None:
+        return _NOOP
+    return Span(trace, name, attrs)
+
+
+def _write(trace: Trace, fmt: str, path: str):
+    try:
+        os.makedirs(settings.trace_dir, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(trace.chrome() if fmt == "chrome" else trace.otlp(), f)
+    except (OSError, TypeError, ValueError) as e:
+        # A read-only or full disk loses the trace, never the request
+        logger.warning("Failed to write trace %s: %s", path, e)
+        return
+    logger.info("Wrote %d spans to %s", len(trace.spans), path)
+
+
+def finish(trace: Trace | None) -> str | None:
+    """
+    Stop tracing the current context and write `trace` out on a worker
+    thread; returns the file path it is written to. Never raises and never
+    blocks the event loop.
+    """
+    if trace is None:
+        return None
+    if _trace.get() is trace:
+        _trace.set(None)
+    fmt = _config["format"]
+    path = os.path.join(settings.trace_dir, f"{trace.name}-{trace.trace_id[:12]}.{fmt}.json")
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        _write(trace, fmt, path)  # no loop (scripts): write inline
+    else:
+        loop.run_in_executor(None, _write, trace, fmt, path)
+    return path
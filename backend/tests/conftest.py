@@ -0,0 +1,10 @@
+import os
+import sys
+
+# The backend runs from backend/ (`import services`, `import config`)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Settings requires these; nothing in the tests reaches Supabase or OpenAI
+os.environ.setdefault("SUPABASE_URL", "http://127.0.0.1:9")
+os.environ.setdefault("SUPABASE_KEY", "test")
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
@@ -0,0 +1,166 @@
+"""
+Chunked game logs: paging through GET /api/games/{id}/log, the legacy inline
+log fallback, and a resumed game rewriting its chunks from the checkpoint.
+"""
+
+import asyncio
+import pytest
+from fastapi.testclient import TestClient
+from benchmarks.engine_hot_loop import synthetic_players
+from database import get_db
+from main import app
+from services import game_store, player_pool
+from services.bot_backends import HeuristicBackend
+from services.checkpoints import GameCheckpointer, SQLiteCheckpointStore
+from services.game_engine import run_game, run_game_stream
+from services.game_log import CHUNK_LINES, GameLogWriter, decode_chunk, digest
+
+BOT1 = {"id": "bot-1", "name": "One", "strategy_prompt": ""}
+BOT2 = {"id": "bot-2", "name": "Two", "strategy_prompt": ""}
+
+
+class _Query:
+    """The slice of the PostgREST builder the log paths use."""
+
+    def __init__(self, rows: list[dict]):
+        self.rows = rows
+        self.filters = []
+        self.order_key = None
+        self.upserted = None
+
+    def select(self, columns: str):
+        return self
+
+    def eq(self, column, value):
+        self.filters.append(lambda r: r.get(column) == value)
+        return self
+
+    def gte(self, column, value):
+        self.filters.append(lambda r: r[column] >= value)
+        return self
+
+    def lte(self, column, value):
+        self.filters.append(lambda r: r[column] <= value)
+        return self
+
+    def order(self, column):
+        self.order_key = column
+        return self
+
+    def upsert(self, rows: list[dict]):
+        self.upserted = rows
+        return self
+
+    def execute(self):
+        if self.upserted is not None:
+            for row in self.upserted:
+                self.rows[:] = [r for r in self.rows if (r["game_id"], r["seq"]) != (row["game_id"], row["seq"])]
+                self.rows.append(dict(row))
+            return type("Result", (), {"data": self.upserted})
+        data = [r for r in self.rows if all(f(r) for f in self.filters)]
+        if self.order_key:
+            data.sort(key=lambda r: r[self.order_key])
+        return type("Result", (), {"data": data})
+
+
+class FakeDB:
+    def __init__(self):
+        self.tables: dict[str, list[dict]] = {"games": [], "game_log_chunks": []}
+
+    def table(self, name: str) -> _Query:
+        return _Query(self.tables[name])
+
+
+@pytest.fixture
+def db():
+    fake = FakeDB()
+    app.dependency_overrides[get_db] = lambda: fake
+    yield fake
+    app.dependency_overrides.pop(get_db, None)
+
+
+def _store(db: FakeDB, game_id: str, lines: list[str]):
+    db.tables["games"].append({"id": game_id, "game_log": []})
+    writer = GameLogWriter(game_id)
+    for line in lines:
+        writer.append(line)
+        game_store.save_log_chunks(db, writer.take_chunks())
+    game_store.save_log_chunks(db, writer.take_chunks(final=True))
+
+
+def _read_all(client: TestClient, game_id: str, limit: int) -> list[str]:
+    lines, offset = [], 0
+    while offset is not None:
+        page = client.get(f"/api/games/{game_id}/log", params={"offset": offset, "limit": limit}).json()
+        assert page["offset"] == offset
+        lines += page["lines"]
+        offset = page["next_offset"]
+    return lines
+
+
+def test_pages_cross_chunk_boundaries(db):
+    lines = [f"line {i}" for i in range(2 * CHUNK_LINES + 22)]
+    _store(db, "g1", lines)
+    assert len(db.tables["game_log_chunks"]) == 3
+
+    client = TestClient(app)
+    for limit in (1, 50, CHUNK_LINES, 100, 1000):
+        assert _read_all(client, "g1", limit) == lines
+
+
+def test_last_page_has_no_next_offset(db):
+    _store(db, "g1", [f"line {i}" for i in range(2 * CHUNK_LINES)])
+    client = TestClient(app)
+
+    first = client.get("/api/games/g1/log", params={"offset": 0, "limit": CHUNK_LINES}).json()
+    assert first["next_offset"] == CHUNK_LINES
+    last = client.get("/api/games/g1/log", params={"offset": CHUNK_LINES, "limit": CHUNK_LINES}).json()
+    assert len(last["lines"]) == CHUNK_LINES and last["next_offset"] is None
+    past = client.get("/api/games/g1/log", params={"offset": 5 * CHUNK_LINES}).json()
+    assert past["lines"] == [] and past["next_offset"] is None
+
+
+def test_legacy_inline_log(db):
+    db.tables["games"].append({"id": "legacy", "game_log": ["a", "b", "c"]})
+    client = TestClient(app)
+
+    page = client.get("/api/games/legacy/log", params={"offset": 1, "limit": 1}).json()
+    assert page["lines"] == ["b"] and page["next_offset"] == 2
+    assert _read_all(client, "legacy", 2) == ["a", "b", "c"]
+    assert client.get("/api/games/missing/log").status_code == 404
+
+
+@pytest.mark.parametrize("cut", [7, 150])
+def test_resume_rewrites_chunks_and_digest(db, tmp_path, cut):
+    player_pool.prime(synthetic_players())
+    store = SQLiteCheckpointStore(str(tmp_path / "checkpoints.db"))
+    key = "0" * 32
+
+    async def play(checkpoint, stop_after=None):
+        log = GameLogWriter("g1")
+        stream = run_game_stream(BOT1, BOT2, seed=3, backend=HeuristicBackend(), game_log=log, checkpoint=checkpoint)
+        events = 0
+        async for event in stream:
+            events += 1
+            if event["type"] != "game_complete":
+                game_store.save_log_chunks(db, log.take_chunks())
+            if events == stop_after:
+                await stream.aclose()
+                return log
+        game_store.save_log_chunks(db, log.take_chunks(final=True))
+        return log
+
+    async def scenario():
+        reference = await run_game(BOT1, BOT2, seed=3, backend=HeuristicBackend())
+        checkpoint = await GameCheckpointer.start(store, key, {})
+        await play(checkpoint, stop_after=cut)
+        checkpoint.release()
+        # The interrupted run may have stored chunks past the checkpoint; the
+        # resume rewrites them
+        log = await play(await GameCheckpointer.resume(store, key))
+        return reference["game_log"], log
+
+    expected, log = asyncio.run(scenario())
+    chunks = sorted(db.tables["game_log_chunks"], key=lambda r: r["seq"])
+    assert [line for chunk in chunks for line in decode_chunk(chunk["data"])] == expected
+    assert log.digest() == digest(expected)
@@ -0,0 +1,26 @@
+"""
+Regression guard for the async repository layer: a slow database write must
+not stall other games' event streams.
+
+Run with (needs pytest):
+    cd backend
+    python -m pytest tests
+"""
+
+import asyncio
+from benchmarks.engine_hot_loop import synthetic_players
+from benchmarks.stream_concurrency import max_event_gap
+from services import player_pool
+
+STREAMS = 4
+LLM_LATENCY = 0.005
+WRITE_DELAY = 0.3
+
+
+def test_slow_write_does_not_stall_streams():
+    player_pool.prime(synthetic_players())
+
+    max_gap = asyncio.run(max_event_gap(True, STREAMS, LLM_LATENCY, WRITE_DELAY))
+
+    # Streams should only ever wait on their own simulated LLM latency
+    assert max_gap < WRITE_DELAY / 2, f"streams stalled for {max_gap * 1000:.0f} ms during the write"
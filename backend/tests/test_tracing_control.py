@@ -0,0 +1,47 @@
+"""PUT /api/tracing: admin-only, and the change reaches workers that didn't serve it."""
+
+import pytest
+from fastapi.testclient import TestClient
+from config import settings
+from main import app
+from services import tracing
+
+
+@pytest.fixture
+def control(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "admin_token", "s3cret")
+    monkeypatch.setattr(settings, "trace_control_path", str(tmp_path / "trace_control.json"))
+    monkeypatch.setattr(settings, "trace_control_interval", 0.0)
+    monkeypatch.setattr(tracing, "_config", {"sample_rate": 0.0, "format": "chrome"})
+    monkeypatch.setattr(tracing, "_control_mtime", None)
+    return TestClient(app)
+
+
+def test_put_requires_admin_token(control):
+    body = {"sample_rate": 1.0}
+    assert control.put("/api/tracing", json=body).status_code == 403
+    assert control.put("/api/tracing", json=body, headers={"X-Admin-Token": "wrong"}).status_code == 403
+    assert tracing.config()["sample_rate"] == 0.0
+
+
+def test_put_disabled_without_admin_token(control, monkeypatch):
+    monkeypatch.setattr(settings, "admin_token", "")
+    r = control.put("/api/tracing", json={"sample_rate": 1.0}, headers={"X-Admin-Token": ""})
+    assert r.status_code == 404
+
+
+def test_put_rejects_bad_values(control):
+    headers = {"X-Admin-Token": "s3cret"}
+    assert control.put("/api/tracing", json={"sample_rate": 2.0}, headers=headers).status_code == 400
+    assert control.put("/api/tracing", json={"format": "xml"}, headers=headers).status_code == 400
+
+
+def test_put_reaches_other_workers(control, monkeypatch):
+    r = control.put("/api/tracing", json={"sample_rate": 0.25, "format": "otlp"}, headers={"X-Admin-Token": "s3cret"})
+    assert r.status_code == 200
+    assert r.json() == {"sample_rate": 0.25, "format": "otlp"}
+
+    # Another worker: still on its startup settings, has never read the file
+    monkeypatch.setattr(tracing, "_config", {"sample_rate": 0.0, "format": "chrome"})
+    monkeypatch.setattr(tracing, "_control_mtime", None)
+    assert control.get("/api/tracing").json() == {"sample_rate": 0.25, "format": "otlp"}
@@ -86,6 +86,8 @@ export interface GameResponse {
   bot2_score: number;
   winner_bot_id: string | null;
   status: string;
+  // Scores are only comparable between games with the same profile
+  scoring_profile: string;
   game_log: string[];
   bot1_team: GamePlayerResult[];
   bot2_team: GamePlayerResult[];
@@ -124,7 +126,10 @@ export interface StreamGameCompleteEvent {
   bot2_score: number;
   bot1_team: DraftPick[];
   bot2_team: DraftPick[];
-  game_log: string[];
+  // Streams send a digest instead of the log lines already streamed: the
+  // line count and the CRC-32 of the lines joined with "\n"
+  game_log?: string[];
+  game_log_digest?: { lines: number; crc32: number };
 }
 
 export interface StreamCallbacks {
@@ -141,7 +146,7 @@ export async function streamGame(
   bot2Id: string,
   callbacks: StreamCallbacks,
 ): Promise<void> {
-  const res = await fetch(`${BASE}/games/stream`, {
+  const res = await fetch(`${BASE}/games/stream?batch=true`, {
     method: "POST",
     headers: { "Content-Type": "application/json" },
     body: JSON.stringify({ user_id: userId, bot1_id: bot1Id, bot2_id: bot2Id }),
@@ -191,19 +196,10 @@ export async function streamGame(
 
       try {
         const parsed = JSON.parse(data);
-        switch (eventType) {
-          case "log":
-            callbacks.onLog(parsed.message);
-            break;
-          case "draft":
-            callbacks.onDraft(parsed as StreamDraftEvent);
-            break;
-          case "game_complete":
-            callbacks.onGameComplete(parsed as StreamGameCompleteEvent);
-            break;
-          case "saved":
-            callbacks.onSaved(parsed.game_id);
-            break;
+        if (eventType === "batch") {
+          for (const event of parsed) dispatchStreamEvent(event.type, event, callbacks);
+        } else {
+          dispatchStreamEvent(eventType, parsed, callbacks);
         }
       } catch {
         // Skip malformed JSON
@@ -212,8 +208,41 @@ export async function streamGame(
   }
 }
 
-export function getUserGames(userId: string) {
-  return request<GameResponse[]>(`/games/user/${userId}`);
+function dispatchStreamEvent(eventType: string, parsed: any, callbacks: StreamCallbacks) {
+  switch (eventType) {
+    case "log":
+      callbacks.onLog(parsed.message);
+      break;
+    case "draft":
+      callbacks.onDraft(parsed as StreamDraftEvent);
+      break;
+    case "game_complete":
+      callbacks.onGameComplete(parsed as StreamGameCompleteEvent);
+      break;
+    case "saved":
+      callbacks.onSaved(parsed.game_id);
+      break;
+  }
+}
+
+// Pass the last game of the previous page to fetch the next (older) page
+export function getUserGames(userId: string, after?: { created_at: string; id: string }) {
+  const query = after
+    ? `?before=${encodeURIComponent(after.created_at)}&before_id=${encodeURIComponent(after.id)}`
+    : "";
+  return request<GameResponse[]>(`/games/user/${userId}${query}`);
+}
+
+export interface GameLogPage {
+  game_id: string;
+  offset: number;
+  lines: string[];
+  next_offset: number | null;
+}
+
+// History responses leave game_log empty; fetch it a page at a time
+export function getGameLog(gameId: string, offset = 0, limit = 200) {
+  return request<GameLogPage>(`/games/${gameId}/log?offset=${offset}&limit=${limit}`);
 }
 
 // --- Players ---